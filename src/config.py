@@ -2,4 +2,112 @@ DATA_DIR_NAME = "data/"
 SCREENING_TOP_N = 10
 INTERVIEW_TOP_N = 3
 THRESHOLD = 0.35
-NUMBER_OF_TEST_RESUMES = 50
\ No newline at end of file
+PREFILTER_TOP_K = None  # keep only the k most similar resumes above THRESHOLD, None keeps all
+NUMBER_OF_TEST_RESUMES = 50
+RESUME_INGESTION = "eager"  # "lazy" scans data/ recursively and reads resume text only when a stage needs it
+INGEST_CHUNK_SIZE = 1000  # resumes read into memory at once while embedding in lazy mode
+RESUME_STORE_PATH = None  # eager ingestion keeps all text in one in-memory buffer, a path memory-maps it from disk
+RESULT_STORE_PATH = ".cache/results.sqlite3"  # manifest and per-stage results for incremental runs
+CHECKPOINT_DIR = ".cache/checkpoint"  # shared state after each node and per-item batch progress, for --resume
+
+# Near-duplicate resumes: one representative per cluster is embedded, screened and reranked, and its
+# evaluation and score are copied to the others (the RANKING_FULL_PATH file lists representatives only)
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.9  # estimated Jaccard similarity of word shingles
+DEDUP_NUM_PERM = 128  # MinHash signature length, split into LSH bands picked for the threshold
+DEDUP_SHINGLE_SIZE = 3
+
+# Embeddings (OpenAI limits: 2048 inputs and 300k tokens per request, 8192 tokens per input)
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_MAX_BATCH_SIZE = 2048
+EMBEDDING_MAX_BATCH_TOKENS = 300_000
+EMBEDDING_MAX_INPUT_TOKENS = 8192
+
+# "openai" calls EMBEDDING_MODEL over the network, "local" encodes on this machine with a sentence-transformers
+# bi-encoder. Similarities differ between models, so THRESHOLD needs retuning when switching providers.
+EMBEDDING_PROVIDER = "openai"
+LOCAL_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"  # truncates inputs to 256 tokens
+LOCAL_EMBEDDING_BATCH_SIZE = 64
+
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_DIR = ".cache/embeddings"
+EMBEDDING_CACHE_MAX_ENTRIES = 500_000
+
+# Prefilter search: "exact" scans every resume embedding, "ivf" queries the persistent ANN index
+PREFILTER_INDEX = "exact"
+ANN_INDEX_DIR = ".cache/ann_index"  # one subdirectory per embedding model
+ANN_NLIST = None  # number of IVF lists, None picks 4 * sqrt(N)
+ANN_NPROBE = 8
+ANN_KMEANS_ITERATIONS = 10
+ANN_TRAIN_POINTS_PER_LIST = 64
+ANN_RETRAIN_GROWTH = 2.0  # retrain once the index grows past this multiple of its trained size
+ANN_COMPACT_TOMBSTONE_RATIO = 0.25  # save() rewrites the vector files once this share of rows is tombstoned
+
+# LLM screening
+LLM_MODEL = "gpt-4o-mini"
+SCREENING_CONCURRENCY = 8  # concurrent screening calls, 1 screens resumes one at a time
+LLM_REQUESTS_PER_MINUTE = 500
+LLM_TOKENS_PER_MINUTE = 200_000
+LLM_EXPECTED_OUTPUT_TOKENS = 200  # reserved per request against the tokens-per-minute budget
+LLM_MAX_RETRIES = 5
+LLM_BACKOFF_BASE_SECONDS = 1.0
+LLM_BACKOFF_MAX_SECONDS = 60.0
+SCREENING_PACKED = False  # screen several resumes per call with PackedScreenResumesNode
+SCREENING_PACK_MAX_RESUMES = 8
+SCREENING_PACK_TOKEN_BUDGET = 12_000  # resume tokens per packed prompt
+# "waves" screens in descending prefilter similarity, SCREENING_WAVE_SIZE calls at a time, and stops once
+# SCREENING_TARGET_QUALIFIED candidates qualified; resumes below SCREENING_MIN_SIMILARITY are never screened.
+# The results are then marked partial. "exhaustive" screens every relevant resume.
+SCREENING_MODE = "exhaustive"
+SCREENING_WAVE_SIZE = 16
+SCREENING_TARGET_QUALIFIED = SCREENING_TOP_N
+SCREENING_MIN_SIMILARITY = None
+
+# Rule-based pre-screen: rejects clear fails of the experience criterion before the LLM sees them
+PRESCREEN_ENABLED = True
+PRESCREEN_MIN_YEARS = 3
+PRESCREEN_EXPERIENCE_MARGIN_YEARS = 0.5  # date ranges are month-granular at best, only reject well below the minimum
+
+# LLM response cache, only deterministic (temperature 0) calls are cached; LLM_CACHE_BYPASS=true skips it
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = ".cache/llm_responses.sqlite3"
+LLM_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 1_000_000
+
+# Reranking
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANKER_BATCH_SIZE = 32
+RERANKER_BACKEND = "torch"  # "torch", "onnx" or "onnx-int8" (ONNX backends need optimum[onnxruntime])
+RERANKER_ONNX_DIR = ".cache/onnx"
+RERANKER_QUANTIZATION = "avx2"  # onnx-int8 target: "arm64", "avx2", "avx512" or "avx512_vnni"
+RERANKER_WORKERS = 1  # processes scoring shards of the pairs, 1 scores everything in this process
+RERANKER_PARALLEL_MIN_ITEMS = 256  # below this, process start-up costs more than it saves
+RERANKER_START_METHOD = "spawn"  # forking after torch has started its thread pools can deadlock
+RERANKER_CACHE_ENABLED = True
+RERANKER_CACHE_PATH = ".cache/reranker_scores.sqlite3"
+RERANKER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RANKING_CHUNK_SIZE = 1024  # qualified resumes read and reranked at a time, only the SCREENING_TOP_N best are kept
+RANKING_FULL_PATH = None  # e.g. ".cache/ranking.tsv" to also write the complete ranking to disk, --jobs adds ".<job>"
+RANKING_SPILL_ROWS = 100_000  # ranking rows sorted in memory per on-disk run when writing the full ranking
+
+# Pipelined execution (--pipelined): stages run concurrently, connected by bounded queues
+PIPELINE_QUEUE_SIZE = 256  # items buffered between two stages
+PIPELINE_EMBED_WORKERS = 2
+PIPELINE_EMBED_BATCH_SIZE = 256  # most resumes per embedding request, taken from whatever is already queued
+PIPELINE_SCREEN_WORKERS = 8
+PIPELINE_RERANK_WORKERS = 1
+
+# Sharded execution (--shards K): resumes are partitioned by content hash and each shard runs in a worker process
+SHARD_SPOOL_DIR = ".cache/spool"  # put it on a shared filesystem to let workers on other machines take shards
+SHARD_WORKERS = 4  # local worker processes, 0 leaves every shard to remote workers
+SHARD_START_METHOD = "spawn"
+SHARD_POLL_SECONDS = 1.0
+
+# Multi-job screening (--jobs PATH): resumes are read, deduplicated and embedded once, prefiltered against every
+# job with one resumes x jobs similarity product, then screened and ranked job by job
+JOBS_PATH = "jobs.yaml"  # default for --jobs without a path
+JOB_PRESCREEN_DEFAULT = False  # the pre-screen rules encode MANDATORY_CRITERIA, jobs opt in with `prescreen: true`
+
+# Run metrics: per-node timings, item latencies, requests, tokens and cache hits, written when main.py finishes
+METRICS_REPORT_PATH = ".cache/run_report.json"  # None disables the JSON report
+METRICS_PROMETHEUS_PATH = None  # e.g. a .prom file in the node_exporter textfile collector directory
@@ -4,6 +4,8 @@ DEFAULT = "default"
 EVALUATIONS = "evaluations"
 QUALIFIES = "qualifies"
 REASONS = "reasons"
+PRESCREEN_RULE = "prescreen_rule"
+DUPLICATE_OF = "duplicate_of"
 CANDIDATE_NAME = "candidate_name"
 FILTER_SUMMARY = "filter_summary"
 QUALIFIED_COUNT = "qualified_count"
@@ -15,3 +17,15 @@ RESUME_EMBEDDINGS = 'resume_embeddings'
 QUALIFIED_RESUMES = 'qualified_resumes_files'
 RANKED_RESUMES = 'ranked_resumes'
 RELEVANT_RESUMES = 'relevant_resumes'
+EMBEDDING_FAILURES = 'embedding_failures'
+RESUME_SIMILARITIES = 'resume_similarities'
+MANIFEST_DIFF = 'manifest_diff'
+SHARD_RESULTS = 'shard_results'
+PRESCREEN_REJECTIONS = 'prescreen_rejections'
+DUPLICATES = 'duplicates'
+DUPLICATE_NAMES = 'duplicate_names'
+DEDUP_SIGNATURES = 'dedup_signatures'
+SCREENING_COVERAGE = 'screening_coverage'
+JOB_EMBEDDINGS = 'job_embeddings'
+JOB_CANDIDATES = 'job_candidates'
+JOB_RESULTS = 'job_results'
@@ -1,15 +1,71 @@
-from constants import EVALUATIONS, CANDIDATE_NAME, QUALIFIES, FILTER_SUMMARY, REASONS
+import argparse
+
+from src.config import METRICS_REPORT_PATH, METRICS_PROMETHEUS_PATH, JOBS_PATH
+from src.constants import EVALUATIONS, CANDIDATE_NAME, QUALIFIES, FILTER_SUMMARY, REASONS, JOB_RESULTS, \
+    RANKED_RESUMES
+from src.utils.metrics import metrics
+from src.workflow.checkpoint import checkpointed
 from src.workflow.flow import create_resume_processing_flow
+from src.workflow.instrumentation import instrument_flow
+from src.workflow.incremental import create_incremental_resume_processing_flow
+from src.workflow.multi_job import create_multi_job_resume_processing_flow, load_jobs
+from src.workflow.pipeline import create_pipelined_resume_processing_flow
+from src.workflow.sharded import create_sharded_resume_processing_flow
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Screen and rank the resumes in data/")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--incremental", action="store_true",
+                      help="only process added or changed resumes, reusing stored results for the rest")
+    mode.add_argument("--pipelined", action="store_true",
+                      help="stream resumes through embedding, prefiltering, screening and reranking concurrently")
+    mode.add_argument("--shards", type=int, default=0, metavar="K",
+                      help="partition resumes into K shards processed by worker processes (see SHARD_* in config)")
+    mode.add_argument("--jobs", nargs="?", const=JOBS_PATH, metavar="PATH",
+                      help=f"screen and rank against every job in a YAML file (default {JOBS_PATH}) of "
+                           "name: {mandatory: ..., preferred: ..., prescreen: true/false}")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="save progress after every node and screened resume so a failed run can be resumed")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the last checkpointed run from where it stopped")
+    args = parser.parse_args()
+
     shared = {}
 
-    resume_flow = create_resume_processing_flow()
+    if args.jobs:
+        resume_flow = create_multi_job_resume_processing_flow(load_jobs(args.jobs))
+    elif args.incremental:
+        resume_flow = create_incremental_resume_processing_flow()
+    elif args.shards:
+        resume_flow = create_sharded_resume_processing_flow(args.shards)
+    elif args.pipelined:
+        resume_flow = create_pipelined_resume_processing_flow()
+    else:
+        resume_flow = create_resume_processing_flow()
+
+    instrument_flow(resume_flow)
+    if args.checkpoint or args.resume:
+        resume_flow = checkpointed(resume_flow, resume=args.resume)
 
-    resume_flow.run(shared=shared)
+    try:
+        resume_flow.run(shared=shared)
+    finally:
+        # Also written for failed runs, where knowing how far it got matters most
+        if METRICS_REPORT_PATH:
+            print(f"\nRun report written to {metrics.write_json(METRICS_REPORT_PATH)}")
+        if METRICS_PROMETHEUS_PATH:
+            metrics.write_prometheus(METRICS_PROMETHEUS_PATH)
 
-    if FILTER_SUMMARY in shared:
+    if JOB_RESULTS in shared:
+        print("\nResults per job:")
+        for job, results in shared[JOB_RESULTS].items():
+            summary = results[FILTER_SUMMARY]
+            top = ", ".join(filename for filename, _ in results[RANKED_RESUMES][:3])
+            print(f"{job}: {summary['qualified_count']} of {summary['total_candidates']} qualified, top: {top or '-'}")
+
+        print("\nResume processing complete!")
+    elif FILTER_SUMMARY in shared:
         print("\nDetailed evaluation results:")
         for filename, evaluation in shared.get(EVALUATIONS, {}).items():
             qualified = "Yes" if evaluation.get(QUALIFIES, False) else "X"
@@ -23,6 +23,16 @@ reasons:
 - [Second reason, if applicable]
 ```"""
 
+BATCH_EVALUATION_RESULT_FORMAT = """Return one evaluation per resume, as a YAML list in the same order as the resumes:
+```yaml
+- filename: [File name exactly as given in the resume header]
+  candidate_name: [Name of the candidate]
+  qualifies: [true/false]
+  reasons:
+  - [First reason for qualification/disqualification]
+  - [Second reason, if applicable]
+```"""
+
 RESUME_GENERATION = """generate a single pre-personalized resume that {condition} this criteria:
 {criteria_for_qualification}
 Note: just generate the resume don't preface or add any conclusions, respond with resume directly and only
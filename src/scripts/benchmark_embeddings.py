@@ -0,0 +1,45 @@
+import argparse
+import time
+
+from src.config import EMBEDDING_MODEL, LOCAL_EMBEDDING_MODEL, LOCAL_EMBEDDING_BATCH_SIZE
+from src.scripts.generate_synthetic_resumes import synthetic_resume
+from src.utils.logger import configured_logger
+from src.utils.models import generate_embeddings, generate_local_embeddings, get_bi_encoder
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Embedding throughput of the local bi-encoder and the remote API (set OPENAI_BASE_URL to "
+                    "benchmark against src/scripts/fake_openai_server.py)")
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=LOCAL_EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--providers", nargs="+", default=["local", "openai"])
+    args = parser.parse_args()
+
+    resumes = [synthetic_resume(number) for number in range(args.resumes)]
+    print(f"{'provider':>9} {'model':>40} {'load s':>7} {'texts/s':>9} {'total s':>8}")
+    for provider in args.providers:
+        try:
+            load_seconds = 0.0
+            if provider == "local":
+                model = LOCAL_EMBEDDING_MODEL
+                started = time.perf_counter()
+                get_bi_encoder()
+                load_seconds = time.perf_counter() - started
+                embed = lambda texts: generate_local_embeddings(texts, batch_size=args.batch_size)
+            else:
+                model, embed = EMBEDDING_MODEL, generate_embeddings
+
+            embed(resumes[:args.batch_size])  # warm-up
+            started = time.perf_counter()
+            embeddings = embed(resumes)
+            seconds = time.perf_counter() - started
+            failed = sum(embedding is None for embedding in embeddings)
+            print(f"{provider:>9} {model:>40} {load_seconds:>7.2f} {len(resumes) / seconds:>9.1f} {seconds:>8.2f}"
+                  + (f"  ({failed} failed)" if failed else ""))
+        except Exception as e:
+            configured_logger.error(f"Benchmark for provider {provider} failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BENCHMARK_DIR = PROJECT_ROOT / ".cache" / "benchmarks"
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def fake_reranker(query, items, *args, **kwargs):
+    """Cheap lexical overlap score, so the benchmark runs without downloading the cross-encoder."""
+    query_words = set(query.lower().split())
+    return [len(query_words & set(item.lower().split())) / (len(query_words) or 1) for item in items]
+
+
+def run_one(size: int, corpus: str, base_url: str, mode: str, real_reranker: bool, report_path: str):
+    """Run the flow once over `corpus` against the fake server; runs in its own process for a clean peak RSS."""
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ.setdefault("CONSOLE_LOG_LEVEL", "WARNING")
+
+    # Imported after the environment is set: the OpenAI clients are created at import time
+    from src.utils import embedding_cache, llm_cache, score_cache
+    from src.utils.metrics import metrics
+    from src.workflow import nodes, pipeline, incremental
+    from src.workflow.flow import create_resume_processing_flow
+    from src.workflow.instrumentation import instrument_flow
+    from src.workflow.pipeline import create_pipelined_resume_processing_flow
+
+    # Cold caches: every resume reaches the (fake) APIs
+    embedding_cache.EMBEDDING_CACHE_ENABLED = nodes.EMBEDDING_CACHE_ENABLED = False
+    llm_cache.LLM_CACHE_ENABLED = False
+    score_cache.RERANKER_CACHE_ENABLED = False
+    nodes.DATA_DIR_NAME = pipeline.DATA_DIR_NAME = corpus
+    if not real_reranker:
+        nodes.call_reranker = pipeline.call_reranker = incremental.call_reranker = fake_reranker
+
+    flow = create_pipelined_resume_processing_flow() if mode == "pipelined" else create_resume_processing_flow()
+    instrument_flow(flow)
+    metrics.reset()
+    shared = {}
+    started = time.perf_counter()
+    flow.run(shared)
+    seconds = time.perf_counter() - started
+
+    report = metrics.report()
+    result = {
+        "resumes": size,
+        "seconds": round(seconds, 3),
+        "resumes_per_second": round(size / seconds, 2),
+        "peak_rss_bytes": report["peak_rss_bytes"],
+        "qualified": shared.get(nodes.FILTER_SUMMARY, {}).get("qualified_count"),
+        "counters": report["counters"],
+        "stages": {},
+    }
+    for node, timings in report["nodes"].items():
+        latency = report["item_latency_seconds"].get(node, {})
+        seconds = timings["prep_seconds"] + timings["exec_seconds"] + timings["post_seconds"]
+        result["stages"][node] = {
+            "seconds": round(seconds, 3),
+            "items": latency.get("count"),
+            "items_per_second": round(latency["count"] / seconds, 2) if latency and seconds else None,
+            "p50_seconds": latency.get("p50"),
+            "p99_seconds": latency.get("p99"),
+            "peak_rss_bytes": timings.get("peak_rss_bytes"),
+        }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+def _start_server(args):
+    from src.scripts.fake_openai_server import serve
+
+    ready = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, daemon=True, kwargs={
+        "port": 0, "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate,
+        "requests_per_minute": args.rpm, "ready": ready})
+    server.start()
+    return server, f"http://127.0.0.1:{ready.get(timeout=30)}/v1"
+
+
+def benchmark(args):
+    from src.scripts.generate_synthetic_resumes import write_corpus
+
+    server, base_url = _start_server(args)
+    results = {"commit": _git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "mode": args.mode,
+               "server": {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate,
+                          "rpm": args.rpm},
+               "runs": {}}
+    try:
+        for size in args.sizes:
+            corpus = str(BENCHMARK_DIR / f"corpus-{size}")
+            write_corpus(size, corpus)
+            report_path = BENCHMARK_DIR / f"run-{size}.json"
+            command = [sys.executable, "-m", "src.scripts.benchmark_pipeline", "--run-one", str(size),
+                       "--corpus", corpus, "--base-url", base_url, "--mode", args.mode, "--report", str(report_path)]
+            if args.real_reranker:
+                command.append("--real-reranker")
+            print(f"Running {size} resumes ({args.mode})...", flush=True)
+            subprocess.run(command, cwd=PROJECT_ROOT, check=True)
+            with open(report_path, "r", encoding="utf-8") as f:
+                results["runs"][str(size)] = json.load(f)
+            print_run(results["runs"][str(size)])
+    finally:
+        server.terminate()
+
+    out = Path(args.out) if args.out else BENCHMARK_DIR / f"{results['commit']}-{args.mode}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {out}")
+
+
+def _mb(value):
+    return f"{value / 2 ** 20:.0f}" if value else "-"
+
+
+def _ms(value):
+    return f"{value * 1000:.1f}" if value is not None else "-"
+
+
+def print_run(run):
+    print(f"\n{run['resumes']} resumes: {run['seconds']}s, {run['resumes_per_second']} resumes/s, "
+          f"peak RSS {_mb(run['peak_rss_bytes'])} MB, {run['qualified']} qualified")
+    print(f"{'stage':<28} {'seconds':>9} {'items':>7} {'items/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>7}")
+    for stage, row in run["stages"].items():
+        print(f"{stage:<28} {row['seconds']:>9.2f} {row['items'] or '-':>7} {row['items_per_second'] or '-':>9} "
+              f"{_ms(row['p50_seconds']):>8} {_ms(row['p99_seconds']):>8} {_mb(row['peak_rss_bytes']):>7}")
+
+
+def compare(baseline_path, candidate_path):
+    """Side-by-side throughput, latency and memory of two result files, e.g. from two commits."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(candidate_path, "r", encoding="utf-8") as f:
+        candidate = json.load(f)
+    print(f"baseline {baseline['commit']} ({baseline['mode']}) vs candidate {candidate['commit']} ({candidate['mode']})")
+
+    def row(label, old, new, fmt=lambda v: f"{v:.2f}"):
+        if old is None or new is None:
+            return
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+        print(f"  {label:<40} {fmt(old):>12} {fmt(new):>12} {change:>9}")
+
+    for size in sorted(set(baseline["runs"]) & set(candidate["runs"]), key=int):
+        old, new = baseline["runs"][size], candidate["runs"][size]
+        print(f"\n{size} resumes")
+        row("resumes/s", old["resumes_per_second"], new["resumes_per_second"])
+        row("peak RSS MB", old["peak_rss_bytes"], new["peak_rss_bytes"], _mb)
+        for stage in old["stages"]:
+            if stage in new["stages"]:
+                row(f"{stage} seconds", old["stages"][stage]["seconds"], new["stages"][stage]["seconds"])
+                row(f"{stage} p99 ms", old["stages"][stage]["p99_seconds"], new["stages"][stage]["p99_seconds"], _ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark against a local fake OpenAI server")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--mode", choices=["batch", "pipelined"], default="batch")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0, help="fake server request limit per minute, 0 for none")
+    parser.add_argument("--real-reranker", action="store_true", help="use the configured cross-encoder")
+    parser.add_argument("--out", help="results file, defaults to .cache/benchmarks/<commit>-<mode>.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="compare two results files")
+    # Internal: a single run inside a fresh process
+    parser.add_argument("--run-one", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--report", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    elif args.run_one:
+        run_one(args.run_one, args.corpus, args.base_url, args.mode, args.real_reranker, args.report)
+    else:
+        benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import time
+
+from src.config import DATA_DIR_NAME, RERANKER_BATCH_SIZE
+from src.prompts import FULL_CRITERIA
+from src.utils.logger import configured_logger
+from src.utils.models import call_reranker, get_reranker
+
+data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), DATA_DIR_NAME)
+
+
+def load_resumes(count):
+    resumes = []
+    for filename in sorted(os.listdir(data_dir)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(data_dir, filename), "r", encoding="utf-8", errors="replace") as file:
+                resumes.append(file.read())
+    # Repeat the sample resumes to reach the requested corpus size
+    return [resumes[i % len(resumes)] for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reranker throughput per backend on CPU")
+    parser.add_argument("--resumes", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=RERANKER_BATCH_SIZE)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    args = parser.parse_args()
+
+    resumes = load_resumes(args.resumes)
+    print(f"{'backend':>10} {'load s':>7} {'pairs/s':>9} {'total s':>8}")
+    for backend in args.backends:
+        try:
+            started = time.perf_counter()
+            get_reranker(backend=backend)
+            load_seconds = time.perf_counter() - started
+
+            call_reranker(FULL_CRITERIA, resumes[:args.batch_size], batch_size=args.batch_size, backend=backend,
+                          use_cache=False)  # warm-up
+            started = time.perf_counter()
+            call_reranker(FULL_CRITERIA, resumes, batch_size=args.batch_size, backend=backend, use_cache=False)
+            seconds = time.perf_counter() - started
+            print(f"{backend:>10} {load_seconds:>7.2f} {len(resumes) / seconds:>9.1f} {seconds:>8.2f}")
+        except Exception as e:
+            configured_logger.error(f"Benchmark for backend {backend} failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
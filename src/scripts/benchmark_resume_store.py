@@ -0,0 +1,76 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.scripts.generate_synthetic_resumes import synthetic_resume
+from src.utils.ingest import select_resumes
+from src.utils.resume_store import ResumeStore, EmbeddingMatrix
+
+
+def dict_layout(count: int, dim: int, relevant: float, qualified: float, seed: int):
+    """Shared state as dicts: text strings per filename, embeddings as lists of floats, stages as dict copies."""
+    rng = np.random.default_rng(seed)
+    resumes = {f"resume_{number}.txt": synthetic_resume(number, seed) for number in range(count)}
+    embeddings = {filename: rng.random(dim, dtype=np.float32).tolist() for filename in resumes}
+    filenames = list(resumes)
+    relevant_resumes = {filename: resumes[filename] for filename in filenames[:int(count * relevant)]}
+    qualified_resumes = {filename: resumes[filename] for filename in filenames[:int(count * qualified)]}
+    return resumes, embeddings, relevant_resumes, qualified_resumes
+
+
+def store_layout(count: int, dim: int, relevant: float, qualified: float, seed: int, path=None):
+    """Shared state as views of one ResumeStore and a float32 EmbeddingMatrix."""
+    rng = np.random.default_rng(seed)
+    resumes = ResumeStore.build(((f"resume_{number}.txt", synthetic_resume(number, seed)) for number in range(count)),
+                                path).view()
+    embeddings = EmbeddingMatrix(list(resumes), rng.random((count, dim), dtype=np.float32))
+    filenames = list(resumes)
+    relevant_resumes = select_resumes(resumes, filenames[:int(count * relevant)])
+    qualified_resumes = select_resumes(relevant_resumes, filenames[:int(count * qualified)])
+    return resumes, embeddings, relevant_resumes, qualified_resumes
+
+
+def measure(build, *args):
+    """(bytes still allocated by the result, peak bytes while building, seconds)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    state = build(*args)
+    seconds = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state
+    return current, peak, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory held by the shared state: dicts versus the ResumeStore")
+    parser.add_argument("--resumes", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536, help="embedding dimension, 1536 for text-embedding-3-small")
+    parser.add_argument("--relevant", type=float, default=0.5, help="share of resumes passing the prefilter")
+    parser.add_argument("--qualified", type=float, default=0.25, help="share of resumes passing screening")
+    parser.add_argument("--sample", type=int, default=10_000,
+                        help="resumes to build the dict layout for, scaled up to --resumes (it may not fit in memory)")
+    parser.add_argument("--mmap", metavar="PATH", help="memory-map the store's text from this file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    options = (args.dim, args.relevant, args.qualified, args.seed)
+    sample = min(args.sample, args.resumes)
+    scale = args.resumes / sample
+    dict_current, dict_peak, dict_seconds = measure(dict_layout, sample, *options)
+    store_current, store_peak, store_seconds = measure(store_layout, args.resumes, *options, args.mmap)
+
+    print(f"{args.resumes:,} resumes, {args.dim}-dimensional embeddings, {args.relevant:.0%} relevant, "
+          f"{args.qualified:.0%} qualified")
+    note = f" (measured on {sample:,}, scaled x{scale:g})" if scale != 1 else ""
+    print(f"dicts: {dict_current * scale / 2**20:,.0f} MiB held, {dict_peak * scale / 2**20:,.0f} MiB peak, "
+          f"{dict_seconds * scale:.1f}s{note}")
+    print(f"store: {store_current / 2**20:,.0f} MiB held, {store_peak / 2**20:,.0f} MiB peak, {store_seconds:.1f}s"
+          + (" (text memory-mapped, not on the heap)" if args.mmap else ""))
+    print(f"saving: {1 - store_current / (dict_current * scale):.1%} of the held memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+EMBEDDING_DIMENSIONS = 256
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+DEGREE_PATTERN = re.compile(r"\b(bachelor|master|ph\.?d)", re.IGNORECASE)
+YEARS_PATTERN = re.compile(r"(\d+)\+?\s+years? of experience", re.IGNORECASE)
+PACKED_PATTERN = re.compile(r"=== Resume: (.+?) ===\n(.*?)\n=== End of resume: \1 ===", re.DOTALL)
+
+
+def fake_embedding(text: str, dimensions=EMBEDDING_DIMENSIONS) -> np.ndarray:
+    """Hashed bag of words: deterministic, and texts sharing vocabulary get similar vectors."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        vector[zlib.crc32(token.encode("utf-8")) % dimensions] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def fake_evaluation(resume: str) -> dict:
+    """Rule-of-thumb verdict on the mandatory criteria, enough to give the pipeline realistic pass rates."""
+    name = resume.strip().splitlines()[0] if resume.strip() else "Unknown"
+    years = max((int(years) for years in YEARS_PATTERN.findall(resume)), default=0)
+    reasons = []
+    if not DEGREE_PATTERN.search(resume):
+        reasons.append("No bachelor's degree or higher")
+    if years < 3:
+        reasons.append("Less than 3 years of experience")
+    if "software" not in resume.lower():
+        reasons.append("No software development experience")
+    return {"candidate_name": name, "qualifies": not reasons, "reasons": reasons or ["Meets all mandatory criteria"]}
+
+
+def _yaml_evaluation(evaluation: dict, filename=None) -> str:
+    lines = [f"filename: {json.dumps(filename)}"] if filename is not None else []
+    lines += [f"candidate_name: {json.dumps(evaluation['candidate_name'])}",
+              f"qualifies: {str(evaluation['qualifies']).lower()}", "reasons:"]
+    lines += [f"- {json.dumps(reason)}" for reason in evaluation["reasons"]]
+    if filename is None:
+        return "\n".join(lines)
+    return "\n".join(f"- {line}" if i == 0 else f"  {line}" for i, line in enumerate(lines))
+
+
+def fake_completion(prompt: str) -> str:
+    packed = PACKED_PATTERN.findall(prompt)
+    if packed:
+        body = "\n".join(_yaml_evaluation(fake_evaluation(resume), filename=filename) for filename, resume in packed)
+    elif "Resume:\n" in prompt:
+        resume = prompt.split("Resume:\n", 1)[1].split("Return your evaluation", 1)[0]
+        body = _yaml_evaluation(fake_evaluation(resume))
+    else:
+        body = "A fake response."
+    return f"```yaml\n{body}\n```"
+
+
+def count_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class _RequestLimiter:
+    """Fixed one-minute window, enough to exercise the client's 429 handling."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.window_start = time.monotonic()
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        if not self.per_minute:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            if now - self.window_start >= 60:
+                self.window_start, self.count = now, 0
+            if self.count >= self.per_minute:
+                return 60 - (now - self.window_start)
+            self.count += 1
+            return 0.0
+
+
+def make_handler(latency_ms=50.0, jitter_ms=20.0, error_rate=0.0, requests_per_minute=0, seed=0):
+    limiter = _RequestLimiter(requests_per_minute)
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    class FakeOpenAIHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, as with the real API
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                self._reply(200, stats)
+            else:
+                self._reply(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with rng_lock:
+                stats["requests"] += 1
+            wait = limiter.retry_after()
+            if wait:
+                with rng_lock:
+                    stats["rate_limited"] += 1
+                self._reply(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                            {"retry-after": f"{wait:.2f}"})
+                return
+            with rng_lock:
+                delay = max(0.0, rng.gauss(latency_ms, jitter_ms)) / 1000
+                failed = rng.random() < error_rate
+                stats["errors"] += failed
+            time.sleep(delay)
+            if failed:
+                self._reply(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+                return
+
+            if self.path.endswith("/chat/completions"):
+                prompt = "\n".join(message.get("content", "") for message in request.get("messages", []))
+                content = fake_completion(prompt)
+                prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(content)
+                self._reply(200, {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                    "model": request.get("model"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+            elif self.path.endswith("/embeddings"):
+                inputs = request.get("input", [])
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                as_base64 = request.get("encoding_format") == "base64"
+                data = []
+                for index, text in enumerate(inputs):
+                    vector = fake_embedding(text)
+                    embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii") if as_base64 \
+                        else vector.tolist()
+                    data.append({"object": "embedding", "index": index, "embedding": embedding})
+                tokens = sum(count_tokens(text) for text in inputs)
+                self._reply(200, {"object": "list", "data": data, "model": request.get("model"),
+                                  "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+            else:
+                self._reply(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+    return FakeOpenAIHandler
+
+
+def serve(host="127.0.0.1", port=8089, latency_ms=50.0, jitter_ms=20.0, error_rate=0.0, requests_per_minute=0,
+          ready=None):
+    """Serve chat completions and embeddings at http://host:port/v1 until the process is stopped."""
+    server = ThreadingHTTPServer((host, port), make_handler(latency_ms, jitter_ms, error_rate, requests_per_minute))
+    server.daemon_threads = True
+    if ready is not None:
+        ready.put(server.server_address[1])  # the real port when 0 was asked for
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI chat completions and embeddings API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before HTTP 429, 0 for no limit")
+    args = parser.parse_args()
+    print(f"Serving on http://{args.host}:{args.port}/v1 (set OPENAI_BASE_URL to use it)")
+    serve(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.rpm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import datetime
+import os
+import random
+
+from src.config import DATA_DIR_NAME
+
+data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), DATA_DIR_NAME)
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Robin",
+               "Drew", "Kai", "Noa", "Sasha", "Yuki", "Ravi", "Lena", "Omar", "Ines"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Okafor", "Novak", "Silva", "Kowalski", "Haddad", "Ito", "Larsen",
+              "Moreau", "Patel", "Nguyen", "Rossi", "Schmidt", "Kim", "Ahmed", "Costa", "Berg", "Ward"]
+TECH_SKILLS = ["Python", "Java", "Go", "TypeScript", "C++", "Rust", "SQL", "Docker", "Kubernetes", "AWS", "Azure",
+               "Google Cloud", "React", "Django", "Spark", "Kafka", "Terraform", "Git", "CI/CD", "PyTorch"]
+OTHER_SKILLS = ["Customer service", "Bookkeeping", "Event planning", "Copywriting", "Retail merchandising",
+                "Cooking", "Photography", "Social media", "Sales", "Scheduling"]
+TECH_TITLES = ["Software Engineer", "Backend Developer", "Full Stack Developer", "Data Engineer",
+               "Site Reliability Engineer", "Machine Learning Engineer"]
+OTHER_TITLES = ["Store Manager", "Chef", "Marketing Coordinator", "Office Administrator", "Graphic Designer"]
+TECH_FIELDS = ["Computer Science", "Software Engineering", "Computer Engineering", "Information Technology"]
+OTHER_FIELDS = ["Art History", "Hospitality Management", "Communications", "Culinary Arts"]
+DEGREES = ["Bachelor of Science", "Master of Science", "Ph.D."]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Enterprises",
+             "Vandelay Industries", "Soylent", "Cyberdyne"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+# Fixed so a resume is the same text on every day it is generated; pre-screen it with today=REFERENCE_DATE
+REFERENCE_DATE = datetime.date(2025, 6, 15)
+
+
+def condition_generator(number):
+    """Same qualifying share as generate_resume.py: every fourth resume passes the criteria."""
+    return number % 4 == 0
+
+
+def _jobs(rng: random.Random, total_years: int, titles):
+    """Back-to-back positions adding up to `total_years` until REFERENCE_DATE, most recent first."""
+    jobs, end = [], REFERENCE_DATE.year
+    month = MONTHS[REFERENCE_DATE.month - 1]
+    remaining = total_years
+    while remaining > 0:
+        years = min(remaining, rng.randint(1, 4))
+        start = end - years
+        end_label = "Present" if end == REFERENCE_DATE.year else f"{month} {end}"
+        jobs.append((rng.choice(titles), rng.choice(COMPANIES), f"{month} {start}", end_label))
+        end, remaining = start, remaining - years
+    return jobs
+
+
+def synthetic_resume(number: int, seed: int = 0) -> str:
+    """
+    A plain-text resume for 'Candidate {number}', deterministic for (number, seed). Qualifying resumes
+    meet every mandatory criterion; the others miss exactly one (degree, experience or technical skills).
+    """
+    rng = random.Random(seed * 1_000_003 + number)
+    qualifies = condition_generator(number)
+    missing = None if qualifies else rng.choice(["degree", "experience", "skills"])
+
+    technical = missing != "skills"
+    years = rng.randint(1, 2) if missing == "experience" else rng.randint(3, 15)
+    titles = TECH_TITLES if technical else OTHER_TITLES
+    skills = rng.sample(TECH_SKILLS if technical else OTHER_SKILLS, 6)
+    if missing == "degree":
+        education = f"High School Diploma, {rng.choice(['Lincoln', 'Roosevelt', 'Central'])} High School"
+    else:
+        field = rng.choice(TECH_FIELDS if technical else OTHER_FIELDS)
+        education = f"{rng.choice(DEGREES)} in {field}, University of {rng.choice(['Springfield', 'Riverside', 'Lakeview'])}"
+
+    summary = (f"{titles[0]} with {years} years of experience in software development and software engineering."
+               if technical else f"{titles[0]} with {years} years of experience.")
+    lines = [f"Candidate {number}", f"candidate{number}@example.com", "", "SUMMARY", summary, "", "EXPERIENCE"]
+    for title, company, start, end in _jobs(rng, years, titles):
+        lines.append(f"{title}, {company} ({start} - {end})")
+        lines.append(f"- Worked on {rng.choice(skills)} and {rng.choice(skills)} projects with a team of "
+                     f"{rng.randint(3, 12)}.")
+    lines += ["", "EDUCATION", education, "", "SKILLS", ", ".join(skills)]
+    return "\n".join(lines) + "\n"
+
+
+def write_corpus(count: int, out_dir: str = data_dir, seed: int = 0) -> str:
+    """Write resume_0.txt .. resume_{count-1}.txt to `out_dir`, skipping files that already exist."""
+    os.makedirs(out_dir, exist_ok=True)
+    for number in range(count):
+        path = os.path.join(out_dir, f"resume_{number}.txt")
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(synthetic_resume(number, seed))
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic resumes offline, without an LLM")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--out", default=data_dir)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"Wrote {args.count} resumes to {write_corpus(args.count, args.out, args.seed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Hand-written resumes that meet MANDATORY_CRITERIA, in layouts generate_synthetic_resumes.py never produces:
+other date formats, degrees spelled out or abbreviated, experience stated in words, undated earlier careers.
+The pre-screen rules were not tuned on them, so a rejection here is a false reject.
+"""
+
+HOLDOUT_QUALIFIED_RESUMES = {
+    "european_dates.txt": """Mara Jensen
+Senior Software Engineer
+Berufserfahrung
+03.2016 – 11.2019  Backend-Entwicklerin, Zalando SE (Python, Kafka)
+12.2019 – heute    Senior Software Engineer, N26 (Go, Kubernetes)
+Ausbildung
+M.Sc. Informatik, TU München
+""",
+    "bcom_one_recent_role.txt": """Rohan Mehta
+Ten years of experience building payment systems in Java and Python.
+Lead Engineer, Razorpay (Jan 2024 - Present)
+Education: B.Com, University of Mumbai; self-taught in algorithms and distributed systems
+Skills: Java, Python, PostgreSQL, AWS, Docker
+""",
+    "ab_degree.txt": """Eleanor Park
+A.B. in Computer Science, Harvard College, 2012
+Software Engineer, Stripe, 2018 to present
+Software Engineer, Dropbox, 2012 to 2018
+Python, Go, Terraform, AWS
+""",
+    "sb_degree.txt": """Tomás Ortega
+S.B. Electrical Engineering and Computer Science, MIT
+Over a decade of experience in site reliability and infrastructure.
+Staff SRE @ Datadog    06/2021 - now
+Skills: Kubernetes, Terraform, Go, Prometheus
+""",
+    "university_and_field_only.txt": """Priya Natarajan
+EDUCATION
+University of Toronto, Computer Science (2010-2014)
+EXPERIENCE
+Shopify, Backend Developer (2014-2019)
+Wealthsimple, Senior Developer (2019-Present)
+Ruby, Rails, TypeScript, React, GCP
+""",
+    "since_year.txt": """Jonas Weber
+Freelance full-stack developer since 2013.
+Current contract: Frontend Engineer, Delivery Hero (Feb 2025 - Present)
+Diplom-Informatiker, Universität Hamburg
+React, TypeScript, Node.js, Docker, CI/CD
+""",
+    "graduation_year_before_role.txt": """Chloé Martin
+Bachelor of Engineering (Software), Université de Montréal, 2008
+Principal Engineer, Ubisoft (Sep 2024 - Present)
+Previously: engine and tools programmer at several studios
+C++, Python, Git, Jenkins
+""",
+    "bba_words.txt": """Daniel Kim
+BBA, Yonsei University; Master of Computer Science (online), University of Illinois
+Fifteen years' experience in data engineering.
+Data Platform Lead — Coupang — 2023 – present
+Spark, Kafka, Airflow, SQL, AWS
+""",
+}
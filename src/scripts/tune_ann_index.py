@@ -0,0 +1,50 @@
+import argparse
+import tempfile
+
+import numpy as np
+
+from src.utils.ann_index import IVFIndex, measure_recall, index_directory
+from src.utils.logger import configured_logger
+from src.utils.models import get_embedding_provider
+
+
+def synthetic_index(size: int, dim: int, clusters: int, seed=0) -> IVFIndex:
+    """Clustered random vectors, roughly how resume embeddings group by role."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(clusters, size=size)] + 0.5 * rng.normal(size=(size, dim))
+    index = IVFIndex(directory=tempfile.mkdtemp())
+    index.upsert([f"resume_{i}.txt" for i in range(size)], vectors)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall and latency of the IVF prefilter index vs brute force")
+    parser.add_argument("--synthetic", type=int, default=0, help="benchmark N synthetic vectors instead of the index")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    directory = index_directory(get_embedding_provider().model)
+    index = synthetic_index(args.synthetic, args.dim, clusters=64) if args.synthetic else IVFIndex(directory)
+    if not len(index):
+        configured_logger.error(f"ANN index at {directory} is empty, run the flow with PREFILTER_INDEX='ivf'")
+        return
+
+    rng = np.random.default_rng(1)
+    live_rows = np.fromiter(index.rows.values(), dtype=np.int64)
+    # Perturbed stored vectors stand in for criteria embeddings that land near real resumes
+    queries = [np.asarray(index.vectors[row]) + 0.1 * rng.normal(size=index.dim)
+               for row in rng.choice(live_rows, min(args.queries, len(live_rows)), replace=False)]
+
+    print(f"{len(index)} vectors, {len(index.centroids)} lists, k={args.k}")
+    print(f"{'nprobe':>6} {'recall':>7} {'ivf ms':>8} {'exact ms':>9}")
+    for nprobe in args.nprobe:
+        result = measure_recall(index, queries, args.k, nprobe=nprobe)
+        print(f"{nprobe:>6} {result['recall']:>7.3f} {result['ann_ms']:>8.2f} {result['exact_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
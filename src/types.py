@@ -1,5 +1,11 @@
 # src/types.py
-from typing import TypedDict, List, Dict, Any
+from typing import List, Dict, Any, Mapping, Tuple, Union
+
+# pydantic only accepts typing_extensions.TypedDict before Python 3.12
+from typing_extensions import TypedDict
+
+from src.utils.ingest import LazyResumes
+from src.utils.resume_store import ResumeRecord, ResumeView, EmbeddingMatrix
 
 
 class Evaluation(TypedDict):
@@ -8,29 +14,27 @@ class Evaluation(TypedDict):
     reasons: List[str]
 
 
-class ResumeRecord(TypedDict, total=False):
-    # total=False makes everything optional, since not all fields
-    # exist until later in the pipeline
-    text: str
-    embedding: List[float]
-    passes_hard_filter: bool
-    filter_reasons: List[str]
-    score: float
-    rank: int
-    evaluation: Evaluation
+# ResumeRecord is a __slots__ record materialized from the ResumeStore on demand: id, filename and text.
+# The store keeps every text once in one buffer; stage outputs are ResumeViews, integer id arrays into it.
+Resumes = Union[ResumeView, LazyResumes]  # LazyResumes when RESUME_INGESTION is "lazy"
 
 
 class SharedState(TypedDict, total=False):
-    # after ReadResumesNode
-    RESUMES: Dict[str, str]
+    # after ReadResumesNode: a view of every resume in the store
+    RESUMES: Resumes
     # after EmbedCriteriaNode
     CRITERIA_EMBEDDING: List[float]
+    # after EmbedResumesNode: one float32 row per resume
+    RESUME_EMBEDDINGS: EmbeddingMatrix
+    # after PrefilterResumesNode: a view of the same store
+    RELEVANT_RESUMES: Resumes
+    RESUME_SIMILARITIES: Dict[str, float]
     # after FilterResumesNode
     EVALUATIONS: Dict[str, Evaluation]
     FILTER_SUMMARY: Dict[str, Any]
-    QUALIFIED_RESUMES: Dict[str, ResumeRecord]
-    # after RankResumeNode
-    RANKED_RESUMES: Any
+    QUALIFIED_RESUMES: Resumes
+    # after RankResumeNode: best-first (filename, score) of the top SCREENING_TOP_N, a RankedList with .total
+    RANKED_RESUMES: List[Tuple[str, float]]
     # after ProcessRankResultsNode
     RANKING_SUMMARY: Dict[str, Any]
     RANKED_FILENAMES: List[str]
@@ -44,13 +48,18 @@ from typing import Dict, List, Optional
 
 class SharedStateModel(BaseModel):
     # after ReadResumesNode
-    RESUMES: Optional[Dict[str, ResumeRecord]]
+    RESUMES: Optional[Resumes]
     # after EmbedCriteriaNode
     CRITERIA_EMBEDDING: Optional[List[float]]
+    # after EmbedResumesNode
+    RESUME_EMBEDDINGS: Optional[EmbeddingMatrix]
+    # after PrefilterResumesNode
+    RELEVANT_RESUMES: Optional[Resumes]
+    RESUME_SIMILARITIES: Optional[Dict[str, float]]
     # after FilterResumesNode
     EVALUATIONS: Optional[Dict[str, Evaluation]]
     FILTER_SUMMARY: Optional[Dict]
-    QUALIFIED_RESUMES: Optional[Dict[str, ResumeRecord]]
+    QUALIFIED_RESUMES: Optional[Resumes]
     # after RankResumeNode
     RANKED_RESUMES: Optional[List]
     # after ProcessRankResultsNode
@@ -60,3 +69,4 @@ class SharedStateModel(BaseModel):
 
     class Config:
         extra = "forbid"  # disallow unexpected keys
+        arbitrary_types_allowed = True  # store views and matrices are checked with isinstance, never copied
@@ -0,0 +1,271 @@
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.config import ANN_INDEX_DIR, ANN_NLIST, ANN_NPROBE, ANN_KMEANS_ITERATIONS, ANN_TRAIN_POINTS_PER_LIST, \
+    ANN_RETRAIN_GROWTH, ANN_COMPACT_TOMBSTONE_RATIO
+from src.utils.logger import configured_logger
+from src.utils.similarity import normalize_rows, select_candidates
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+ASSIGNMENTS_FILE = "assignments.i32"
+CENTROIDS_FILE = "centroids.npy"
+ASSIGN_CHUNK_ROWS = 65536
+
+
+def index_directory(model: str, root=ANN_INDEX_DIR) -> str:
+    """One index per embedding model, named like its embedding cache: vectors of different models are not comparable."""
+    return os.path.join(root, re.sub(r"[^A-Za-z0-9_.-]", "_", model))
+
+
+def train_centroids(vectors: np.ndarray, rows: np.ndarray, nlist: int, iterations=ANN_KMEANS_ITERATIONS,
+                    seed=0) -> np.ndarray:
+    """Spherical k-means on a sample of the normalized `vectors` at `rows`."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(rows), nlist * ANN_TRAIN_POINTS_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(rows, sample_size, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        empty = np.bincount(assignments, minlength=nlist) == 0
+        # Re-seed empty lists with random points so no centroid is wasted
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def assign_to_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK_ROWS):
+        chunk = np.asarray(vectors[start:start + ASSIGN_CHUNK_ROWS], dtype=np.float32)
+        assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+class IVFIndex:
+    """
+    Persistent inverted-file (IVF) index for cosine similarity over resume embeddings.
+    Vectors are appended to a memory-mapped float32 file and bucketed by their nearest k-means centroid;
+    a query only scans the `nprobe` buckets closest to it. Replaced or removed ids are tombstoned.
+    """
+
+    def __init__(self, directory=ANN_INDEX_DIR, nlist=ANN_NLIST, nprobe=ANN_NPROBE):
+        self.directory = PROJECT_ROOT / directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.nlist = nlist
+        self.nprobe = nprobe
+
+        self.dim: Optional[int] = None
+        self.ids: List[Optional[str]] = []  # row -> id, None once tombstoned
+        self.versions: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}  # live id -> row
+        self.trained_size = 0
+        self.centroids: Optional[np.ndarray] = None
+        self.vectors: Optional[np.memmap] = None
+        self.assignments: Optional[np.memmap] = None
+        self._lists: Optional[List[np.ndarray]] = None
+        self._load()
+
+    # ----- persistence -----
+
+    def _load(self):
+        meta_path = self.directory / META_FILE
+        if not meta_path.exists():
+            return
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.dim, self.trained_size = meta["dim"], meta["trained_size"]
+            self.ids, self.versions = meta["ids"], meta["versions"]
+            self.rows = {row_id: row for row, row_id in enumerate(self.ids) if row_id is not None}
+            self._open_arrays()
+            if (self.directory / CENTROIDS_FILE).exists():
+                self.centroids = np.load(self.directory / CENTROIDS_FILE)
+        except Exception as e:
+            configured_logger.error(f"Discarding unreadable ANN index {self.directory}: {e}")
+            self.dim, self.ids, self.versions, self.rows, self.centroids = None, [], [], {}, None
+
+    def _open_arrays(self):
+        if not self.ids:
+            self.vectors, self.assignments = None, None
+            return
+        self.vectors = np.memmap(self.directory / VECTORS_FILE, dtype=np.float32, mode="r",
+                                 shape=(len(self.ids), self.dim))
+        self.assignments = np.memmap(self.directory / ASSIGNMENTS_FILE, dtype=np.int32, mode="r+",
+                                     shape=(len(self.ids),))
+
+    def save(self):
+        if self.ids and len(self.ids) - len(self.rows) > len(self.ids) * ANN_COMPACT_TOMBSTONE_RATIO:
+            self.compact()
+        if self.centroids is not None:
+            np.save(self.directory / CENTROIDS_FILE, self.centroids)
+        meta = {"dim": self.dim, "trained_size": self.trained_size, "ids": self.ids, "versions": self.versions}
+        tmp_path = self.directory / (META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.directory / META_FILE)
+
+    def compact(self):
+        """Rewrite the vector and assignment files without tombstoned rows; centroids stay valid."""
+        live = np.fromiter((row for row, row_id in enumerate(self.ids) if row_id is not None), dtype=np.int64)
+        vectors = np.asarray(self.vectors[live]) if len(live) else np.empty((0, self.dim or 0), dtype=np.float32)
+        assignments = np.asarray(self.assignments[live]) if len(live) else np.empty(0, dtype=np.int32)
+        # Drop the maps before their files are replaced. save() writes the meta last: a crash in between leaves
+        # files shorter than the old meta expects, which _load discards rather than misreading rows.
+        self.vectors, self.assignments = None, None
+        for name, array in ((VECTORS_FILE, vectors), (ASSIGNMENTS_FILE, assignments)):
+            tmp_path = self.directory / (name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(array.tobytes())
+            os.replace(tmp_path, self.directory / name)
+        dropped = len(self.ids) - len(live)
+        self.ids = [self.ids[row] for row in live.tolist()]
+        self.versions = [self.versions[row] for row in live.tolist()]
+        self.rows = {row_id: row for row, row_id in enumerate(self.ids)}
+        self._open_arrays()
+        self._lists = None
+        configured_logger.info(f"Compacted ANN index: dropped {dropped} tombstoned rows, {len(self.ids)} remain")
+
+    # ----- updates -----
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, row_id: str) -> bool:
+        return row_id in self.rows
+
+    def version(self, row_id: str) -> Optional[str]:
+        row = self.rows.get(row_id)
+        return None if row is None else self.versions[row]
+
+    def remove(self, row_ids: Iterable[str]):
+        for row_id in row_ids:
+            row = self.rows.pop(row_id, None)
+            if row is not None:
+                self.ids[row] = None
+                self.versions[row] = None
+        self._lists = None
+
+    def upsert(self, row_ids: List[str], embeddings: List, versions: Optional[List[str]] = None):
+        """Add new ids and replace ids whose version changed; unchanged ids are skipped."""
+        versions = versions or [None] * len(row_ids)
+        pending = [(row_id, embedding, version) for row_id, embedding, version in zip(row_ids, embeddings, versions)
+                   if row_id not in self.rows or version is None or self.version(row_id) != version]
+        if not pending:
+            return 0
+
+        self.remove(row_id for row_id, _, _ in pending)
+        matrix = normalize_rows(np.array([embedding for _, embedding, _ in pending], dtype=np.float32, ndmin=2))
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match index dimension {self.dim}")
+
+        start = len(self.ids)
+        with open(self.directory / VECTORS_FILE, "ab") as f:
+            f.truncate(start * self.dim * 4)  # drop any partial write from an interrupted run
+            f.write(matrix.tobytes())
+        assignments = (assign_to_centroids(matrix, self.centroids) if self.centroids is not None
+                       else np.zeros(len(matrix), dtype=np.int32))
+        with open(self.directory / ASSIGNMENTS_FILE, "ab") as f:
+            f.truncate(start * 4)
+            f.write(assignments.tobytes())
+
+        for offset, (row_id, _, version) in enumerate(pending):
+            self.ids.append(row_id)
+            self.versions.append(version)
+            self.rows[row_id] = start + offset
+        self._open_arrays()
+        self._lists = None
+
+        if self.centroids is None or len(self.rows) > self.trained_size * ANN_RETRAIN_GROWTH:
+            self.train()
+        return len(pending)
+
+    def train(self):
+        """(Re)cluster the live vectors and reassign every row to its nearest centroid."""
+        if not self.rows:
+            return
+        live_rows = np.fromiter(self.rows.values(), dtype=np.int64)
+        nlist = min(self.nlist or max(1, int(4 * np.sqrt(len(live_rows)))), len(live_rows))
+        started = time.perf_counter()
+        self.centroids = train_centroids(self.vectors, live_rows, nlist)
+        self.assignments[:] = assign_to_centroids(self.vectors, self.centroids)
+        self.assignments.flush()
+        self.trained_size = len(live_rows)
+        self._lists = None
+        configured_logger.info(
+            f"Trained IVF index: {nlist} lists over {len(live_rows)} vectors in {time.perf_counter() - started:.2f}s")
+
+    # ----- queries -----
+
+    def _inverted_lists(self) -> List[np.ndarray]:
+        if self._lists is None:
+            live = np.array([row_id is not None for row_id in self.ids], dtype=bool)
+            rows = np.flatnonzero(live)
+            assignments = np.asarray(self.assignments)[rows]
+            order = np.argsort(assignments, kind="stable")
+            bounds = np.searchsorted(assignments[order], np.arange(len(self.centroids) + 1))
+            self._lists = [rows[order[bounds[i]:bounds[i + 1]]] for i in range(len(self.centroids))]
+        return self._lists
+
+    def search(self, query, threshold: float = -1.0, k: Optional[int] = None,
+               nprobe: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+        """Ids and cosine scores of the vectors above `threshold` (at most k), best first."""
+        if not self.rows:
+            return [], np.empty(0, dtype=np.float32)
+        if self.centroids is None:
+            self.train()
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        lists = self._inverted_lists()
+        nprobe = min(nprobe or self.nprobe, len(lists))
+        probed = np.argpartition(self.centroids @ query, -nprobe)[-nprobe:]
+        candidates = np.sort(np.concatenate([lists[i] for i in probed]))
+
+        scores = np.asarray(self.vectors[candidates]) @ query
+        selected = select_candidates(scores, threshold, k)
+        return [self.ids[candidates[i]] for i in selected], scores[selected]
+
+    def exact_search(self, query, threshold: float = -1.0, k: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+        """Brute-force search over every live vector, the ground truth for recall checks."""
+        if not self.rows:
+            return [], np.empty(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        rows = np.sort(np.fromiter(self.rows.values(), dtype=np.int64))
+        scores = np.asarray(self.vectors[rows]) @ query
+        selected = select_candidates(scores, threshold, k)
+        return [self.ids[rows[i]] for i in selected], scores[selected]
+
+
+def measure_recall(index: IVFIndex, queries, k: int, nprobe: Optional[int] = None) -> Dict[str, float]:
+    """Average recall@k of the IVF search against brute force, with mean query latencies."""
+    recalls, ann_seconds, exact_seconds = [], 0.0, 0.0
+    for query in queries:
+        started = time.perf_counter()
+        approximate, _ = index.search(query, k=k, nprobe=nprobe)
+        ann_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        exact, _ = index.exact_search(query, k=k)
+        exact_seconds += time.perf_counter() - started
+
+        recalls.append(len(set(approximate) & set(exact)) / max(len(exact), 1))
+    return {
+        "recall": float(np.mean(recalls)) if recalls else 1.0,
+        "ann_ms": ann_seconds / max(len(recalls), 1) * 1000,
+        "exact_ms": exact_seconds / max(len(recalls), 1) * 1000,
+    }
@@ -0,0 +1,125 @@
+import re
+import zlib
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+
+from src.config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_SHINGLE_SIZE
+from src.utils.ranking import RankedList, rank_top_n
+
+TOKEN_PATTERN = re.compile(r"\w+")
+MERSENNE_PRIME = (1 << 31) - 1  # keeps a * x + b below 2**63, so the permutations stay in uint64
+
+
+def shingles(text: str, size=DEDUP_SHINGLE_SIZE) -> np.ndarray:
+    """Distinct hashed word n-grams of the text; case and whitespace do not matter."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        tokens = tokens + [""] * (size - len(tokens))
+    grams = {zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8")) for i in range(len(tokens) - size + 1)}
+    return np.fromiter(grams, dtype=np.uint64, count=len(grams))
+
+
+class MinHasher:
+    """MinHash signatures: the share of equal signature entries estimates the Jaccard similarity of two shingle sets."""
+
+    def __init__(self, num_perm=DEDUP_NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingles(text) % np.uint64(MERSENNE_PRIME)
+        return ((np.outer(hashes, self.a) + self.b) % np.uint64(MERSENNE_PRIME)).min(axis=0).astype(np.uint32)
+
+
+def lsh_bands(threshold: float, num_perm: int, false_negative_weight=0.7) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows <= num_perm for LSH banding. A pair with Jaccard s shares a bucket with
+    probability 1 - (1 - s^rows)^bands; this minimizes the weighted area of that curve below the threshold
+    (false positives) and above it (false negatives). Misses weigh more: candidates are verified anyway.
+    """
+    below = np.linspace(0, threshold, 200)
+    above = np.linspace(threshold, 1, 200)
+    best, best_cost = (num_perm, 1), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positives = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+            false_negatives = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+            cost = (1 - false_negative_weight) * false_positives + false_negative_weight * false_negatives
+            if cost < best_cost:
+                best, best_cost = (bands, rows), cost
+    return best
+
+
+def minhash_signatures(texts: Iterable[Tuple[str, str]], num_perm=DEDUP_NUM_PERM) -> Tuple[List[str], np.ndarray]:
+    """The ids and one MinHash signature row per text, in input order."""
+    hasher = MinHasher(num_perm)
+    ids, signatures = [], []
+    for resume_id, text in texts:
+        ids.append(resume_id)
+        signatures.append(hasher.signature(text))
+    return ids, np.vstack(signatures) if signatures else np.empty((0, num_perm), dtype=np.uint32)
+
+
+def near_duplicate_clusters(texts: Iterable[Tuple[str, str]], threshold=DEDUP_THRESHOLD,
+                            num_perm=DEDUP_NUM_PERM) -> List[List[str]]:
+    """
+    Clusters of two or more ids whose texts have an estimated Jaccard similarity of at least `threshold`,
+    directly or through a chain of such pairs. Only ids sharing an LSH bucket are compared, so the cost
+    grows with the number of texts rather than the number of pairs. Each cluster is sorted by id.
+    """
+    return signature_clusters(*minhash_signatures(texts, num_perm), threshold)
+
+
+def signature_clusters(ids: List[str], matrix: np.ndarray, threshold=DEDUP_THRESHOLD) -> List[List[str]]:
+    """near_duplicate_clusters over signatures already computed by minhash_signatures."""
+    if not ids:
+        return []
+    bands, rows = lsh_bands(threshold, matrix.shape[1])
+
+    parent = list(range(len(ids)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        buckets: Dict[bytes, int] = {}
+        for row, key in enumerate(map(bytes, matrix[:, band * rows:(band + 1) * rows])):
+            first = buckets.setdefault(key, row)
+            if first == row:
+                continue
+            root, other = find(first), find(row)
+            # Verify on the full signature, a shared bucket alone can be a false positive
+            if root != other and np.mean(matrix[first] == matrix[row]) >= threshold:
+                parent[max(root, other)] = min(root, other)
+
+    clusters: Dict[int, List[str]] = {}
+    for row in range(len(ids)):
+        clusters.setdefault(find(row), []).append(ids[row])
+    return sorted(sorted(cluster) for cluster in clusters.values() if len(cluster) > 1)
+
+
+def duplicate_map(clusters: List[List[str]]) -> Dict[str, str]:
+    """duplicate id -> representative id, the representative being the first id of its cluster."""
+    return {duplicate: cluster[0] for cluster in clusters for duplicate in cluster[1:]}
+
+
+def expand_ranking(ranked: RankedList, duplicates: Mapping[str, str], ranked_ids: Iterable[str],
+                   n: int) -> RankedList:
+    """
+    Add the duplicates of ranked representatives with their representative's score. Duplicates outside the
+    top n can only tie with the last entry, so the top n of the ranked representatives and their duplicates
+    is the top n of everything. `ranked_ids` are all ids that were ranked, for the total.
+    """
+    by_representative: Dict[str, List[str]] = {}
+    for duplicate, representative in duplicates.items():
+        by_representative.setdefault(representative, []).append(duplicate)
+    pairs = [(duplicate, score) for filename, score in ranked for duplicate in by_representative.get(filename, ())]
+    expanded = rank_top_n(list(ranked) + pairs, n)
+    expanded.total = ranked.total + sum(len(by_representative.get(resume_id, ())) for resume_id in ranked_ids)
+    return expanded
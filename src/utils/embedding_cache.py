@@ -0,0 +1,252 @@
+import hashlib
+import heapq
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.config import EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_CACHE_ENABLED, EMBEDDING_MODEL
+from src.utils.logger import configured_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+INDEX_FILE = "index.json"
+VECTORS_FILE = "vectors.f32"
+LOCK_FILE = "lock"
+INITIAL_CAPACITY = 1024
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache for one model.
+    Vectors live in a memory-mapped float32 matrix, the index maps sha256(text) -> (row, last used).
+    Least recently used entries are evicted once max_entries is reached.
+    Safe to share between threads and processes (shard workers): writers hold an exclusive file lock and
+    re-read the index before allocating rows whenever another process changed it, and so do readers.
+    """
+
+    def __init__(self, model: str, cache_dir=EMBEDDING_CACHE_DIR, max_entries=EMBEDDING_CACHE_MAX_ENTRIES):
+        self.model = model
+        self.max_entries = max_entries
+        self.directory = PROJECT_ROOT / cache_dir / re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.dim: Optional[int] = None
+        self.capacity = 0
+        self.clock = 0
+        self.entries: Dict[str, List[int]] = {}  # digest -> [row, last used]
+        self.vectors: Optional[np.memmap] = None
+        self._lock = threading.RLock()
+        self._index_version_loaded = None
+        with self._locked(exclusive=False):
+            self._load()
+
+    @contextmanager
+    def _locked(self, exclusive=True):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.directory / LOCK_FILE, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _index_version(self):
+        try:
+            stat = (self.directory / INDEX_FILE).stat()
+            # The index is replaced, never rewritten in place, so a new write also means a new inode
+            return stat.st_ino, stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        """Pick up what other processes wrote, keeping this process's more recent use times."""
+        version = self._index_version()
+        if version is None or version == self._index_version_loaded:
+            return
+        used = {digest: tuple(entry) for digest, entry in self.entries.items()}
+        clock = self.clock
+        self._load()
+        for digest, entry in self.entries.items():
+            mine = used.get(digest)
+            if mine is not None and mine[0] == entry[0]:
+                entry[1] = max(entry[1], mine[1])
+        self.clock = max(self.clock, clock)
+
+    def _load(self):
+        index_path = self.directory / INDEX_FILE
+        if not index_path.exists():
+            return
+        self._index_version_loaded = self._index_version()
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.vectors = None
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.dim, self.capacity, self.clock = index["dim"], index["capacity"], index["clock"]
+            self.entries = index["entries"]
+            if self.dim:
+                self.vectors = np.memmap(self.directory / VECTORS_FILE, dtype=np.float32, mode="r+",
+                                         shape=(self.capacity, self.dim))
+        except Exception as e:
+            configured_logger.error(f"Discarding unreadable embedding cache {self.directory}: {e}")
+            self.dim, self.capacity, self.clock, self.entries, self.vectors = None, 0, 0, {}, None
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self.capacity:
+            return
+        capacity = max(self.capacity * 2, rows, INITIAL_CAPACITY)
+        if self.vectors is not None:
+            self.vectors.flush()
+            del self.vectors
+        with open(self.directory / VECTORS_FILE, "ab") as f:
+            f.truncate(capacity * self.dim * np.dtype(np.float32).itemsize)
+        self.vectors = np.memmap(self.directory / VECTORS_FILE, dtype=np.float32, mode="r+",
+                                 shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def _evict(self, count: int):
+        """Drop the `count` least recently used entries, freeing their rows."""
+        oldest = heapq.nsmallest(count, self.entries.items(), key=lambda entry: entry[1][1])
+        for digest, _ in oldest:
+            del self.entries[digest]
+        self.evictions += len(oldest)
+
+    def __contains__(self, text: str) -> bool:
+        with self._locked(exclusive=False):
+            self._refresh()
+            return text_digest(text) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        with self._locked(exclusive=False):
+            self._refresh()
+            return self._get_many(texts)
+
+    def _get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        results = []
+        for text in texts:
+            entry = self.entries.get(text_digest(text))
+            if entry is None:
+                self.misses += 1
+                results.append(None)
+                continue
+            self.hits += 1
+            self.clock += 1
+            entry[1] = self.clock
+            results.append(self.vectors[entry[0]].tolist())
+        return results
+
+    def put_many(self, texts: List[str], embeddings: List[Optional[List[float]]]):
+        # Free rows are computed from the latest index, two writers could otherwise share a row.
+        # The index is written before the lock is released so the next writer sees the rows taken.
+        with self._locked():
+            self._refresh()
+            self._put_many(texts, embeddings)
+            self._flush()
+
+    def _put_many(self, texts: List[str], embeddings: List[Optional[List[float]]]):
+        new_items = {text_digest(text): embedding for text, embedding in zip(texts, embeddings) if embedding}
+        if not new_items:
+            return
+        if self.dim is None:
+            self.dim = len(next(iter(new_items.values())))
+
+        new_digests = [digest for digest in new_items if digest not in self.entries]
+        overflow = len(self.entries) + len(new_digests) - self.max_entries
+        if overflow > 0:
+            self._evict(overflow)
+        used_rows = {row for row, _ in self.entries.values()}
+        free_rows = [row for row in range(self.capacity) if row not in used_rows]
+
+        needed = len(new_digests) - len(free_rows)
+        if needed > 0:
+            start = self.capacity
+            self._ensure_capacity(start + needed)
+            free_rows += list(range(start, self.capacity))
+        free_rows.reverse()
+
+        for digest, embedding in new_items.items():
+            if len(embedding) != self.dim:
+                configured_logger.error(f"Skipping embedding of dimension {len(embedding)}, cache holds {self.dim}")
+                continue
+            self.clock += 1
+            if digest in self.entries:
+                self.entries[digest][1] = self.clock
+                continue
+            row = free_rows.pop()
+            self.vectors[row] = np.asarray(embedding, dtype=np.float32)
+            self.entries[digest] = [row, self.clock]
+
+    def flush(self):
+        with self._locked():
+            self._refresh()
+            self._flush()
+
+    def _flush(self):
+        if self.vectors is not None:
+            self.vectors.flush()
+        index = {"model": self.model, "dim": self.dim, "capacity": self.capacity, "clock": self.clock,
+                 "entries": self.entries}
+        tmp_path = self.directory / (INDEX_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.directory / INDEX_FILE)
+        self._index_version_loaded = self._index_version()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model=EMBEDDING_MODEL) -> EmbeddingCache:
+    """Process-wide cache instance per model."""
+    with _caches_lock:
+        if model not in _caches:
+            _caches[model] = EmbeddingCache(model)
+        return _caches[model]
+
+
+def embed_with_cache(texts: List[str], embed_fn: Callable[[List[str]], List[Optional[List[float]]]],
+                     model=EMBEDDING_MODEL) -> List[Optional[List[float]]]:
+    """Serve cached vectors and only send the misses to `embed_fn`."""
+    if not EMBEDDING_CACHE_ENABLED:
+        return embed_fn(texts)
+
+    cache = get_embedding_cache(model)
+    embeddings = cache.get_many(texts)
+    missing = [index for index, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        missing_texts = [texts[index] for index in missing]
+        fresh = embed_fn(missing_texts)
+        for index, embedding in zip(missing, fresh):
+            embeddings[index] = embedding
+        cache.put_many(missing_texts, fresh)
+    return embeddings
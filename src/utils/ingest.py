@@ -0,0 +1,74 @@
+import os
+from collections.abc import Mapping
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple
+
+from src.utils.resume_store import ResumeView
+
+
+class ResumeEntry(NamedTuple):
+    id: str
+    path: str
+    size: int
+    mtime_ns: int = 0
+
+
+def scan_resumes(data_dir: str, suffix=".txt") -> Iterator[ResumeEntry]:
+    """Lazily walk `data_dir` with os.scandir, yielding one record per resume file without reading it."""
+    pending = [data_dir]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(suffix) and entry.is_file():
+                    # Files at the top level keep their bare filename as id, like the eager reader
+                    resume_id = os.path.relpath(entry.path, data_dir).replace(os.sep, "/")
+                    stat = entry.stat()
+                    yield ResumeEntry(resume_id, entry.path, stat.st_size, stat.st_mtime_ns)
+
+
+def read_resume(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        return file.read()
+
+
+def candidate_name(text: str) -> str:
+    """The first non-blank line, where resumes put the candidate's name."""
+    return next((line.strip() for line in text.splitlines() if line.strip()), "Unknown")[:100]
+
+
+def iter_chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class LazyResumes(Mapping):
+    """Read-only id -> text mapping that only keeps file records in memory and reads text on access."""
+
+    def __init__(self, entries: Iterable[ResumeEntry]):
+        self.entries = {entry.id: entry for entry in entries}
+
+    def __getitem__(self, resume_id: str) -> str:
+        return read_resume(self.entries[resume_id].path)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def subset(self, resume_ids: Iterable[str]) -> "LazyResumes":
+        return LazyResumes(self.entries[resume_id] for resume_id in resume_ids)
+
+    def total_size(self) -> int:
+        return sum(entry.size for entry in self.entries.values())
+
+
+def select_resumes(resumes: Mapping, resume_ids: Iterable[str]) -> Mapping:
+    """The given resumes, staying lazy when the source is lazy and a view of the same store for a ResumeView."""
+    if isinstance(resumes, (LazyResumes, ResumeView)):
+        return resumes.subset(resume_ids)
+    return {resume_id: resumes[resume_id] for resume_id in resume_ids}
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from src.config import LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES
+from src.utils.logger import configured_logger
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+EVICT_EVERY_PUTS = 100
+
+
+class CachedResponse(NamedTuple):
+    response: Optional[str]
+    parsed: Any
+
+
+def prompt_key(model: str, temperature: float, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\0{temperature!r}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite cache of deterministic LLM responses keyed by (model, temperature, prompt hash).
+    Besides the raw text it keeps the parsed result, so a hit skips parsing as well as the call.
+    Entries expire after `ttl_seconds`; past `max_entries` the least recently read are evicted.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = PROJECT_ROOT / path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                temperature REAL NOT NULL,
+                response TEXT,
+                parsed TEXT,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )""")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.evict()
+
+    def get(self, model: str, temperature: float, prompt: str) -> Optional[CachedResponse]:
+        key = prompt_key(model, temperature, prompt)
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT response, parsed FROM responses WHERE key = ? AND created > ?",
+                (key, now - self.ttl_seconds)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        response, parsed = row
+        return CachedResponse(response, json.loads(parsed) if parsed is not None else None)
+
+    def put(self, model: str, temperature: float, prompt: str, response: Optional[str] = None, parsed: Any = None):
+        """
+        Insert or update an entry; fields passed as None keep their cached value unless it expired.
+        Writing restarts the entry's TTL.
+        """
+        key = prompt_key(model, temperature, prompt)
+        now = time.time()
+        parsed_json = json.dumps(parsed, default=str) if parsed is not None else None
+        with self._lock, self._connection:
+            self._connection.execute("""
+                INSERT INTO responses (key, model, temperature, response, parsed, created, accessed)
+                VALUES (:key, :model, :temperature, :response, :parsed, :now, :now)
+                ON CONFLICT (key) DO UPDATE SET
+                    response = CASE WHEN created > :expired THEN COALESCE(excluded.response, response)
+                                    ELSE excluded.response END,
+                    parsed = CASE WHEN created > :expired THEN COALESCE(excluded.parsed, parsed)
+                                  ELSE excluded.parsed END,
+                    created = excluded.created,
+                    accessed = excluded.accessed""",
+                                     {"key": key, "model": model, "temperature": temperature, "response": response,
+                                      "parsed": parsed_json, "now": now, "expired": now - self.ttl_seconds})
+            self._puts += 1
+        if self._puts % EVICT_EVERY_PUTS == 0:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently read ones beyond max_entries."""
+        with self._lock, self._connection:
+            expired = self._connection.execute(
+                "DELETE FROM responses WHERE created <= ?", (time.time() - self.ttl_seconds,)).rowcount
+            overflow = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                    (overflow,))
+        if expired or overflow > 0:
+            configured_logger.debug(f"LLM cache evicted {expired} expired and {max(overflow, 0)} old entries")
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache(temperature: float = 0.0) -> Optional[LLMResponseCache]:
+    """
+    The process-wide cache, or None when the call must not be cached:
+    caching is disabled, LLM_CACHE_BYPASS=true is set, or the temperature is not 0.
+    """
+    global _cache
+    if not LLM_CACHE_ENABLED or temperature != 0 or os.getenv("LLM_CACHE_BYPASS", "false").lower() == "true":
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache()
+    return _cache
@@ -0,0 +1,248 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import resource
+
+    HAS_RESOURCE = True
+except ImportError:  # Windows
+    HAS_RESOURCE = False
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RESERVOIR_SIZE = 10_000
+
+
+class Histogram:
+    """Cumulative latency buckets in the Prometheus layout, plus a reservoir sample for percentiles."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._sample = []
+        self._rng = random.Random(0)
+
+    def observe(self, value: float):
+        self.counts[next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        if len(self._sample) < RESERVOIR_SIZE:
+            self._sample.append(value)
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self._sample[slot] = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._sample:
+            return None
+        ordered = sorted(self._sample)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def state(self) -> Dict:
+        """Everything merge() needs, JSON-serializable."""
+        return {"counts": self.counts, "count": self.count, "sum": self.sum, "max": self.max, "sample": self._sample}
+
+    def merge(self, state: Dict):
+        """Fold in another histogram's state(); the combined sample keeps each side in proportion to its count."""
+        count = self.count + state["count"]
+        if not count:
+            return
+        if len(self._sample) + len(state["sample"]) > RESERVOIR_SIZE:
+            mine = min(len(self._sample), round(RESERVOIR_SIZE * self.count / count))
+            theirs = min(len(state["sample"]), RESERVOIR_SIZE - mine)
+            self._sample = self._rng.sample(self._sample, mine) + self._rng.sample(state["sample"], theirs)
+        else:
+            self._sample = self._sample + state["sample"]
+        self.counts = [a + b for a, b in zip(self.counts, state["counts"])]
+        self.count = count
+        self.sum += state["sum"]
+        self.max = max(self.max, state["max"])
+
+    def as_dict(self):
+        return {"count": self.count, "sum": round(self.sum, 6), "max": round(self.max, 6),
+                "p50": self.percentile(50), "p90": self.percentile(90), "p99": self.percentile(99),
+                "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)}}
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # kilobytes on Linux
+
+
+class Metrics:
+    """
+    Process-wide run metrics: per-node prep/exec/post time, per-item latency histograms,
+    and counters such as LLM/embedding requests and tokens. Safe to update from worker threads.
+    Worker processes send a snapshot() that the parent merge()s into its own report.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.nodes: Dict[str, Dict[str, float]] = {}
+            self.items: Dict[str, Histogram] = {}
+            self.counters: Dict[str, float] = {}
+            self.merged_caches: Dict[str, Dict[str, int]] = {}
+        # Cache hit counters live as long as their cache, so a report only counts what came after
+        self._cache_baseline = self._cache_stats()
+
+    def add_time(self, node: str, phase: str, seconds: float):
+        with self._lock:
+            timings = self.nodes.setdefault(node, {"runs": 0, "prep_seconds": 0.0, "exec_seconds": 0.0,
+                                                   "post_seconds": 0.0})
+            timings[f"{phase}_seconds"] += seconds
+            if phase == "post":
+                timings["runs"] += 1
+                # High-water mark when the node finished, so the stage that grew the peak stands out
+                timings["peak_rss_bytes"] = peak_rss_bytes() or 0
+
+    def observe_item(self, node: str, seconds: float):
+        with self._lock:
+            self.items.setdefault(node, Histogram()).observe(seconds)
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_usage(self, kind: str, model: str, usage):
+        """Count one API request and the tokens its response reports (kind: "llm" or "embedding")."""
+        self.increment(f"{kind}_requests")
+        if usage is None:
+            return
+        self.increment(f"{kind}_prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+        self.increment(f"{kind}_completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
+        self.increment(f"{kind}_tokens:{model}", getattr(usage, "total_tokens", 0) or 0)
+
+    @staticmethod
+    def _cache_stats() -> Dict[str, Dict[str, int]]:
+        # Imported here so reporting never creates a cache that the run did not use
+        from src.utils import embedding_cache, llm_cache, score_cache
+
+        caches = {}
+        for name, module in (("embedding", embedding_cache), ("llm", llm_cache), ("reranker", score_cache)):
+            instances = module._caches.values() if hasattr(module, "_caches") else [getattr(module, "_cache", None)]
+            stats = [cache.stats() for cache in instances if cache is not None]
+            if stats:
+                caches[name] = {"hits": sum(s["hits"] for s in stats), "misses": sum(s["misses"] for s in stats)}
+        return caches
+
+    def _run_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        caches = {}
+        for name, stats in self._cache_stats().items():
+            baseline = self._cache_baseline.get(name, {})
+            caches[name] = {result: stats[result] - baseline.get(result, 0) for result in ("hits", "misses")}
+        for name, stats in self.merged_caches.items():
+            totals = caches.setdefault(name, {"hits": 0, "misses": 0})
+            for result in ("hits", "misses"):
+                totals[result] += stats[result]
+        return caches
+
+    def snapshot(self) -> Dict:
+        """This process's metrics since the last reset, JSON-serializable, for merge() in another process."""
+        caches = self._run_cache_stats()
+        with self._lock:
+            return {
+                "nodes": {node: dict(timings) for node, timings in self.nodes.items()},
+                "items": {node: histogram.state() for node, histogram in self.items.items()},
+                "counters": dict(self.counters),
+                "caches": caches,
+            }
+
+    def merge(self, snapshot: Dict):
+        """Add a worker's snapshot(); peak RSS keeps the maximum, everything else adds up."""
+        with self._lock:
+            for node, timings in snapshot["nodes"].items():
+                mine = self.nodes.setdefault(node, {"runs": 0, "prep_seconds": 0.0, "exec_seconds": 0.0,
+                                                    "post_seconds": 0.0})
+                for key, value in timings.items():
+                    mine[key] = max(mine.get(key, 0), value) if key == "peak_rss_bytes" else mine.get(key, 0) + value
+            for node, state in snapshot["items"].items():
+                self.items.setdefault(node, Histogram()).merge(state)
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, stats in snapshot["caches"].items():
+                totals = self.merged_caches.setdefault(name, {"hits": 0, "misses": 0})
+                for result in ("hits", "misses"):
+                    totals[result] += stats[result]
+
+    def report(self) -> Dict:
+        caches = self._run_cache_stats()
+        with self._lock:
+            return {
+                "started": self.started,
+                "wall_seconds": round(time.time() - self.started, 3),
+                "peak_rss_bytes": peak_rss_bytes(),
+                "nodes": {node: {key: round(value, 6) for key, value in timings.items()}
+                          for node, timings in self.nodes.items()},
+                "item_latency_seconds": {node: histogram.as_dict() for node, histogram in self.items.items()},
+                "counters": dict(self.counters),
+                "caches": caches,
+            }
+
+    def write_json(self, path) -> Path:
+        path = PROJECT_ROOT / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def write_prometheus(self, path) -> Path:
+        """Write the report in the Prometheus text format, for the node_exporter textfile collector."""
+        report = self.report()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+        metric("resume_pipeline_wall_seconds", "gauge", "Wall time of the run.", [("", report["wall_seconds"])])
+        if report["peak_rss_bytes"] is not None:
+            metric("resume_pipeline_peak_rss_bytes", "gauge", "Peak resident set size.",
+                   [("", report["peak_rss_bytes"])])
+        metric("resume_pipeline_node_seconds", "gauge", "Time spent per node and phase.",
+               [(f'{{node="{node}",phase="{phase}"}}', timings[f"{phase}_seconds"])
+                for node, timings in report["nodes"].items() for phase in ("prep", "exec", "post")])
+        lines.append("# HELP resume_pipeline_item_seconds Per-item latency of batch nodes.")
+        lines.append("# TYPE resume_pipeline_item_seconds histogram")
+        for node, histogram in self.items.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f'resume_pipeline_item_seconds_bucket{{node="{node}",le="{bound}"}} {cumulative}')
+            lines.append(f'resume_pipeline_item_seconds_sum{{node="{node}"}} {histogram.sum}')
+            lines.append(f'resume_pipeline_item_seconds_count{{node="{node}"}} {histogram.count}')
+        metric("resume_pipeline_events_total", "counter", "Requests, tokens and other run counters.",
+               [(f'{{name="{name}"}}', value) for name, value in sorted(report["counters"].items())])
+        metric("resume_pipeline_cache_lookups_total", "counter", "Cache hits and misses.",
+               [(f'{{cache="{cache}",result="{result}"}}', stats[result])
+                for cache, stats in report["caches"].items() for result in ("hits", "misses")])
+
+        path = PROJECT_ROOT / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")  # the collector must never read a half-written file
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+        return path
+
+
+metrics = Metrics()
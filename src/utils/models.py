@@ -1,10 +1,17 @@
+import asyncio
 import os
+import random
 
+import openai
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
+from src.config import LLM_MODEL, LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS
 from src.constants import USER
+from src.utils.llm_cache import get_llm_cache
+from src.utils.score_cache import get_score_cache
 from src.utils.logger import configured_logger
+from src.utils.metrics import metrics
 
 load_dotenv()
 
@@ -14,34 +21,175 @@ google_api_key = os.environ.get("GOOGLE_API_KEY", "your-api-key")
 openai_client = OpenAI(api_key=openai_api_key)
 
 
-def call_llm(prompt, temperature=0.0):
+def call_llm(prompt, temperature=0.0, use_cache=True):
+    """Deterministic (temperature 0) calls are served from and saved to the LLM response cache."""
+    cache = get_llm_cache(temperature) if use_cache else None
+    cached = cache.get(LLM_MODEL, temperature, prompt) if cache is not None else None
+    if cached and cached.response is not None:
+        return cached.response
     try:
         r = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=LLM_MODEL,
             temperature=temperature,
             messages=[{"role": USER, "content": prompt}]
         )
-        return r.choices[0].message.content
+        metrics.record_usage("llm", LLM_MODEL, getattr(r, "usage", None))
+        response = r.choices[0].message.content
+        if cache is not None:
+            cache.put(LLM_MODEL, temperature, prompt, response=response)
+        return response
     except Exception as e:
+        metrics.increment("llm_errors")
         configured_logger.error(f"Error calling LLM: {e}")
         return None
 
 
-import openai
-from typing import List
+_async_openai_client = None
+_async_openai_client_loop = None
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    One AsyncOpenAI client (and so one pooled HTTP connection pool) per event loop.
+    SDK retries are disabled because acall_llm does its own backoff.
+    """
+    global _async_openai_client, _async_openai_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_openai_client is None or _async_openai_client_loop is not loop:
+        _async_openai_client = AsyncOpenAI(api_key=openai_api_key, max_retries=0)
+        _async_openai_client_loop = loop
+    return _async_openai_client
+
 
+async def close_async_openai_client():
+    """Close the running loop's client before the loop ends, so its connection pool is not leaked."""
+    global _async_openai_client, _async_openai_client_loop
+    if _async_openai_client is not None and _async_openai_client_loop is asyncio.get_running_loop():
+        client, _async_openai_client, _async_openai_client_loop = _async_openai_client, None, None
+        await client.close()
 
-def generate_embedding(texts: List[str], model="text-embedding-3-small") -> List[float]:
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after_seconds(error: Exception):
+    response = getattr(error, "response", None)
     try:
-        response = openai.embeddings.create(
-            input=texts,
-            model=model
-        )
-        # If batch input, response.data is a list of embeddings
-        return response.data[0].embedding  # returns embedding for first input
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+async def acall_llm(prompt, temperature=0.0, rate_limiter=None, use_cache=True):
+    """Async call_llm: waits on `rate_limiter` and backs off exponentially on 429 and 5xx responses."""
+    cache = get_llm_cache(temperature) if use_cache else None
+    cached = cache.get(LLM_MODEL, temperature, prompt) if cache is not None else None
+    if cached and cached.response is not None:
+        return cached.response
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            if rate_limiter is not None:
+                await rate_limiter.acquire(estimate_tokens(prompt, LLM_MODEL) + LLM_EXPECTED_OUTPUT_TOKENS)
+            r = await get_async_openai_client().chat.completions.create(
+                model=LLM_MODEL,
+                temperature=temperature,
+                messages=[{"role": USER, "content": prompt}]
+            )
+            metrics.record_usage("llm", LLM_MODEL, getattr(r, "usage", None))
+            response = r.choices[0].message.content
+            if cache is not None:
+                cache.put(LLM_MODEL, temperature, prompt, response=response)
+            return response
+        except Exception as e:
+            if not _is_retryable(e) or attempt == LLM_MAX_RETRIES:
+                metrics.increment("llm_errors")
+                configured_logger.error(f"Error calling LLM: {e}")
+                return None
+            metrics.increment("llm_retries")
+            delay = _retry_after_seconds(e) or min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt)
+            delay *= random.uniform(1.0, 1.5)  # jitter keeps concurrent callers from retrying in lockstep
+            configured_logger.warning(f"LLM call failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+from typing import List, Optional
+
+from src.config import EMBEDDING_MODEL, EMBEDDING_MAX_BATCH_SIZE, EMBEDDING_MAX_BATCH_TOKENS, \
+    EMBEDDING_MAX_INPUT_TOKENS, LLM_EXPECTED_OUTPUT_TOKENS
+
+try:
+    import tiktoken
+
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+
+def estimate_tokens(text: str, model=EMBEDDING_MODEL) -> int:
+    """Token count for `text`, exact with tiktoken installed, otherwise a conservative estimate."""
+    if HAS_TIKTOKEN:
+        try:
+            return len(tiktoken.encoding_for_model(model).encode(text))
+        except KeyError:
+            pass
+    # ~4 characters per token for English; divide by 3 so the estimate errs on the high side
+    return len(text) // 3 + 1
+
+
+def pack_embedding_batches(texts: List[str], max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+                           max_batch_tokens=EMBEDDING_MAX_BATCH_TOKENS, model=EMBEDDING_MODEL) -> List[List[int]]:
+    """Group text indices into consecutive batches that respect the per-request input and token limits."""
+    batches = []
+    current, current_tokens = [], 0
+    for index, text in enumerate(texts):
+        tokens = min(estimate_tokens(text, model), EMBEDDING_MAX_INPUT_TOKENS)
+        if current and (len(current) >= max_batch_size or current_tokens + tokens > max_batch_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _embed_batch(texts: List[str], model) -> List[Optional[List[float]]]:
+    """Embed one packed batch, bisecting on rejected requests so a bad input only fails itself."""
+    try:
+        response = openai_client.embeddings.create(input=texts, model=model)
+        metrics.record_usage("embedding", model, getattr(response, "usage", None))
+        # response.data is not guaranteed to be in request order, each item carries its index
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    except openai.BadRequestError as e:
+        if len(texts) == 1:
+            metrics.increment("embedding_errors")
+            configured_logger.error(f"Error generating embedding for input: {e}")
+            return [None]
+        middle = len(texts) // 2
+        return _embed_batch(texts[:middle], model) + _embed_batch(texts[middle:], model)
     except Exception as e:
-        configured_logger.error(f"Error generating embedding: {e}")
-        return []
+        metrics.increment("embedding_errors")
+        configured_logger.error(f"Error generating embeddings for batch of {len(texts)}: {e}")
+        return [None] * len(texts)
+
+
+def generate_embeddings(texts: List[str], model=EMBEDDING_MODEL) -> List[Optional[List[float]]]:
+    """
+    Embed every text, returning vectors in input order.
+    Requests are packed up to the provider limits; an item that failed is None.
+    """
+    embeddings: List[Optional[List[float]]] = [None] * len(texts)
+    for batch in pack_embedding_batches(texts, model=model):
+        for index, embedding in zip(batch, _embed_batch([texts[i] for i in batch], model)):
+            embeddings[index] = embedding
+
+    failed = sum(embedding is None for embedding in embeddings)
+    if failed:
+        configured_logger.error(f"Failed to embed {failed} of {len(texts)} inputs")
+    return embeddings
 
 
 # from google import genai
@@ -61,18 +209,224 @@ def generate_embedding(texts: List[str], model="text-embedding-3-small") -> List
 #         return []
 
 
+import multiprocessing
+import re
+import threading
+import time
 import warnings
-from sentence_transformers import CrossEncoder
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import torch
+from sentence_transformers import CrossEncoder, SentenceTransformer
+from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from src.config import RERANKER_MODEL, RERANKER_BATCH_SIZE, RERANKER_BACKEND, RERANKER_ONNX_DIR, \
+    RERANKER_QUANTIZATION, RERANKER_WORKERS, RERANKER_PARALLEL_MIN_ITEMS, RERANKER_START_METHOD, \
+    EMBEDDING_PROVIDER, LOCAL_EMBEDDING_MODEL, LOCAL_EMBEDDING_BATCH_SIZE
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+_rerankers: Dict[Tuple[str, str], CrossEncoder] = {}
+_rerankers_lock = threading.Lock()
+
+
+def _load_cross_encoder(model_name, backend) -> CrossEncoder:
+    """
+    "torch" loads the model as is. "onnx" exports it to ONNX once under RERANKER_ONNX_DIR, and
+    "onnx-int8" additionally quantizes that export with dynamic int8 quantization.
+    The ONNX backends need the optional `optimum[onnxruntime]` package.
+    """
+    if backend == "torch":
+        return CrossEncoder(model_name)
+    if backend not in ("onnx", "onnx-int8"):
+        raise ValueError(f"Unknown reranker backend: {backend}")
+
+    export_dir = PROJECT_ROOT / RERANKER_ONNX_DIR / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+    if not (export_dir / "onnx" / "model.onnx").exists():
+        configured_logger.info(f"Exporting reranker {model_name} to ONNX in {export_dir}")
+        CrossEncoder(model_name, backend="onnx").save_pretrained(str(export_dir))
+    if backend == "onnx":
+        return CrossEncoder(str(export_dir), backend="onnx")
 
+    quantized_file = f"onnx/model_qint8_{RERANKER_QUANTIZATION}.onnx"
+    if not (export_dir / quantized_file).exists():
+        configured_logger.info(f"Quantizing reranker {model_name} to int8 ({RERANKER_QUANTIZATION})")
+        export_dynamic_quantized_onnx_model(CrossEncoder(str(export_dir), backend="onnx"),
+                                            quantization_config=RERANKER_QUANTIZATION,
+                                            model_name_or_path=str(export_dir))
+    return CrossEncoder(str(export_dir), backend="onnx", model_kwargs={"file_name": quantized_file})
 
-def call_reranker(query, items: List):
+
+def get_reranker(model_name=RERANKER_MODEL, backend=RERANKER_BACKEND) -> CrossEncoder:
+    """Load each reranker once per process and hand out the warm instance afterwards."""
+    with _rerankers_lock:
+        if (model_name, backend) not in _rerankers:
+            started = time.perf_counter()
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                _rerankers[(model_name, backend)] = _load_cross_encoder(model_name, backend)
+            configured_logger.info(
+                f"Loaded reranker {model_name} ({backend}) in {time.perf_counter() - started:.2f}s")
+        return _rerankers[(model_name, backend)]
+
+
+def length_buckets(items: List[str], batch_size: int) -> List[List[int]]:
+    """Batches of item indices with similar lengths, so short items are not padded to the longest one."""
+    order = sorted(range(len(items)), key=lambda index: len(items[index]))
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def shard_indices(items: List[str], shards: int) -> List[List[int]]:
+    """Deal items out by length so every shard gets a similar mix of short and long texts."""
+    order = sorted(range(len(items)), key=lambda index: len(items[index]))
+    return [order[shard::shards] for shard in range(shards) if order[shard::shards]]
+
+
+def _init_rerank_worker(model_name, backend, threads):
+    """Pool initializer: pin the worker's intra-op threads and load the model before any shard arrives."""
+    torch.set_num_threads(threads)
+    get_reranker(model_name, backend)
+
+
+def _rerank_shard(query, items, model_name, batch_size, backend):
+    return _score_pairs(query, items, model_name, batch_size, backend, workers=1)
+
+
+_rerank_pools: Dict[Tuple[str, str, int], ProcessPoolExecutor] = {}
+
+
+def _get_rerank_pool(model_name, backend, workers) -> ProcessPoolExecutor:
+    """Process-wide pool per (model, backend, workers); workers stay warm across calls."""
+    key = (model_name, backend, workers)
+    if key not in _rerank_pools:
+        threads = max(1, (os.cpu_count() or workers) // workers)
+        _rerank_pools[key] = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(RERANKER_START_METHOD),
+            initializer=_init_rerank_worker,
+            initargs=(model_name, backend, threads))
+    return _rerank_pools[key]
+
+
+def _rerank_parallel(query, items: List, model_name, batch_size, backend, workers):
+    shards = shard_indices(items, workers)
+    pool = _get_rerank_pool(model_name, backend, workers)
+    futures = [pool.submit(_rerank_shard, query, [items[index] for index in shard], model_name, batch_size, backend)
+               for shard in shards]
+    scores = np.empty(len(items), dtype=np.float32)
+    for shard, future in zip(shards, futures):
+        shard_scores = future.result()
+        if len(shard_scores) != len(shard):
+            raise RuntimeError(f"Reranker worker returned {len(shard_scores)} scores for {len(shard)} items")
+        scores[shard] = shard_scores
+    return scores
+
+
+def _score_pairs(query, items: List, model_name, batch_size, backend, workers):
+    metrics.increment("reranker_pairs", len(items))
+    if workers > 1 and len(items) >= RERANKER_PARALLEL_MIN_ITEMS:
+        started = time.perf_counter()
+        scores = _rerank_parallel(query, items, model_name, batch_size, backend, workers)
+        configured_logger.info(
+            f"Reranked {len(items)} items on {workers} workers in {time.perf_counter() - started:.2f}s")
+        return scores
+
+    reranker = get_reranker(model_name, backend)
+    scores = np.empty(len(items), dtype=np.float32)
+    started = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for number, batch in enumerate(length_buckets(items, batch_size)):
+            batch_started = time.perf_counter()
+            scores[batch] = reranker.predict([[query, items[index]] for index in batch],
+                                             batch_size=len(batch), show_progress_bar=False)
+            configured_logger.debug(
+                f"Reranker batch {number}: {len(batch)} pairs, "
+                f"up to {len(items[batch[-1]])} chars, {(time.perf_counter() - batch_started) * 1000:.1f} ms")
+    configured_logger.info(f"Reranked {len(items)} items in {time.perf_counter() - started:.2f}s")
+    return scores
+
+
+def call_reranker(query, items: List, model_name=RERANKER_MODEL, batch_size=RERANKER_BATCH_SIZE,
+                  backend=RERANKER_BACKEND, workers=RERANKER_WORKERS, use_cache=True):
+    """
+    Score (query, item) pairs, returning scores in input order.
+    Cached scores are reused and only the remaining pairs reach the model. With workers > 1 and at least
+    RERANKER_PARALLEL_MIN_ITEMS pairs to score, they are sharded across a process pool.
+    """
     try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
-            scores = reranker.predict([[query, item] for item in items])
+        cache = get_score_cache() if use_cache else None
+        if cache is None:
+            return _score_pairs(query, items, model_name, batch_size, backend, workers)
+
+        cache_model = f"{model_name}:{backend}"
+        cached = cache.get_many(cache_model, query, items)
+        missing = [index for index, score in enumerate(cached) if score is None]
+        scores = np.array([0.0 if score is None else score for score in cached], dtype=np.float32)
+        if missing:
+            missing_items = [items[index] for index in missing]
+            fresh = _score_pairs(query, missing_items, model_name, batch_size, backend, workers)
+            scores[missing] = fresh
+            cache.put_many(cache_model, query, missing_items, fresh)
+        configured_logger.info(f"Reranker cache: {len(items) - len(missing)} hits, {len(missing)} scored")
         return scores
     except Exception as e:
         configured_logger.error(f"Error calling reranker: {e}")
         return []
+
+
+_bi_encoders: Dict[str, SentenceTransformer] = {}
+_bi_encoders_lock = threading.Lock()
+
+
+def get_bi_encoder(model_name=LOCAL_EMBEDDING_MODEL) -> SentenceTransformer:
+    """Load each local embedding model once per process."""
+    with _bi_encoders_lock:
+        if model_name not in _bi_encoders:
+            started = time.perf_counter()
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                _bi_encoders[model_name] = SentenceTransformer(model_name)
+            configured_logger.info(f"Loaded embedding model {model_name} in {time.perf_counter() - started:.2f}s")
+        return _bi_encoders[model_name]
+
+
+def generate_local_embeddings(texts: List[str], model_name=LOCAL_EMBEDDING_MODEL,
+                              batch_size=LOCAL_EMBEDDING_BATCH_SIZE) -> List[Optional[List[float]]]:
+    """
+    Embed texts on this machine in length-bucketed batches, returning unit-length float32 vectors in input order
+    (as lists, like generate_embeddings). On failure every item is None.
+    """
+    try:
+        encoder = get_bi_encoder(model_name)
+        vectors = np.empty((len(texts), encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+        started = time.perf_counter()
+        for batch in length_buckets(texts, batch_size):
+            vectors[batch] = encoder.encode([texts[index] for index in batch], batch_size=len(batch),
+                                            normalize_embeddings=True, convert_to_numpy=True,
+                                            show_progress_bar=False)
+        metrics.increment("local_embedding_inputs", len(texts))
+        configured_logger.info(f"Embedded {len(texts)} texts locally in {time.perf_counter() - started:.2f}s")
+        return vectors.tolist()
+    except Exception as e:
+        metrics.increment("embedding_errors")
+        configured_logger.error(f"Error generating local embeddings for {len(texts)} texts: {e}")
+        return [None] * len(texts)
+
+
+class EmbeddingProvider(NamedTuple):
+    name: str
+    model: str  # also namespaces the embedding cache, since vectors of different models are not comparable
+    embed: Callable[[List[str]], List[Optional[List[float]]]]
+
+
+def get_embedding_provider(provider=EMBEDDING_PROVIDER) -> EmbeddingProvider:
+    """The embedding backend selected in config: "openai" or "local"."""
+    if provider == "openai":
+        return EmbeddingProvider("openai", EMBEDDING_MODEL, generate_embeddings)
+    if provider == "local":
+        return EmbeddingProvider("local", LOCAL_EMBEDDING_MODEL, generate_local_embeddings)
+    raise ValueError(f"Unknown embedding provider: {provider}")
@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+from src.utils.logger import configured_logger
+
+_DONE = object()
+POLL_SECONDS = 0.1
+
+
+class Stage(NamedTuple):
+    """
+    One pipeline stage: `fn` takes a micro-batch of up to `batch_size` items and returns the items to pass on,
+    possibly fewer (filters) or none. `workers` threads run it concurrently.
+    """
+    name: str
+    fn: Callable[[List[Any]], Iterable[Any]]
+    workers: int = 1
+    batch_size: int = 1
+
+
+class StageStats:
+    def __init__(self):
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items_in, items_out, seconds):
+        with self._lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.busy_seconds += seconds
+
+    def as_dict(self):
+        return {"in": self.items_in, "out": self.items_out, "busy_seconds": round(self.busy_seconds, 3)}
+
+
+class Pipeline:
+    """
+    Runs stages concurrently, connected by bounded queues, instead of one full batch after the other.
+    Each stage starts on its first item while upstream stages are still producing, and a full queue
+    blocks its producer, so memory stays bounded by the queue sizes. The first error stops every stage
+    and is re-raised from run().
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = {stage.name: StageStats() for stage in stages}
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def _put(self, q: queue.Queue, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, name, error):
+        if self._error is None:
+            configured_logger.error(f"Pipeline stage {name} failed: {str(error)}")
+            self._error = error
+        self._stop.set()
+
+    def _feed(self, source: Iterable, out_queue: queue.Queue):
+        try:
+            for item in source:
+                if self._stop.is_set():
+                    return
+                self._put(out_queue, item)
+            self._put(out_queue, _DONE)
+        except Exception as e:
+            self._fail("source", e)
+
+    def _work(self, stage: Stage, in_queue: queue.Queue, out_queue: queue.Queue, remaining: List[int],
+              lock: threading.Lock):
+        try:
+            while not self._stop.is_set():
+                item = self._get(in_queue)
+                if item is _DONE:
+                    # Hand the end marker on to the sibling workers of this stage
+                    self._put(in_queue, _DONE)
+                    break
+                # Micro-batch whatever is already waiting, without holding back for more
+                batch = [item]
+                while len(batch) < stage.batch_size:
+                    try:
+                        item = in_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        self._put(in_queue, _DONE)
+                        break
+                    batch.append(item)
+
+                started = time.perf_counter()
+                results = list(stage.fn(batch) or [])
+                self.stats[stage.name].record(len(batch), len(results), time.perf_counter() - started)
+                for result in results:
+                    self._put(out_queue, result)
+                if item is _DONE:
+                    break
+        except Exception as e:
+            self._fail(stage.name, e)
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and not self._stop.is_set():
+                self._put(out_queue, _DONE)
+
+    def run(self, source: Iterable) -> List[Any]:
+        """Push `source` through every stage and collect what comes out of the last one."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0]), name="pipeline-source",
+                                    daemon=True)]
+        for position, stage in enumerate(self.stages):
+            remaining, lock = [stage.workers], threading.Lock()
+            threads += [threading.Thread(target=self._work, name=f"pipeline-{stage.name}-{worker}", daemon=True,
+                                         args=(stage, queues[position], queues[position + 1], remaining, lock))
+                        for worker in range(stage.workers)]
+        for thread in threads:
+            thread.start()
+
+        results = []
+        while True:
+            item = self._get(queues[-1])
+            if item is _DONE:
+                break
+            results.append(item)
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+        configured_logger.info(f"Pipeline stages: { {name: stats.as_dict() for name, stats in self.stats.items()} }")
+        return results
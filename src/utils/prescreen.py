@@ -0,0 +1,110 @@
+import datetime
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.config import PRESCREEN_MIN_YEARS, PRESCREEN_EXPERIENCE_MARGIN_YEARS
+from src.constants import CANDIDATE_NAME, QUALIFIES, REASONS, PRESCREEN_RULE
+from src.utils.ingest import candidate_name
+
+INSUFFICIENT_EXPERIENCE = "insufficient_experience"
+
+# Patterns run on lowercased text: re.IGNORECASE makes these alternations several times slower.
+# Degrees are not checked: their spellings (B.Com, BBA, A.B., S.B., a bare university and field) are too varied
+# for a rule to reject on a missing one, the LLM judges them.
+_MONTHS = {"jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6, "jul": 7, "aug": 8, "sep": 9, "oct": 10,
+           "nov": 11, "dec": 12}
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_DATE = r"(?:(?P<{p}_month>{month})\s+|(?P<{p}_month_number>\d{{1,2}})[/.-])?(?P<{p}_year>(?:19|20)\d{{2}})"
+DATE_RANGE_PATTERN = re.compile(
+    r"\b" + _DATE.format(p="start", month=_MONTH) + r"\s*(?:-|–|—|to|until)\s*(?:"
+    + _DATE.format(p="end", month=_MONTH) + r"|(?P<present>present|current|now|today)\b)")
+_NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+                 "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+                 "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19, "twenty": 20,
+                 "thirty": 30, "forty": 40, "fifty": 50}
+_NUMBER = r"\d{1,2}|(?:(?:twenty|thirty|forty)[- ])?(?:" + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + ")"
+CLAIMED_YEARS_PATTERN = re.compile(
+    r"(?<![\w-])(" + _NUMBER + r")\+?\s*(?:\+\s*)?(years?|decades?)'?\s+(?:of\s+)?(?:[\w-]+\s+){0,3}?experience")
+YEAR_PATTERN = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
+class Prescreen(NamedTuple):
+    rule: Optional[str]  # the rule that rejected the resume, None forwards it to the LLM
+    years: Optional[float]  # None when the resume gives neither date ranges nor a claimed number of years
+
+
+def _month_index(match, prefix: str, default_month: int) -> int:
+    month = match.group(f"{prefix}_month")
+    month_number = match.group(f"{prefix}_month_number")
+    if month:
+        number = _MONTHS[month[:3]]
+    elif month_number and 1 <= int(month_number) <= 12:
+        number = int(month_number)
+    else:
+        number = default_month
+    return int(match.group(f"{prefix}_year")) * 12 + number - 1
+
+
+def employment_intervals(text: str, today: datetime.date = None) -> List[Tuple[int, int]]:
+    """
+    (start, end) month indices of every date range in the text, most generous reading first:
+    a bare start year counts from January, a bare end year until December.
+    """
+    today = today or datetime.date.today()
+    now = today.year * 12 + today.month - 1
+    intervals = []
+    for match in DATE_RANGE_PATTERN.finditer(text.lower()):
+        start = _month_index(match, "start", 1)
+        end = now if match.group("present") else _month_index(match, "end", 12)
+        if start <= end <= now + 12:
+            intervals.append((start, end))
+    return intervals
+
+
+def years_of_experience(intervals: List[Tuple[int, int]]) -> float:
+    """Total years covered by the intervals, counting overlapping positions once."""
+    months, current_start, current_end = 0, None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        months += current_end - current_start
+    return months / 12
+
+
+def claimed_years(text: str) -> List[int]:
+    """Every number of years of experience the lowercased text states, in digits or words ("over a decade")."""
+    claims = []
+    for number, unit in CLAIMED_YEARS_PATTERN.findall(text):
+        years = int(number) if number.isdigit() else sum(_NUMBER_WORDS[word] for word in re.split(r"[- ]", number))
+        claims.append(years * 10 if unit.startswith("decade") else years)
+    return claims
+
+
+def prescreen_resume(text: str, today: datetime.date = None) -> Prescreen:
+    """
+    Apply the mechanical part of MANDATORY_CRITERIA. Only clear fails are rejected: fewer than
+    PRESCREEN_MIN_YEARS years even counting every position and the largest claimed number of years, and
+    only when the dated positions plausibly are the whole career: no year in the text predates the first one.
+    """
+    lowered = text.lower()
+    intervals = employment_intervals(lowered, today)
+    claims = claimed_years(lowered)
+    years = max([years_of_experience(intervals)] * bool(intervals) + claims, default=None)
+
+    if intervals and years < PRESCREEN_MIN_YEARS - PRESCREEN_EXPERIENCE_MARGIN_YEARS:
+        # A graduation year or "since 2012" before the first dated position: the history is incomplete
+        first_year = min(start for start, _ in intervals) // 12
+        if all(int(year) >= first_year for year in YEAR_PATTERN.findall(lowered)):
+            return Prescreen(INSUFFICIENT_EXPERIENCE, years)
+    return Prescreen(None, years)
+
+
+def rejection_evaluation(text: str, result: Prescreen) -> Dict:
+    """An evaluation in the LLM's format for a resume the pre-screen rejected."""
+    reason = f"About {result.years:.1f} years of work experience, at least {PRESCREEN_MIN_YEARS} required"
+    return {CANDIDATE_NAME: candidate_name(text), QUALIFIES: False, REASONS: [reason], PRESCREEN_RULE: result.rule}
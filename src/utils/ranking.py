@@ -0,0 +1,141 @@
+import heapq
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from src.config import RANKING_SPILL_ROWS
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def rank_key(item: Tuple[str, float]):
+    """Best score first, ties broken by filename, so rankings do not depend on input or merge order."""
+    filename, score = item
+    return -score, filename
+
+
+class RankedList(list):
+    """Best-first (filename, score) pairs that also remember how many candidates were ranked in total."""
+
+    def __init__(self, items: Iterable[Tuple[str, float]] = (), total: Optional[int] = None):
+        super().__init__(items)
+        self.total = len(self) if total is None else total
+
+
+class _Entry:
+    """Heap entry ordered worst first: lower score, then later filename."""
+    __slots__ = ("score", "filename")
+
+    def __init__(self, filename: str, score: float):
+        self.filename = filename
+        self.score = score
+
+    def __lt__(self, other: "_Entry"):
+        return self.score < other.score or (self.score == other.score and self.filename > other.filename)
+
+
+class TopN:
+    """
+    Bounded min-heap keeping the n best (filename, score) pairs of a stream, O(log n) per push.
+    Partial rankings of batches or shards merge into one with merge(), and the result is the same
+    whatever the order or grouping of the input.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.total = 0
+        self._heap: List[_Entry] = []
+
+    def _offer(self, entry: _Entry):
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif self.n and self._heap[0] < entry:
+            heapq.heapreplace(self._heap, entry)
+
+    def push(self, filename: str, score: float):
+        self.total += 1
+        self._offer(_Entry(filename, float(score)))
+
+    def push_many(self, pairs: Iterable[Tuple[str, float]]):
+        for filename, score in pairs:
+            self.push(filename, score)
+        return self
+
+    def merge(self, other):
+        """Fold in another TopN or RankedList; `total` adds up."""
+        entries = other._heap if isinstance(other, TopN) else [_Entry(filename, score) for filename, score in other]
+        for entry in entries:
+            self._offer(entry)
+        self.total += other.total
+        return self
+
+    def results(self) -> RankedList:
+        return RankedList(sorted(((entry.filename, entry.score) for entry in self._heap), key=rank_key), self.total)
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class SpilledRanking:
+    """
+    The complete ranking written to a tab-separated file, best first, in bounded memory:
+    pairs are sorted in runs of `spill_rows` on disk and the runs are merged at the end.
+    """
+
+    def __init__(self, path, spill_rows=RANKING_SPILL_ROWS):
+        self.path = PROJECT_ROOT / path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.spill_rows = spill_rows
+        self._buffer: List[Tuple[str, float]] = []
+        self._runs: List[str] = []
+
+    def add(self, filename: str, score: float):
+        self._buffer.append((filename, score))
+        if len(self._buffer) >= self.spill_rows:
+            self._spill()
+
+    def _spill(self):
+        fd, run_path = tempfile.mkstemp(prefix="ranking-", suffix=".run", dir=self.path.parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as run:
+            run.writelines(f"{filename}\t{score!r}\n" for filename, score in sorted(self._buffer, key=rank_key))
+        self._runs.append(run_path)
+        self._buffer = []
+
+    @staticmethod
+    def _read(path):
+        with open(path, "r", encoding="utf-8") as run:
+            for line in run:
+                filename, score = line.rstrip("\n").rsplit("\t", 1)
+                yield filename, float(score)
+
+    def finish(self) -> Path:
+        if self._buffer or not self._runs:
+            self._spill()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.writelines(f"{filename}\t{score!r}\n"
+                           for filename, score in heapq.merge(*(self._read(run) for run in self._runs), key=rank_key))
+        os.replace(tmp_path, self.path)
+        for run in self._runs:
+            os.remove(run)
+        self._runs = []
+        return self.path
+
+
+def rank_top_n(pairs: Iterable[Tuple[str, float]], n: int, full_path=None) -> RankedList:
+    """The n best of a stream of (filename, score) pairs, also writing all of them to `full_path` if given."""
+    top_n = TopN(n)
+    full_ranking = SpilledRanking(full_path) if full_path else None
+    for filename, score in pairs:
+        top_n.push(filename, score)
+        if full_ranking:
+            full_ranking.add(filename, score)
+    if full_ranking:
+        full_ranking.finish()
+    return top_n.results()
+
+
+def read_ranking(path) -> Iterable[Tuple[str, float]]:
+    """Stream a ranking file written by SpilledRanking."""
+    return SpilledRanking._read(PROJECT_ROOT / path)
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+import numpy as np
+
+from src.config import RESULT_STORE_PATH
+from src.utils.ingest import ResumeEntry
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+EMBEDDING = "embedding"
+EVALUATION = "evaluation"
+RERANK = "rerank"
+
+QUERY_CHUNK = 500
+
+
+class ManifestDiff(NamedTuple):
+    added: List[str]
+    changed: List[str]
+    deleted: List[str]
+    unchanged: List[str]
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _encode(stage: str, value: Any):
+    if stage == EMBEDDING:
+        return np.asarray(value, dtype=np.float32).tobytes()
+    return json.dumps(value, default=str)
+
+
+def _decode(stage: str, value):
+    if stage == EMBEDDING:
+        return np.frombuffer(value, dtype=np.float32)
+    return json.loads(value)
+
+
+class ResultStore:
+    """
+    Corpus manifest of (path, size, mtime, content hash) plus the output of every pipeline stage per resume.
+    A stage result is only served while the resume's content hash and the stage key it was computed
+    under (model, criteria, ...) both still match, so edits invalidate exactly the dependent work.
+    """
+
+    def __init__(self, path=RESULT_STORE_PATH):
+        self.path = PROJECT_ROOT / path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS manifest (
+                resume_id TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stage_results (
+                resume_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                stage_key TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                value BLOB,
+                PRIMARY KEY (resume_id, stage)
+            );""")
+
+    def sync_manifest(self, entries: Iterable[ResumeEntry]) -> ManifestDiff:
+        """
+        Bring the manifest in line with the files on disk. Only new files and files whose size or mtime
+        moved are hashed; results of deleted resumes are dropped.
+        """
+        with self._lock:
+            known = {row[0]: row[1:] for row in self._connection.execute(
+                "SELECT resume_id, size, mtime_ns, content_hash FROM manifest")}
+        added, changed, unchanged, rows = [], [], [], []
+        for entry in entries:
+            previous = known.pop(entry.id, None)
+            if previous is not None and previous[:2] == (entry.size, entry.mtime_ns):
+                unchanged.append(entry.id)
+                continue
+            content_hash = file_digest(entry.path)
+            if previous is None:
+                added.append(entry.id)
+            elif previous[2] != content_hash:
+                changed.append(entry.id)
+            else:
+                unchanged.append(entry.id)  # touched but identical
+            rows.append((entry.id, entry.path, entry.size, entry.mtime_ns, content_hash))
+        deleted = list(known)
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO manifest (resume_id, path, size, mtime_ns, content_hash) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+            self._connection.executemany("DELETE FROM manifest WHERE resume_id = ?", [(i,) for i in deleted])
+            self._connection.executemany("DELETE FROM stage_results WHERE resume_id = ?", [(i,) for i in deleted])
+        return ManifestDiff(added, changed, deleted, unchanged)
+
+    def get_stage(self, stage: str, stage_key: str, resume_ids: Iterable[str]) -> Dict[str, Any]:
+        """Valid results of `stage` for the given resumes; stale or missing ones are left out."""
+        resume_ids = list(resume_ids)
+        found = {}
+        with self._lock:
+            for start in range(0, len(resume_ids), QUERY_CHUNK):
+                chunk = resume_ids[start:start + QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self._connection.execute(f"""
+                    SELECT r.resume_id, r.value FROM stage_results r
+                    JOIN manifest m ON m.resume_id = r.resume_id AND m.content_hash = r.content_hash
+                    WHERE r.stage = ? AND r.stage_key = ? AND r.resume_id IN ({placeholders})""",
+                                                      (stage, stage_key, *chunk)).fetchall())
+        return {resume_id: _decode(stage, found[resume_id]) for resume_id in resume_ids if resume_id in found}
+
+    def put_stage(self, stage: str, stage_key: str, values: Dict[str, Any]):
+        """Record stage outputs against each resume's current content hash."""
+        with self._lock, self._connection:
+            self._connection.executemany("""
+                INSERT OR REPLACE INTO stage_results (resume_id, stage, stage_key, content_hash, value)
+                SELECT resume_id, ?, ?, content_hash, ? FROM manifest WHERE resume_id = ?""",
+                                         [(stage, stage_key, _encode(stage, value), resume_id)
+                                          for resume_id, value in values.items()])
+
+    def resume_ids(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._connection.execute("SELECT resume_id FROM manifest ORDER BY resume_id")]
@@ -0,0 +1,180 @@
+import mmap
+from collections.abc import Mapping
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class ResumeRecord:
+    """One resume of a ResumeStore, materialized on demand; the store itself keeps only columns."""
+
+    __slots__ = ("id", "filename", "text")
+
+    def __init__(self, resume_id: int, filename: str, text: str):
+        self.id = resume_id
+        self.filename = filename
+        self.text = text
+
+    def __repr__(self):
+        return f"ResumeRecord({self.id}, {self.filename!r}, {len(self.text)} chars)"
+
+
+def _map(path: str) -> mmap.mmap:
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ResumeStore:
+    """
+    Every resume text exactly once, UTF-8 encoded back to back in one buffer and addressed by integer id
+    through an offsets array. With a path the buffer is written to that file and memory-mapped, so the
+    text is paged in by the OS instead of living on the Python heap.
+    """
+
+    def __init__(self, filenames: List[str], offsets: np.ndarray, buffer, path: Optional[str] = None):
+        self.filenames = filenames
+        self.offsets = offsets  # int64, offsets[i]:offsets[i + 1] is resume i
+        self.buffer = buffer
+        self.path = path  # set when the buffer maps this file
+        self.ids = {filename: resume_id for resume_id, filename in enumerate(filenames)}
+
+    @classmethod
+    def build(cls, resumes: Iterable[Tuple[str, str]], path: Optional[str] = None) -> "ResumeStore":
+        filenames, lengths, buffer = [], [], bytearray()
+        file = open(path, "wb") if path is not None else None
+        write = file.write if file else buffer.extend
+        try:
+            for filename, text in resumes:
+                encoded = text.encode("utf-8", errors="replace")
+                filenames.append(filename)
+                lengths.append(len(encoded))
+                write(encoded)
+        finally:
+            if file:
+                file.close()
+        mapped = path is not None and sum(lengths) > 0  # an empty file cannot be mapped
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(filenames, offsets, _map(path) if mapped else buffer, path if mapped else None)
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def text(self, resume_id: int) -> str:
+        return str(memoryview(self.buffer)[self.offsets[resume_id]:self.offsets[resume_id + 1]], "utf-8")
+
+    def record(self, resume_id: int) -> ResumeRecord:
+        return ResumeRecord(resume_id, self.filenames[resume_id], self.text(resume_id))
+
+    def view(self, selection: Optional[np.ndarray] = None) -> "ResumeView":
+        """The resumes picked by an array of ids or a boolean mask over all ids; None picks every resume."""
+        if selection is None:
+            return ResumeView(self, np.arange(len(self), dtype=np.int32))
+        selection = np.asarray(selection)
+        return ResumeView(self, np.flatnonzero(selection) if selection.dtype == bool else selection)
+
+    def nbytes(self) -> int:
+        return len(self.buffer) + self.offsets.nbytes
+
+    def __getstate__(self):
+        # Checkpoints pickle the shared state; a memory-mapped store is saved as its path and mapped again on load
+        return self.filenames, self.offsets, None if self.path else self.buffer, self.path
+
+    def __setstate__(self, state):
+        filenames, offsets, buffer, path = state
+        if path is not None:
+            buffer = _map(path)
+            if len(buffer) != offsets[-1]:
+                raise ValueError(f"{path} changed since this ResumeStore was saved")
+        self.__init__(filenames, offsets, buffer, path)
+
+
+class ResumeView(Mapping):
+    """
+    Read-only filename -> text mapping over part of a ResumeStore, held as an array of integer ids.
+    Stage outputs are views of one store, so narrowing RESUMES to RELEVANT_RESUMES copies no text.
+    """
+
+    def __init__(self, store: ResumeStore, ids: np.ndarray):
+        self.store = store
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self._mask = None
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Boolean membership over every id of the store."""
+        if self._mask is None:
+            self._mask = np.zeros(len(self.store), dtype=bool)
+            self._mask[self.ids] = True
+        return self._mask
+
+    def _id(self, filename: str) -> int:
+        resume_id = self.store.ids.get(filename)
+        if resume_id is None or not self.mask[resume_id]:
+            raise KeyError(filename)
+        return resume_id
+
+    def __getitem__(self, filename: str) -> str:
+        return self.store.text(self._id(filename))
+
+    def __contains__(self, filename) -> bool:
+        resume_id = self.store.ids.get(filename)
+        return resume_id is not None and bool(self.mask[resume_id])
+
+    def __iter__(self) -> Iterator[str]:
+        filenames = self.store.filenames
+        return (filenames[resume_id] for resume_id in self.ids.tolist())
+
+    def __len__(self):
+        return len(self.ids)
+
+    def subset(self, filenames: Iterable[str]) -> "ResumeView":
+        return ResumeView(self.store, np.fromiter((self._id(filename) for filename in filenames), dtype=np.int32))
+
+    def records(self) -> Iterator[ResumeRecord]:
+        return (self.store.record(resume_id) for resume_id in self.ids.tolist())
+
+    def total_size(self) -> int:
+        offsets = self.store.offsets
+        return int((offsets[self.ids + 1] - offsets[self.ids]).sum())
+
+    def __getstate__(self):
+        return self.store, self.ids
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+
+class EmbeddingMatrix(Mapping):
+    """Read-only filename -> embedding mapping over one float32 matrix; row i belongs to the i-th filename."""
+
+    def __init__(self, filenames: List[str], matrix: np.ndarray):
+        self.filenames = filenames
+        self.matrix = matrix
+        self.rows = {filename: row for row, filename in enumerate(filenames)}
+
+    @classmethod
+    def from_items(cls, embeddings: Iterable[Tuple[str, Sequence[float]]]) -> "EmbeddingMatrix":
+        filenames, rows = [], []
+        for filename, embedding in embeddings:
+            filenames.append(filename)
+            rows.append(np.asarray(embedding, dtype=np.float32))
+        return cls(filenames, np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32))
+
+    def __getitem__(self, filename: str) -> np.ndarray:
+        return self.matrix[self.rows[filename]]
+
+    def __contains__(self, filename) -> bool:
+        return filename in self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.filenames)
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __getstate__(self):
+        return self.filenames, self.matrix
+
+    def __setstate__(self, state):
+        self.__init__(*state)
@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from src.config import RERANKER_CACHE_ENABLED, RERANKER_CACHE_PATH, RERANKER_CACHE_MAX_BYTES
+from src.utils.embedding_cache import text_digest
+from src.utils.logger import configured_logger
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+QUERY_CHUNK = 500  # stay well below SQLite's bound-parameter limit
+EVICT_FRACTION = 0.1
+
+
+class RerankerScoreCache:
+    """
+    SQLite cache of reranker scores keyed by (model, criteria hash, resume hash).
+    A new criteria text or model simply stops matching old entries, which age out through LRU eviction
+    once the database file grows past `max_bytes`.
+    """
+
+    def __init__(self, path=RERANKER_CACHE_PATH, max_bytes=RERANKER_CACHE_MAX_BYTES):
+        self.path = PROJECT_ROOT / path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        # Must be set before the first table is created for freed pages to be returned to the OS
+        self._connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                model TEXT NOT NULL,
+                criteria_hash TEXT NOT NULL,
+                resume_hash TEXT NOT NULL,
+                score REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (model, criteria_hash, resume_hash)
+            ) WITHOUT ROWID""")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS scores_accessed ON scores (accessed)")
+        self._connection.commit()
+
+    def get_many(self, model: str, criteria: str, items: List[str]) -> List[Optional[float]]:
+        criteria_hash = text_digest(criteria)
+        hashes = [text_digest(item) for item in items]
+        found = {}
+        now = time.time()
+        with self._lock, self._connection:
+            for start in range(0, len(hashes), QUERY_CHUNK):
+                chunk = list(set(hashes[start:start + QUERY_CHUNK]))
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT resume_hash, score FROM scores WHERE model = ? AND criteria_hash = ? "
+                    f"AND resume_hash IN ({placeholders})", (model, criteria_hash, *chunk)).fetchall()
+                found.update(rows)
+                self._connection.execute(
+                    f"UPDATE scores SET accessed = ? WHERE model = ? AND criteria_hash = ? "
+                    f"AND resume_hash IN ({placeholders})", (now, model, criteria_hash, *chunk))
+        scores = [found.get(resume_hash) for resume_hash in hashes]
+        hits = sum(score is not None for score in scores)
+        self.hits += hits
+        self.misses += len(scores) - hits
+        return scores
+
+    def put_many(self, model: str, criteria: str, items: List[str], scores: List[float]):
+        criteria_hash = text_digest(criteria)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO scores (model, criteria_hash, resume_hash, score, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(model, criteria_hash, text_digest(item), float(score), now) for item, score in zip(items, scores)])
+        self.evict()
+
+    def size_bytes(self) -> int:
+        page_count = self._connection.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * self._connection.execute("PRAGMA page_size").fetchone()[0]
+
+    def evict(self):
+        """Drop the least recently used tenth of the entries until the database fits in max_bytes."""
+        with self._lock:
+            evicted = 0
+            while self.size_bytes() > self.max_bytes:
+                with self._connection:
+                    count = self._connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+                    if not count:
+                        break
+                    evicted += self._connection.execute(
+                        "DELETE FROM scores WHERE (model, criteria_hash, resume_hash) IN "
+                        "(SELECT model, criteria_hash, resume_hash FROM scores ORDER BY accessed LIMIT ?)",
+                        (max(1, int(count * EVICT_FRACTION)),)).rowcount
+                self._connection.execute("PRAGMA incremental_vacuum")
+        if evicted:
+            configured_logger.debug(f"Reranker score cache evicted {evicted} entries")
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[RerankerScoreCache] = None
+
+
+def get_score_cache() -> Optional[RerankerScoreCache]:
+    global _cache
+    if not RERANKER_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = RerankerScoreCache()
+    return _cache
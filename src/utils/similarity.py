@@ -0,0 +1,38 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place; zero rows stay zero."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def stack_embeddings(embeddings: Iterable) -> np.ndarray:
+    """Stack embeddings into one contiguous, row-normalized float32 matrix of shape (N, D)."""
+    # A matrix is copied as well, the caller's rows are not normalized in place
+    matrix = np.array(embeddings if isinstance(embeddings, np.ndarray) else list(embeddings), dtype=np.float32,
+                      ndmin=2)
+    return normalize_rows(matrix)
+
+
+def cosine_scores(matrix: np.ndarray, query) -> np.ndarray:
+    """Cosine similarity of every row of a normalized `matrix` against `query`, as one matrix-vector product."""
+    query = np.asarray(query, dtype=np.float32)
+    norm = np.linalg.norm(query)
+    if norm > 0:
+        query = query / norm
+    return matrix @ query
+
+
+def select_candidates(scores: np.ndarray, threshold: float, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of scores above `threshold`, best first.
+    With `top_k`, at most k indices are kept, found with argpartition instead of a full sort.
+    """
+    indices = np.flatnonzero(scores > threshold)
+    if top_k is not None and len(indices) > top_k:
+        indices = indices[np.argpartition(scores[indices], -top_k)[-top_k:]]
+    return indices[np.argsort(scores[indices])[::-1]]
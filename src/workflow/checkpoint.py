@@ -0,0 +1,187 @@
+import copy
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+from pocketflow import Flow, BatchNode
+
+from src.config import CHECKPOINT_DIR
+from src.utils.logger import configured_logger
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+STATE_FILE = "shared.pkl"
+META_FILE = "checkpoint.json"
+
+
+def item_key(item) -> str:
+    return hashlib.sha256(pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+class ProgressLog:
+    """Append-only log of (item key, result) records for one batch node; one pickle frame per finished item."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Any]:
+        results = {}
+        if not self.path.exists():
+            return results
+        with open(self.path, "r+b") as f:
+            good_end = 0
+            while True:
+                try:
+                    key, result = pickle.load(f)
+                except Exception:  # EOFError at the end, or a torn record
+                    break
+                results[key] = result
+                good_end = f.tell()
+            if f.seek(0, os.SEEK_END) > good_end:
+                # A crash mid-append leaves a torn last record, everything before it is intact. Cut it off,
+                # or the records appended after it would be unreadable on the next resume.
+                configured_logger.warning(f"Dropping truncated record at the end of {self.path}")
+                f.truncate(good_end)
+        return results
+
+    def append(self, key: str, result):
+        record = pickle.dumps((key, result), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, open(self.path, "ab") as f:
+            f.write(record)
+            f.flush()
+
+
+class Checkpoint:
+    """
+    On-disk checkpoint of one flow run: the shared state after the last completed node,
+    the path of (node, action) taken so far and per-item progress logs for batch nodes.
+    """
+
+    def __init__(self, directory=CHECKPOINT_DIR):
+        self.directory = PROJECT_ROOT / directory
+
+    def reset(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def load(self):
+        """The saved shared state and completed path, or (None, []) when there is nothing to resume."""
+        meta_path = self.directory / META_FILE
+        if not meta_path.exists():
+            return None, []
+        with open(meta_path, "r", encoding="utf-8") as f:
+            completed = json.load(f)["completed"]
+        with open(self.directory / STATE_FILE, "rb") as f:
+            return pickle.load(f), completed
+
+    def save(self, shared, completed: List[Dict[str, str]]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # State first, then the metadata pointing at it, each replaced atomically
+        tmp_state = self.directory / (STATE_FILE + ".tmp")
+        with open(tmp_state, "wb") as f:
+            pickle.dump(shared, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_state, self.directory / STATE_FILE)
+        tmp_meta = self.directory / (META_FILE + ".tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"completed": completed}, f)
+        os.replace(tmp_meta, self.directory / META_FILE)
+
+    def progress_log(self, position: int, node) -> ProgressLog:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return ProgressLog(self.directory / f"{position:02d}_{type(node).__name__}.progress")
+
+
+def _track_items(node: BatchNode, log: ProgressLog):
+    """
+    Make a (copied) batch node skip items finished in an earlier attempt and log every item it finishes,
+    whether the node runs them sequentially or concurrently through exec_async.
+    """
+    run_batch, run_item = node._exec, node.exec
+
+    def exec_item(item, *args):
+        result = run_item(item, *args)
+        log.append(item_key(item), result)
+        return result
+
+    node.exec = exec_item
+
+    if hasattr(node, "exec_async"):
+        run_item_async = node.exec_async
+
+        async def exec_item_async(item, *args):
+            result = await run_item_async(item, *args)
+            log.append(item_key(item), result)
+            return result
+
+        node.exec_async = exec_item_async
+
+    def exec_batch(items):
+        done = log.load()
+        if items is not None and not isinstance(items, (list, tuple)):
+            # Streamed batches (lazy ingestion) stay streamed, one batch in memory at a time
+            return [done[key] if key in done else run_batch([item])[0]
+                    for item, key in ((item, item_key(item)) for item in items)]
+        items = list(items or [])
+        keys = [item_key(item) for item in items]
+        pending = [item for item, key in zip(items, keys) if key not in done]
+        if len(pending) < len(items):
+            configured_logger.info(
+                f"{type(node).__name__}: resuming with {len(items) - len(pending)} of {len(items)} items done")
+            if hasattr(node, "resumed"):
+                # Nodes whose batch depends on earlier results (wave screening) are told what was already done
+                node.resumed([done[key] for key in keys if key in done])
+        fresh = iter(run_batch(pending))
+        return [done[key] if key in done else next(fresh) for key in keys]
+
+    node._exec = exec_batch
+
+
+class CheckpointedFlow(Flow):
+    """
+    Flow that persists the shared state after every node and each finished batch item,
+    so a crashed run can continue from the last completed item instead of from the start.
+    """
+
+    def __init__(self, start=None, checkpoint: Checkpoint = None, resume=False):
+        super().__init__(start=start)
+        self.checkpoint = checkpoint or Checkpoint()
+        self.resume = resume
+
+    def _orch(self, shared, params=None):
+        curr, p, last_action = copy.copy(self.start_node), (params or {**self.params}), None
+        completed = []
+
+        if self.resume:
+            state, completed = self.checkpoint.load()
+            if state is not None:
+                shared.clear()
+                shared.update(state)
+            for step in completed:
+                if type(curr).__name__ != step["node"]:
+                    raise RuntimeError(f"Checkpoint expects {step['node']} but the flow has {type(curr).__name__}")
+                last_action = step["action"]
+                curr = copy.copy(self.get_next_node(curr, last_action))
+            configured_logger.info(f"Resuming after {len(completed)} completed nodes")
+        else:
+            self.checkpoint.reset()
+
+        while curr:
+            curr.set_params(p)
+            if isinstance(curr, BatchNode):
+                _track_items(curr, self.checkpoint.progress_log(len(completed), curr))
+            last_action = curr._run(shared)
+            completed.append({"node": type(curr).__name__, "action": last_action or "default"})
+            self.checkpoint.save(shared, completed)
+            curr = copy.copy(self.get_next_node(curr, last_action))
+        return last_action
+
+
+def checkpointed(flow: Flow, resume=False, checkpoint: Checkpoint = None) -> CheckpointedFlow:
+    """Wrap a flow built by one of the create_*_flow functions with checkpointing."""
+    return CheckpointedFlow(start=flow.start_node, checkpoint=checkpoint, resume=resume)
@@ -1,7 +1,9 @@
 from pocketflow import Flow
 
+from src.config import SCREENING_PACKED, SCREENING_MODE
 from .nodes import ReadResumesNode, ReduceFilterResultsNode, EmbedCriteriaNode, RankResumesNode, \
-    ProcessRankResultsNode, PrefilterResumesNode, EmbedResumesNode, ScreenResumesNode
+    ProcessRankResultsNode, PrefilterResumesNode, EmbedResumesNode, ScreenResumesNode, PackedScreenResumesNode, \
+    PrescreenResumesNode, DedupResumesNode, WaveScreenResumesNode, WavePackedScreenResumesNode
 
 
 def create_resume_processing_flow():
@@ -9,13 +11,18 @@ def create_resume_processing_flow():
 
     embed_criteria_node = EmbedCriteriaNode()
     read_resumes_node = ReadResumesNode()
+    dedup_resumes_node = DedupResumesNode()
     embed_resumes_node = EmbedResumesNode()
     prefilter_resumes_node = PrefilterResumesNode()
-    screen_resumes_node = ScreenResumesNode()
+    prescreen_resumes_node = PrescreenResumesNode()
+    if SCREENING_MODE == "waves":
+        screen_resumes_node = WavePackedScreenResumesNode() if SCREENING_PACKED else WaveScreenResumesNode()
+    else:
+        screen_resumes_node = PackedScreenResumesNode() if SCREENING_PACKED else ScreenResumesNode()
     reduce_filter_results_node = ReduceFilterResultsNode()
     rank_resumes_node = RankResumesNode()
     process_rank_results_node = ProcessRankResultsNode()
 
-    embed_criteria_node >> read_resumes_node >> embed_resumes_node >> prefilter_resumes_node >> screen_resumes_node >> reduce_filter_results_node >> rank_resumes_node >> process_rank_results_node
+    embed_criteria_node >> read_resumes_node >> dedup_resumes_node >> embed_resumes_node >> prefilter_resumes_node >> prescreen_resumes_node >> screen_resumes_node >> reduce_filter_results_node >> rank_resumes_node >> process_rank_results_node
 
     return Flow(start=embed_criteria_node)
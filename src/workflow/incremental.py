@@ -0,0 +1,195 @@
+import hashlib
+import os
+
+from pocketflow import Flow, Node
+
+from src.config import DATA_DIR_NAME, LLM_MODEL, RERANKER_MODEL, RERANKER_BACKEND, SCREENING_PACKED, \
+    SCREENING_TOP_N, RANKING_CHUNK_SIZE
+from src.constants import RESUMES, DEFAULT, RESUME_EMBEDDINGS, RELEVANT_RESUMES, EVALUATIONS, \
+    QUALIFIED_RESUMES, MANIFEST_DIFF, PRESCREEN_REJECTIONS, PRESCREEN_RULE
+from src.prompts import MANDATORY_CRITERIA, EVALUATION_RESULT_FORMAT, FULL_CRITERIA
+from src.utils.ingest import LazyResumes, scan_resumes, select_resumes, iter_chunks
+from src.utils.logger import configured_logger
+from src.utils.models import call_reranker, get_embedding_provider
+from src.utils.ranking import rank_top_n
+from src.utils.result_store import ResultStore, EMBEDDING, EVALUATION, RERANK
+from src.utils.resume_store import EmbeddingMatrix
+from .nodes import EmbedCriteriaNode, EmbedResumesNode, PrefilterResumesNode, ScreenResumesNode, \
+    PackedScreenResumesNode, ReduceFilterResultsNode, RankResumesNode, ProcessRankResultsNode, PrescreenResumesNode
+
+
+def _key(*parts) -> str:
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def stage_keys():
+    """
+    What each stored stage result depends on besides the resume text. Changing MANDATORY_CRITERIA
+    invalidates evaluations, FULL_CRITERIA only the rerank scores. Similarities are not stored: with the
+    embeddings loaded, recomputing them is one matrix-vector product, cheaper than reading them back.
+    """
+    return {
+        EMBEDDING: _key(get_embedding_provider().model),
+        EVALUATION: _key(LLM_MODEL, MANDATORY_CRITERIA, EVALUATION_RESULT_FORMAT),
+        RERANK: _key(RERANKER_MODEL, RERANKER_BACKEND, FULL_CRITERIA),
+    }
+
+
+class SyncManifestNode(Node):
+    """Diff data/ against the manifest, hashing only new or modified files, and expose every resume lazily."""
+
+    def __init__(self, store: ResultStore):
+        super().__init__()
+        self.store = store
+
+    def prep(self, shared):
+        return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                            DATA_DIR_NAME)
+
+    def exec(self, data_dir):
+        try:
+            entries = list(scan_resumes(data_dir))
+            return LazyResumes(entries), self.store.sync_manifest(entries)
+        except Exception as e:
+            configured_logger.error(f"Error in SyncManifestNode.exec: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            resumes, diff = exec_res
+            shared[RESUMES] = resumes
+            shared[MANIFEST_DIFF] = {name: len(ids) for name, ids in diff._asdict().items()}
+            configured_logger.info(f"Manifest sync: {shared[MANIFEST_DIFF]}")
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in SyncManifestNode.post: {str(e)}")
+            raise
+
+
+class IncrementalEmbedResumesNode(EmbedResumesNode):
+    """Embed only resumes without a stored embedding, then serve the whole corpus from the store."""
+
+    def __init__(self, store: ResultStore):
+        super().__init__()
+        self.store = store
+
+    def prep(self, shared):
+        resumes = shared[RESUMES]
+        stored = self.store.get_stage(EMBEDDING, stage_keys()[EMBEDDING], resumes)
+        missing = [filename for filename in resumes if filename not in stored]
+        configured_logger.info(f"Embedding {len(missing)} new or changed resumes, {len(stored)} stored")
+        return super().prep({RESUMES: select_resumes(resumes, missing)})
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            fresh = {filename: embedding for batch in exec_res for filename, embedding in batch
+                     if embedding is not None}
+            self.store.put_stage(EMBEDDING, stage_keys()[EMBEDDING], fresh)
+            super().post(shared, prep_res, exec_res)
+            shared[RESUME_EMBEDDINGS] = EmbeddingMatrix.from_items(
+                self.store.get_stage(EMBEDDING, stage_keys()[EMBEDDING], shared[RESUMES]).items())
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in IncrementalEmbedResumesNode.post: {str(e)}")
+            raise
+
+
+class IncrementalScreeningMixin:
+    """
+    Screen only relevant resumes without a stored evaluation; EVALUATIONS covers every relevant resume.
+    Only LLM evaluations are stored: pre-screen rejections are recomputed each run, so a rule or
+    PRESCREEN_ENABLED change takes effect on resumes the store already holds.
+    """
+
+    def _stored_evaluations(self, relevant):
+        stored = self.store.get_stage(EVALUATION, stage_keys()[EVALUATION], relevant)
+        return {filename: evaluation for filename, evaluation in stored.items() if PRESCREEN_RULE not in evaluation}
+
+    def prep(self, shared):
+        relevant = shared[RELEVANT_RESUMES]
+        stored = self._stored_evaluations(relevant)
+        missing = [filename for filename in relevant if filename not in stored]
+        configured_logger.info(f"Screening {len(missing)} resumes, reusing {len(stored)} stored evaluations")
+        return super().prep({RELEVANT_RESUMES: select_resumes(relevant, missing),
+                             PRESCREEN_REJECTIONS: shared.get(PRESCREEN_REJECTIONS, {})})
+
+    def post(self, shared, prep_res, exec_res):
+        action = super().post(shared, prep_res, exec_res)
+        self.store.put_stage(EVALUATION, stage_keys()[EVALUATION],
+                             {filename: evaluation for filename, evaluation in shared[EVALUATIONS].items()
+                              if isinstance(evaluation, dict) and PRESCREEN_RULE not in evaluation})
+        # This run's rejections win over a stored evaluation, as they would without the store
+        shared[EVALUATIONS] = {**self._stored_evaluations(shared[RELEVANT_RESUMES]),
+                               **{filename: evaluation for filename, evaluation in shared[EVALUATIONS].items()
+                                  if isinstance(evaluation, dict) and PRESCREEN_RULE in evaluation}}
+        return action
+
+
+class IncrementalScreenResumesNode(IncrementalScreeningMixin, ScreenResumesNode):
+    def __init__(self, store: ResultStore):
+        super().__init__()
+        self.store = store
+
+
+class IncrementalPackedScreenResumesNode(IncrementalScreeningMixin, PackedScreenResumesNode):
+    def __init__(self, store: ResultStore):
+        super().__init__()
+        self.store = store
+
+
+class IncrementalRankResumesNode(RankResumesNode):
+    """Rerank only qualified resumes without a stored score and rank the full qualified set."""
+
+    def __init__(self, store: ResultStore):
+        super().__init__()
+        self.store = store
+
+    def prep(self, shared):
+        qualified = super().prep(shared)
+        return qualified, self.store.get_stage(RERANK, stage_keys()[RERANK], qualified)
+
+    def exec(self, prep_res):
+        try:
+            qualified, stored = prep_res
+            missing = [filename for filename in qualified if filename not in stored]
+            configured_logger.info(f"Reranking {len(missing)} resumes, reusing {len(stored)} stored scores")
+            fresh = {}
+            for filenames in iter_chunks(missing, RANKING_CHUNK_SIZE):
+                scores = call_reranker(self.criteria, [qualified[filename] for filename in filenames])
+                fresh.update(zip(filenames, (float(score) for score in scores)))
+
+            scores = {**stored, **fresh}
+            ranked_resumes = rank_top_n(((filename, scores[filename]) for filename in qualified if filename in scores),
+                                        SCREENING_TOP_N, self.full_path)
+            return ranked_resumes, fresh
+        except Exception as e:
+            configured_logger.error(f"Error in IncrementalRankResumesNode.exec: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        ranked_resumes, fresh = exec_res
+        self.store.put_stage(RERANK, stage_keys()[RERANK], fresh)
+        return super().post(shared, prep_res, ranked_resumes)
+
+
+def create_incremental_resume_processing_flow(store: ResultStore = None):
+    """
+    Same stages as create_resume_processing_flow, backed by the result store: a re-run only embeds,
+    screens and reranks added or changed resumes, drops deleted ones and rebuilds the summaries from the store.
+    """
+    store = store or ResultStore()
+
+    embed_criteria_node = EmbedCriteriaNode()
+    sync_manifest_node = SyncManifestNode(store)
+    embed_resumes_node = IncrementalEmbedResumesNode(store)
+    prefilter_resumes_node = PrefilterResumesNode()
+    prescreen_resumes_node = PrescreenResumesNode()
+    screen_resumes_node = (IncrementalPackedScreenResumesNode(store) if SCREENING_PACKED
+                           else IncrementalScreenResumesNode(store))
+    reduce_filter_results_node = ReduceFilterResultsNode()
+    rank_resumes_node = IncrementalRankResumesNode(store)
+    process_rank_results_node = ProcessRankResultsNode()
+
+    embed_criteria_node >> sync_manifest_node >> embed_resumes_node >> prefilter_resumes_node >> prescreen_resumes_node >> screen_resumes_node >> reduce_filter_results_node >> rank_resumes_node >> process_rank_results_node
+
+    return Flow(start=embed_criteria_node)
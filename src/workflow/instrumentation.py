@@ -0,0 +1,83 @@
+import time
+from typing import Dict
+
+from pocketflow import BaseNode, BatchNode, Flow
+
+from src.utils.metrics import metrics
+
+_instrumented: Dict[type, type] = {}
+
+
+def _instrumented_class(cls: type) -> type:
+    """
+    Subclass of a node class that times prep, exec and post, and each item of a batch node.
+    It keeps the class name, so logs, checkpoints and reports still show the original node.
+    """
+    if cls in _instrumented or cls in _instrumented.values():
+        return _instrumented.get(cls, cls)
+    name = cls.__name__
+    batch = issubclass(cls, BatchNode)
+
+    class Instrumented(cls):
+        def prep(self, shared):
+            started = time.perf_counter()
+            try:
+                return super().prep(shared)
+            finally:
+                metrics.add_time(name, "prep", time.perf_counter() - started)
+
+        def _exec(self, prep_res):
+            started = time.perf_counter()
+            try:
+                return super()._exec(prep_res)
+            finally:
+                metrics.add_time(name, "exec", time.perf_counter() - started)
+
+        def post(self, shared, prep_res, exec_res):
+            started = time.perf_counter()
+            try:
+                return super().post(shared, prep_res, exec_res)
+            finally:
+                metrics.add_time(name, "post", time.perf_counter() - started)
+
+    if batch:
+        def exec(self, item):
+            started = time.perf_counter()
+            try:
+                return super(Instrumented, self).exec(item)
+            finally:
+                metrics.observe_item(name, time.perf_counter() - started)
+
+        Instrumented.exec = exec
+
+        if hasattr(cls, "exec_async"):
+            async def exec_async(self, item, *args):
+                started = time.perf_counter()
+                try:
+                    return await super(Instrumented, self).exec_async(item, *args)
+                finally:
+                    metrics.observe_item(name, time.perf_counter() - started)
+
+            Instrumented.exec_async = exec_async
+
+    Instrumented.__name__ = name
+    Instrumented.__qualname__ = cls.__qualname__
+    Instrumented.__module__ = cls.__module__
+    _instrumented[cls] = Instrumented
+    return Instrumented
+
+
+def instrument_flow(flow: Flow) -> Flow:
+    """Instrument every node reachable from the flow's start node, including nodes of nested flows."""
+    pending, seen = [flow.start_node], set()
+    while pending:
+        node = pending.pop()
+        if node is None or id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, Flow):
+            pending.append(node.start_node)
+        elif isinstance(node, BaseNode):
+            node.__class__ = _instrumented_class(type(node))
+        pending.extend(node.successors.values())
+    return flow
@@ -0,0 +1,217 @@
+import os
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import yaml
+from pocketflow import Flow, Node
+
+from src.config import THRESHOLD, PREFILTER_TOP_K, PREFILTER_INDEX, SCREENING_PACKED, SCREENING_MODE, \
+    JOB_PRESCREEN_DEFAULT, RANKING_FULL_PATH
+from src.constants import RESUMES, DEFAULT, RESUME_EMBEDDINGS, RELEVANT_RESUMES, RESUME_SIMILARITIES, EVALUATIONS, \
+    FILTER_SUMMARY, RANKED_RESUMES, PRESCREEN_REJECTIONS, SCREENING_COVERAGE, JOB_EMBEDDINGS, JOB_CANDIDATES, \
+    JOB_RESULTS
+from src.utils.embedding_cache import embed_with_cache
+from src.utils.ingest import select_resumes
+from src.utils.logger import configured_logger
+from src.utils.models import get_embedding_provider
+from src.utils.resume_store import EmbeddingMatrix
+from src.utils.similarity import stack_embeddings, select_candidates
+from .nodes import ReadResumesNode, DedupResumesNode, EmbedResumesNode, PrescreenResumesNode, ScreenResumesNode, \
+    PackedScreenResumesNode, WaveScreenResumesNode, WavePackedScreenResumesNode, ReduceFilterResultsNode, \
+    RankResumesNode, ProcessRankResultsNode
+
+
+class Job(NamedTuple):
+    name: str
+    mandatory: str  # embedded for the prefilter and given to the LLM for screening
+    full: str  # mandatory and preferred criteria, the reranker query
+    prescreen: bool
+
+
+def load_jobs(path) -> Dict[str, Job]:
+    """
+    Jobs from a YAML mapping of job name to `mandatory` criteria, optional `preferred` criteria and an optional
+    `prescreen` flag, e.g. `backend: {mandatory: "...", preferred: "..."}`. Order is kept.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        spec = yaml.safe_load(f) or {}
+    if not isinstance(spec, dict) or not spec:
+        raise ValueError(f"{path} does not map job names to criteria")
+    jobs = {}
+    for name, criteria in spec.items():
+        if not isinstance(criteria, dict) or not criteria.get("mandatory"):
+            raise ValueError(f"Job {name!r} in {path} has no mandatory criteria")
+        mandatory = criteria["mandatory"].strip()
+        preferred = (criteria.get("preferred") or "").strip()
+        jobs[str(name)] = Job(str(name), mandatory, f"{mandatory}\n\n{preferred}" if preferred else mandatory,
+                              bool(criteria.get("prescreen", JOB_PRESCREEN_DEFAULT)))
+    return jobs
+
+
+def job_ranking_path(job: Job, path: Optional[str]) -> Optional[str]:
+    """RANKING_FULL_PATH with the job name before the extension, so jobs do not overwrite each other's ranking."""
+    if not path:
+        return None
+    root, extension = os.path.splitext(path)
+    return f"{root}.{job.name}{extension}"
+
+
+class EmbedJobsNode(Node):
+    """Embed the mandatory criteria of every job, in one request."""
+
+    def __init__(self, jobs: Dict[str, Job]):
+        super().__init__()
+        self.jobs = jobs
+
+    def exec(self, _):
+        try:
+            provider = get_embedding_provider()
+            embeddings = embed_with_cache([job.mandatory for job in self.jobs.values()], provider.embed,
+                                          provider.model)
+            missing = [name for name, embedding in zip(self.jobs, embeddings) if not embedding]
+            if missing:
+                raise RuntimeError(f"No embedding for the criteria of {missing}")
+            return dict(zip(self.jobs, embeddings))
+        except Exception as e:
+            configured_logger.error(f"Error in EmbedJobsNode.exec: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            shared[JOB_EMBEDDINGS] = exec_res
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in EmbedJobsNode.post: {str(e)}")
+            raise
+
+
+class MultiJobPrefilterNode(Node):
+    """
+    Score every resume against every job with one (N, D) x (D, J) product and keep, per job, the resumes above
+    THRESHOLD, best first. Always exact: the IVF index answers one query vector at a time.
+    """
+
+    def prep(self, shared):
+        try:
+            if PREFILTER_INDEX != "exact":
+                configured_logger.warning("Multi-job prefilter scores every resume exactly, PREFILTER_INDEX is ignored")
+            return shared[JOB_EMBEDDINGS], shared[RESUME_EMBEDDINGS]
+        except Exception as e:
+            configured_logger.error(f"Error in MultiJobPrefilterNode.prep: {str(e)}")
+            raise
+
+    def exec(self, prep_res):
+        try:
+            job_embeddings, resume_embeddings = prep_res
+            if not resume_embeddings:
+                return {job: {} for job in job_embeddings}
+
+            filenames = list(resume_embeddings.keys())
+            resume_matrix = stack_embeddings(resume_embeddings.matrix if isinstance(resume_embeddings, EmbeddingMatrix)
+                                             else resume_embeddings.values())
+            scores = resume_matrix @ stack_embeddings(job_embeddings.values()).T
+            candidates = {}
+            for column, job in enumerate(job_embeddings):
+                job_scores = np.ascontiguousarray(scores[:, column])
+                selected = select_candidates(job_scores, THRESHOLD, PREFILTER_TOP_K)
+                candidates[job] = dict(zip((filenames[i] for i in selected), job_scores[selected].tolist()))
+                configured_logger.info(f"Prefilter kept {len(selected)} of {len(filenames)} resumes for {job}")
+            return candidates
+        except Exception as e:
+            configured_logger.error(f"Error in MultiJobPrefilterNode.exec: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            shared[JOB_CANDIDATES] = exec_res
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in MultiJobPrefilterNode.post: {str(e)}")
+            raise
+
+
+class SelectJobNode(Node):
+    """Point the single-job keys at one job's candidates, so the regular screening and ranking nodes can run."""
+
+    def __init__(self, job: Job):
+        super().__init__()
+        self.job = job
+
+    def prep(self, shared):
+        try:
+            return shared[JOB_CANDIDATES][self.job.name], shared[RESUMES]
+        except Exception as e:
+            configured_logger.error(f"Error in SelectJobNode.prep: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            similarities, resumes = prep_res
+            shared[RELEVANT_RESUMES] = select_resumes(resumes, list(similarities))
+            shared[RESUME_SIMILARITIES] = similarities
+            # Left over from the previous job otherwise
+            shared[PRESCREEN_REJECTIONS] = {}
+            shared.pop(SCREENING_COVERAGE, None)
+            print(f"\n==== Job: {self.job.name} ({len(similarities)} relevant resumes) ====")
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in SelectJobNode.post: {str(e)}")
+            raise
+
+
+class CollectJobResultsNode(Node):
+    """Keep one job's summaries and ranking under JOB_RESULTS before the next job reuses the single-job keys."""
+
+    def __init__(self, job: Job):
+        super().__init__()
+        self.job = job
+
+    def prep(self, shared):
+        try:
+            return {
+                FILTER_SUMMARY: shared[FILTER_SUMMARY],
+                EVALUATIONS: shared[EVALUATIONS],
+                RANKED_RESUMES: shared[RANKED_RESUMES],
+                "RANKING_SUMMARY": shared["RANKING_SUMMARY"],
+            }
+        except Exception as e:
+            configured_logger.error(f"Error in CollectJobResultsNode.prep: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            shared.setdefault(JOB_RESULTS, {})[self.job.name] = prep_res
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in CollectJobResultsNode.post: {str(e)}")
+            raise
+
+
+def create_multi_job_resume_processing_flow(jobs: Dict[str, Job]):
+    """
+    Screen and rank the resumes in data/ against several jobs in one run. Reading, deduplication and
+    embedding happen once; the reranker model loaded for the first job serves the others.
+    """
+
+    embed_jobs_node = EmbedJobsNode(jobs)
+    read_resumes_node = ReadResumesNode()
+    dedup_resumes_node = DedupResumesNode()
+    embed_resumes_node = EmbedResumesNode()
+    prefilter_resumes_node = MultiJobPrefilterNode()
+
+    embed_jobs_node >> read_resumes_node >> dedup_resumes_node >> embed_resumes_node >> prefilter_resumes_node
+
+    last_node = prefilter_resumes_node
+    for job in jobs.values():
+        if SCREENING_MODE == "waves":
+            screen_class = WavePackedScreenResumesNode if SCREENING_PACKED else WaveScreenResumesNode
+        else:
+            screen_class = PackedScreenResumesNode if SCREENING_PACKED else ScreenResumesNode
+        full_path = job_ranking_path(job, RANKING_FULL_PATH)
+        job_nodes = [SelectJobNode(job)] + ([PrescreenResumesNode()] if job.prescreen else []) + [
+            screen_class(job.mandatory), ReduceFilterResultsNode(), RankResumesNode(job.full, full_path),
+            ProcessRankResultsNode(full_path), CollectJobResultsNode(job)]
+        for node in job_nodes:
+            last_node = last_node >> node
+
+    return Flow(start=embed_jobs_node)
@@ -1,19 +1,36 @@
+import asyncio
 import os
 from typing import Dict
 
 import numpy as np
 import yaml
 from pocketflow import Node, BatchNode
-from sklearn.metrics.pairwise import cosine_similarity
 
-from src.config import THRESHOLD, SCREENING_TOP_N, DATA_DIR_NAME
+from src.config import THRESHOLD, SCREENING_TOP_N, DATA_DIR_NAME, EMBEDDING_CACHE_ENABLED, EMBEDDING_MAX_BATCH_SIZE, \
+    PREFILTER_TOP_K, PREFILTER_INDEX, SCREENING_CONCURRENCY, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, \
+    LLM_MODEL, SCREENING_PACK_MAX_RESUMES, SCREENING_PACK_TOKEN_BUDGET, RESUME_INGESTION, INGEST_CHUNK_SIZE, \
+    RANKING_CHUNK_SIZE, RANKING_FULL_PATH, PRESCREEN_ENABLED, DEDUP_ENABLED, \
+    SCREENING_WAVE_SIZE, SCREENING_TARGET_QUALIFIED, SCREENING_MIN_SIMILARITY, RESUME_STORE_PATH
 from src.constants import RESUMES, DEFAULT, EVALUATIONS, QUALIFIES, CANDIDATE_NAME, FILTER_SUMMARY, \
     CRITERIA_EMBEDDING, \
      QUALIFIED_RESUMES, RANKED_RESUMES, RESUME_EMBEDDINGS, \
-    RELEVANT_RESUMES
-from src.prompts import MANDATORY_CRITERIA, EVALUATION_RESULT_FORMAT, FULL_CRITERIA
+    RELEVANT_RESUMES, EMBEDDING_FAILURES, RESUME_SIMILARITIES, PRESCREEN_REJECTIONS, PRESCREEN_RULE, DUPLICATES, \
+    DUPLICATE_OF, DUPLICATE_NAMES, SCREENING_COVERAGE
+from src.prompts import MANDATORY_CRITERIA, EVALUATION_RESULT_FORMAT, FULL_CRITERIA, BATCH_EVALUATION_RESULT_FORMAT
+from src.utils.ann_index import IVFIndex, index_directory
+from src.utils.dedup import near_duplicate_clusters, duplicate_map, expand_ranking
+from src.utils.ingest import LazyResumes, scan_resumes, iter_chunks, select_resumes, candidate_name
+from src.utils.embedding_cache import embed_with_cache, get_embedding_cache, text_digest
+from src.utils.llm_cache import get_llm_cache
 from src.utils.logger import configured_logger
-from src.utils.models import call_llm, generate_embedding, call_reranker
+from src.utils.metrics import metrics
+from src.utils.models import call_llm, acall_llm, close_async_openai_client, call_reranker, get_embedding_provider, \
+    pack_embedding_batches, estimate_tokens
+from src.utils.prescreen import prescreen_resume, rejection_evaluation
+from src.utils.ranking import rank_top_n
+from src.utils.rate_limiter import RateLimiter
+from src.utils.resume_store import ResumeStore, EmbeddingMatrix
+from src.utils.similarity import stack_embeddings, cosine_scores, select_candidates
 
 
 class EmbedCriteriaNode(Node):
@@ -24,8 +41,9 @@ class EmbedCriteriaNode(Node):
 
     def exec(self, prep_res):
         try:
-            criteria_embedding = generate_embedding([prep_res])
-            return criteria_embedding
+            provider = get_embedding_provider()
+            criteria_embedding = embed_with_cache([prep_res], provider.embed, provider.model)[0]
+            return criteria_embedding or []
         except Exception as e:
             configured_logger.error(f"Error in EmbedCriteriaNode.exec: {str(e)}")
             raise
@@ -40,21 +58,29 @@ class EmbedCriteriaNode(Node):
 
 
 class ReadResumesNode(Node):
-    """Map phase: Read all resumes from the directory into shared storage."""
+    """
+    Map phase: Read all resumes from the directory into a ResumeStore, with a view of every resume as RESUMES.
+    With RESUME_INGESTION = "lazy" only file records are collected and text is read when a stage needs it.
+    """
 
     def exec(self, _):
         try:
-            resume_files = {}
             data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
                                     DATA_DIR_NAME)
 
-            for filename in os.listdir(data_dir):
-                if filename.endswith(".txt"):
-                    file_path = os.path.join(data_dir, filename)
-                    with open(file_path, "r", encoding="utf-8", errors="replace") as file:
-                        resume_files[filename] = file.read()
+            if RESUME_INGESTION == "lazy":
+                resumes = LazyResumes(scan_resumes(data_dir))
+                configured_logger.info(f"Found {len(resumes)} resumes ({resumes.total_size()} bytes) in {data_dir}")
+                return resumes
 
-            return resume_files
+            def resume_files():
+                for filename in os.listdir(data_dir):
+                    if filename.endswith(".txt"):
+                        file_path = os.path.join(data_dir, filename)
+                        with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+                            yield filename, file.read()
+
+            return ResumeStore.build(resume_files(), RESUME_STORE_PATH).view()
         except Exception as e:
             configured_logger.error(f"Error in ReadResumesNode.exec: {str(e)}")
             raise
@@ -68,29 +94,100 @@ class ReadResumesNode(Node):
             raise
 
 
+class DedupResumesNode(Node):
+    """
+    Cluster near-duplicate resumes with MinHash and LSH and keep one representative per cluster in RESUMES.
+    DUPLICATES maps every other member to its representative, whose evaluation and score it gets later;
+    DUPLICATE_NAMES keeps each member's own candidate name, since its text leaves RESUMES.
+    """
+
+    def prep(self, shared):
+        try:
+            return shared[RESUMES]
+        except Exception as e:
+            configured_logger.error(f"Error in DedupResumesNode.prep: {str(e)}")
+            raise
+
+    def exec(self, resumes):
+        try:
+            if not DEDUP_ENABLED:
+                return {}
+            return duplicate_map(near_duplicate_clusters(resumes.items()))
+        except Exception as e:
+            configured_logger.error(f"Error in DedupResumesNode.exec: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            shared[DUPLICATES] = exec_res
+            shared[DUPLICATE_NAMES] = {duplicate: candidate_name(prep_res[duplicate]) for duplicate in exec_res}
+            if exec_res:
+                shared[RESUMES] = select_resumes(prep_res, [filename for filename in prep_res
+                                                            if filename not in exec_res])
+                metrics.increment("dedup_saved_embeddings", len(exec_res))
+            configured_logger.info(f"Found {len(exec_res)} near-duplicates of {len(set(exec_res.values()))} "
+                                   f"resumes, processing {len(prep_res) - len(exec_res)} of {len(prep_res)}")
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in DedupResumesNode.post: {str(e)}")
+            raise
+
+
 class EmbedResumesNode(BatchNode):
-    """Embed the criteria for candidate qualification"""
+    """Embed resumes in packed batches, one embedding request per batch"""
 
     def prep(self, shared):
         try:
-            resumes = list(shared[RESUMES].items())
-            return resumes
+            resumes = shared[RESUMES]
+            if isinstance(resumes, LazyResumes):
+                # A generator keeps at most INGEST_CHUNK_SIZE resume texts in memory at a time
+                return (batch for chunk in iter_chunks(resumes, INGEST_CHUNK_SIZE)
+                        for batch in self._batches([(filename, resumes[filename]) for filename in chunk]))
+            return self._batches(list(resumes.items()))
         except Exception as e:
             configured_logger.error(f"Error in EmbedResumesNode.prep: {str(e)}")
             raise
 
+    @staticmethod
+    def _batches(resumes):
+        try:
+            if EMBEDDING_CACHE_ENABLED:
+                # Cached resumes are grouped apart so only misses are packed into embedding requests
+                cache = get_embedding_cache(get_embedding_provider().model)
+                cached = [item for item in resumes if item[1] in cache]
+                resumes = [item for item in resumes if item[1] not in cache]
+            else:
+                cached = []
+            batches = pack_embedding_batches([content for _, content in resumes])
+            return ([[resumes[index] for index in batch] for batch in batches] +
+                    [cached[i:i + EMBEDDING_MAX_BATCH_SIZE] for i in range(0, len(cached), EMBEDDING_MAX_BATCH_SIZE)])
+        except Exception as e:
+            configured_logger.error(f"Error in EmbedResumesNode._batches: {str(e)}")
+            raise
+
     def exec(self, prep_res):
         try:
-            filename, content = prep_res
-            resume_embedding = generate_embedding([content])
-            return filename, resume_embedding
+            filenames = [filename for filename, _ in prep_res]
+            provider = get_embedding_provider()
+            resume_embeddings = embed_with_cache([content for _, content in prep_res], provider.embed, provider.model)
+            # float32 arrays hold an embedding in a sixth of the memory of a list of floats
+            return [(filename, np.asarray(embedding, dtype=np.float32) if embedding else None)
+                    for filename, embedding in zip(filenames, resume_embeddings)]
         except Exception as e:
             configured_logger.error(f"Error in EmbedResumesNode.exec: {str(e)}")
             raise
 
     def post(self, shared, prep_res, exec_res):
         try:
-            shared[RESUME_EMBEDDINGS] = {filename: result for filename, result in exec_res}
+            results = [result for batch in exec_res for result in batch]
+            shared[RESUME_EMBEDDINGS] = EmbeddingMatrix.from_items(
+                (filename, embedding) for filename, embedding in results if embedding is not None)
+            shared[EMBEDDING_FAILURES] = [filename for filename, embedding in results if embedding is None]
+            if shared[EMBEDDING_FAILURES]:
+                configured_logger.error(f"Resumes without embeddings: {shared[EMBEDDING_FAILURES]}")
+            if EMBEDDING_CACHE_ENABLED:
+                cache = get_embedding_cache(get_embedding_provider().model)
+                configured_logger.info(f"Embedding cache: {cache.stats()}")
             return DEFAULT
         except Exception as e:
             configured_logger.error(f"Error in EmbedResumesNode.post: {str(e)}")
@@ -108,59 +205,178 @@ class PrefilterResumesNode(Node):
     def exec(self, prep_res):
         try:
             criteria_embedding, resume_embeddings, resumes = prep_res
-            criteria_vector = np.array(criteria_embedding).reshape(1, -1)  # (1, D)
-            resume_similarity_scores = [cosine_similarity(criteria_vector, np.array(embedding).reshape(1, -1)).item()
-                                        for
-                                        _, embedding in resume_embeddings.items()]
+            if not resume_embeddings:
+                return {}, {}
+
+            if PREFILTER_INDEX == "ivf":
+                selected_filenames, selected_scores = self._search_index(criteria_embedding, resume_embeddings, resumes)
+            else:
+                selected_filenames, selected_scores = self._search_exact(criteria_embedding, resume_embeddings)
 
-            relevant_resumes = {}
-            for filename, resume, score in zip(resumes.keys(), resumes.values(), resume_similarity_scores):
-                configured_logger.info(score)
-                if score > THRESHOLD:
-                    relevant_resumes[filename] = resume
+            configured_logger.info(
+                f"Prefilter ({PREFILTER_INDEX}) kept {len(selected_filenames)} of {len(resume_embeddings)} resumes "
+                f"(threshold {THRESHOLD}, top k {PREFILTER_TOP_K})")
 
-            return relevant_resumes
+            relevant_resumes = select_resumes(resumes, selected_filenames)
+            similarities = dict(zip(selected_filenames, selected_scores.tolist()))
+            return relevant_resumes, similarities
         except Exception as e:
             configured_logger.error(f"Error in PrefilterResumesNode.exec: {str(e)}")
             raise
 
+    @staticmethod
+    def _search_exact(criteria_embedding, resume_embeddings):
+        filenames = list(resume_embeddings.keys())
+        resume_matrix = stack_embeddings(resume_embeddings.matrix if isinstance(resume_embeddings, EmbeddingMatrix)
+                                         else resume_embeddings.values())  # (N, D)
+        scores = cosine_scores(resume_matrix, criteria_embedding)  # (N,)
+        configured_logger.debug(dict(zip(filenames, scores.tolist())))
+        selected = select_candidates(scores, THRESHOLD, PREFILTER_TOP_K)
+        return [filenames[i] for i in selected], scores[selected]
+
+    @staticmethod
+    def _search_index(criteria_embedding, resume_embeddings, resumes):
+        """Bring the persistent IVF index in line with the current resumes, then query it."""
+        index = IVFIndex(index_directory(get_embedding_provider().model))
+        index.remove([filename for filename in list(index.rows) if filename not in resume_embeddings])
+        filenames = list(resume_embeddings.keys())
+        updated = index.upsert(filenames, [resume_embeddings[filename] for filename in filenames],
+                               [text_digest(resumes[filename]) for filename in filenames])
+        index.save()
+        configured_logger.info(f"ANN index holds {len(index)} resumes, {updated} added or updated")
+        return index.search(criteria_embedding, threshold=THRESHOLD, k=PREFILTER_TOP_K)
+
     def post(self, shared, prep_res, exec_res):
         try:
-            shared[RELEVANT_RESUMES] = exec_res
+            relevant_resumes, similarities = exec_res
+            shared[RELEVANT_RESUMES] = relevant_resumes
+            shared[RESUME_SIMILARITIES] = similarities
             return DEFAULT
         except Exception as e:
             configured_logger.error(f"Error in PrefilterResumesNode.post: {str(e)}")
             raise
 
 
-class ScreenResumesNode(BatchNode):
-    """Batch processing: Evaluate each resume to determine if the candidate qualifies."""
+class PrescreenResumesNode(Node):
+    """
+    Reject resumes that clearly fail the experience criterion with compiled patterns, before any
+    LLM call. Rejections carry the rule that fired; every other relevant resume goes on to screening.
+    """
 
     def prep(self, shared):
         try:
-            return list(shared[RELEVANT_RESUMES].items())
+            return shared[RELEVANT_RESUMES]
         except Exception as e:
-            configured_logger.error(f"Error in ScreenResumesNode.prep: {str(e)}")
+            configured_logger.error(f"Error in PrescreenResumesNode.prep: {str(e)}")
             raise
 
-    def exec(self, resume_item):
-        """Evaluate a single resume."""
+    def exec(self, relevant_resumes):
         try:
-            filename, content = resume_item
+            rejections = {}
+            if not PRESCREEN_ENABLED:
+                return rejections
+            for filename, content in relevant_resumes.items():
+                result = prescreen_resume(content)
+                if result.rule is not None:
+                    rejections[filename] = rejection_evaluation(content, result)
+            return rejections
+        except Exception as e:
+            configured_logger.error(f"Error in PrescreenResumesNode.exec: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            shared[PRESCREEN_REJECTIONS] = exec_res
+            rules = {}
+            for evaluation in exec_res.values():
+                rules[evaluation[PRESCREEN_RULE]] = rules.get(evaluation[PRESCREEN_RULE], 0) + 1
+            configured_logger.info(f"Pre-screen rejected {len(exec_res)} of {len(prep_res)} resumes {rules}, "
+                                   f"{len(prep_res) - len(exec_res)} go to LLM screening")
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in PrescreenResumesNode.post: {str(e)}")
+            raise
+
 
-            prompt = f"""
+def build_screening_prompt(content, criteria=MANDATORY_CRITERIA):
+    return f"""
 Evaluate the following resume and determine if the candidate qualifies for an advanced technical role.
-{MANDATORY_CRITERIA}
+{criteria}
 
 Resume:
 {content}
 
 {EVALUATION_RESULT_FORMAT}
 """
-            response = call_llm(prompt)
 
-            yaml_content = response.split("```yaml")[1].split("```")[0].strip() if "```yaml" in response else response
-            result = yaml.safe_load(yaml_content)
+
+def build_packed_screening_prompt(resume_items, criteria=MANDATORY_CRITERIA):
+    resumes = "\n\n".join(f"=== Resume: {filename} ===\n{content}\n=== End of resume: {filename} ==="
+                           for filename, content in resume_items)
+    return f"""
+Evaluate each of the following {len(resume_items)} resumes independently and determine if each candidate qualifies for an advanced technical role.
+{criteria}
+
+{resumes}
+
+{BATCH_EVALUATION_RESULT_FORMAT}
+"""
+
+
+def parse_evaluation(response):
+    yaml_content = response.split("```yaml")[1].split("```")[0].strip() if "```yaml" in response else response
+    return yaml.safe_load(yaml_content)
+
+
+def get_cached_evaluation(prompt):
+    """Parsed evaluation from an earlier screening with the same prompt, if cached."""
+    cache = get_llm_cache()
+    cached = cache.get(LLM_MODEL, 0.0, prompt) if cache is not None else None
+    return cached.parsed if cached else None
+
+
+def is_evaluation(evaluation):
+    return isinstance(evaluation, dict) and isinstance(evaluation.get(QUALIFIES), bool)
+
+
+def cache_evaluation(prompt, evaluation):
+    """Only well-formed evaluations are cached, a malformed reply must not be served again on retry."""
+    cache = get_llm_cache()
+    if cache is not None and is_evaluation(evaluation):
+        cache.put(LLM_MODEL, 0.0, prompt, parsed=evaluation)
+
+
+class ScreenResumesNode(BatchNode):
+    """
+    Batch processing: Evaluate each resume to determine if the candidate qualifies.
+    With SCREENING_CONCURRENCY > 1 resumes are screened concurrently under the LLM rate limits.
+    """
+
+    def __init__(self, criteria=MANDATORY_CRITERIA, **kwargs):
+        super().__init__(**kwargs)
+        self.criteria = criteria
+
+    def prep(self, shared):
+        try:
+            rejected = shared.get(PRESCREEN_REJECTIONS, {})
+            return [(filename, content) for filename, content in shared[RELEVANT_RESUMES].items()
+                    if filename not in rejected]
+        except Exception as e:
+            configured_logger.error(f"Error in ScreenResumesNode.prep: {str(e)}")
+            raise
+
+    def exec(self, resume_item):
+        """Evaluate a single resume."""
+        try:
+            filename, content = resume_item
+            prompt = build_screening_prompt(content, self.criteria)
+
+            result = get_cached_evaluation(prompt)
+            if result is None:
+                # The raw reply is not cached: only the parsed evaluation is, once it parsed
+                response = call_llm(prompt, use_cache=False)
+                result = parse_evaluation(response)
+                cache_evaluation(prompt, result)
 
             # configured_logger.debug(result)
 
@@ -169,15 +385,237 @@ Resume:
             configured_logger.error(f"Error in ScreenResumesNode.exec: {str(e)}")
             raise
 
+    async def exec_async(self, resume_item, rate_limiter):
+        """Evaluate a single resume without blocking the other screening calls."""
+        try:
+            filename, content = resume_item
+            prompt = build_screening_prompt(content, self.criteria)
+
+            result = get_cached_evaluation(prompt)
+            if result is None:
+                response = await acall_llm(prompt, rate_limiter=rate_limiter, use_cache=False)
+                result = parse_evaluation(response)
+                cache_evaluation(prompt, result)
+
+            return filename, result
+        except Exception as e:
+            configured_logger.error(f"Error in ScreenResumesNode.exec_async: {str(e)}")
+            raise
+
+    def _exec(self, items):
+        if SCREENING_CONCURRENCY <= 1 or len(items or []) <= 1:
+            return super()._exec(items)
+        return asyncio.run(self._exec_concurrent(items))
+
+    async def exec_async_with_retries(self, item, rate_limiter):
+        """exec_async under the same retry contract as Node._exec."""
+        for retry in range(self.max_retries):
+            try:
+                return await self.exec_async(item, rate_limiter)
+            except Exception as e:
+                if retry == self.max_retries - 1:
+                    return self.exec_fallback(item, e)
+                if self.wait > 0:
+                    await asyncio.sleep(self.wait)
+
+    async def _exec_concurrent(self, items):
+        semaphore = asyncio.Semaphore(SCREENING_CONCURRENCY)
+        rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
+
+        async def screen(item):
+            async with semaphore:
+                return await self.exec_async_with_retries(item, rate_limiter)
+
+        try:
+            # gather keeps results in input order
+            return await asyncio.gather(*(screen(item) for item in items))
+        finally:
+            # asyncio.run closes this loop next; the client's connections are bound to it
+            await close_async_openai_client()
+
     def post(self, shared, prep_res, exec_res):
         try:
-            shared[EVALUATIONS] = {filename: result for filename, result in exec_res}
+            # Pre-screen rejections are evaluations too, so the reduce step counts every relevant resume
+            evaluations = {**shared.get(PRESCREEN_REJECTIONS, {}),
+                           **{filename: result for filename, result in exec_res}}
+            names = shared.get(DUPLICATE_NAMES, {})
+            copied = {duplicate: {**evaluations[representative], DUPLICATE_OF: representative,
+                                  CANDIDATE_NAME: names.get(duplicate, evaluations[representative].get(CANDIDATE_NAME))}
+                      for duplicate, representative in shared.get(DUPLICATES, {}).items()
+                      if isinstance(evaluations.get(representative), dict)}
+            if copied:
+                saved = sum(PRESCREEN_RULE not in evaluation for evaluation in copied.values())
+                metrics.increment("dedup_saved_llm_screens", saved)
+                configured_logger.info(
+                    f"Copied evaluations to {len(copied)} near-duplicates, {saved} LLM screens saved")
+            shared[EVALUATIONS] = {**evaluations, **copied}
             return DEFAULT
         except Exception as e:
             configured_logger.error(f"Error in ScreenResumesNode.post: {str(e)}")
             raise
 
 
+class PackedScreenResumesNode(ScreenResumesNode):
+    """
+    Screen several resumes per LLM call so the criteria and format instructions are paid once per pack.
+    Packs are filled up to SCREENING_PACK_TOKEN_BUDGET; resumes missing from a malformed
+    response are screened again one at a time.
+    """
+
+    def prep(self, shared):
+        try:
+            resume_items = super().prep(shared)
+            packs, current, current_tokens = [], [], 0
+            for filename, content in resume_items:
+                tokens = estimate_tokens(content, LLM_MODEL)
+                if current and (len(current) >= SCREENING_PACK_MAX_RESUMES or
+                                current_tokens + tokens > SCREENING_PACK_TOKEN_BUDGET):
+                    packs.append(current)
+                    current, current_tokens = [], 0
+                current.append((filename, content))
+                current_tokens += tokens
+            if current:
+                packs.append(current)
+            return packs
+        except Exception as e:
+            configured_logger.error(f"Error in PackedScreenResumesNode.prep: {str(e)}")
+            raise
+
+    def _split_cached(self, pack):
+        cached = {}
+        for filename, content in pack:
+            evaluation = get_cached_evaluation(build_screening_prompt(content, self.criteria))
+            if evaluation is not None:
+                cached[filename] = evaluation
+        return cached, [(filename, content) for filename, content in pack if filename not in cached]
+
+    def _parse_pack(self, response, pack):
+        """Evaluations by filename for the resumes the response covered; anything unusable is left out."""
+        try:
+            parsed = parse_evaluation(response)
+        except Exception as e:
+            configured_logger.error(f"Unparseable packed screening response: {str(e)}")
+            return {}
+        contents = dict(pack)
+        evaluations = {}
+        for evaluation in parsed if isinstance(parsed, list) else []:
+            if not is_evaluation(evaluation):
+                continue
+            filename = evaluation.pop("filename", None)
+            if filename in contents:
+                evaluations[filename] = evaluation
+                cache_evaluation(build_screening_prompt(contents[filename], self.criteria), evaluation)
+        return evaluations
+
+    @staticmethod
+    def _missing(pack, evaluations):
+        missing = [(filename, content) for filename, content in pack if filename not in evaluations]
+        if missing:
+            configured_logger.warning(
+                f"Packed screening response missed {[filename for filename, _ in missing]}, screening them individually")
+        return missing
+
+    def exec(self, pack):
+        """Evaluate a pack of resumes, falling back to single calls for the ones the response missed."""
+        try:
+            evaluations, uncached = self._split_cached(pack)
+            if uncached:
+                response = call_llm(build_packed_screening_prompt(uncached, self.criteria), use_cache=False)
+                evaluations.update(self._parse_pack(response, uncached))
+            for item in self._missing(pack, evaluations):
+                filename, evaluation = super().exec(item)
+                evaluations[filename] = evaluation
+            return [(filename, evaluations[filename]) for filename, _ in pack]
+        except Exception as e:
+            configured_logger.error(f"Error in PackedScreenResumesNode.exec: {str(e)}")
+            raise
+
+    async def exec_async(self, pack, rate_limiter):
+        try:
+            evaluations, uncached = self._split_cached(pack)
+            if uncached:
+                response = await acall_llm(build_packed_screening_prompt(uncached, self.criteria),
+                                           rate_limiter=rate_limiter, use_cache=False)
+                evaluations.update(self._parse_pack(response, uncached))
+            retried = await asyncio.gather(
+                *(super(PackedScreenResumesNode, self).exec_async(item, rate_limiter)
+                  for item in self._missing(pack, evaluations)))
+            evaluations.update(retried)
+            return [(filename, evaluations[filename]) for filename, _ in pack]
+        except Exception as e:
+            configured_logger.error(f"Error in PackedScreenResumesNode.exec_async: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        return super().post(shared, prep_res, [result for pack in exec_res for result in pack])
+
+
+class WaveScreeningMixin:
+    """
+    Screen the most similar resumes first, SCREENING_WAVE_SIZE screening calls per wave, and launch no further
+    waves once SCREENING_TARGET_QUALIFIED candidates qualified. Resumes below SCREENING_MIN_SIMILARITY are
+    skipped. SCREENING_COVERAGE records what was left unscreened, and the summaries are marked partial.
+    """
+
+    def prep(self, shared):
+        similarities = shared[RESUME_SIMILARITIES]
+        rejected = shared.get(PRESCREEN_REJECTIONS, {})
+        ordered = sorted((filename for filename in shared[RELEVANT_RESUMES] if filename not in rejected and
+                          (SCREENING_MIN_SIMILARITY is None or similarities[filename] >= SCREENING_MIN_SIMILARITY)),
+                         key=lambda filename: (-similarities[filename], filename))
+        return super().prep({RELEVANT_RESUMES: select_resumes(shared[RELEVANT_RESUMES], ordered)})
+
+    resumed_qualified = 0
+
+    @staticmethod
+    def _count_qualified(results) -> int:
+        return sum(isinstance(evaluation, dict) and evaluation.get(QUALIFIES, False) is True
+                   for result in results if result is not None
+                   for _, evaluation in (result if isinstance(result, list) else [result]))
+
+    def resumed(self, results):
+        """Checkpoint hook: `results` of the items finished before a --resume, which _exec then never sees."""
+        self.resumed_qualified = self._count_qualified(results)
+
+    def _exec(self, items):
+        # One result per item as BatchNode promises, None for the items no wave reached
+        items = list(items or [])
+        results, qualified = [None] * len(items), self.resumed_qualified
+        self.resumed_qualified = 0
+        for start in range(0, len(items), SCREENING_WAVE_SIZE):
+            if qualified >= SCREENING_TARGET_QUALIFIED:
+                break
+            wave = super()._exec(items[start:start + SCREENING_WAVE_SIZE])
+            results[start:start + len(wave)] = wave
+            qualified += self._count_qualified(wave)
+        return results
+
+    def post(self, shared, prep_res, exec_res):
+        action = super().post(shared, prep_res, [result for result in exec_res if result is not None])
+        unscreened = [filename for filename in shared[RELEVANT_RESUMES] if filename not in shared[EVALUATIONS]]
+        below_cutoff = len(shared[RELEVANT_RESUMES]) - len(shared.get(PRESCREEN_REJECTIONS, {})) - \
+            sum(len(item) if isinstance(item, list) else 1 for item in prep_res)
+        shared[SCREENING_COVERAGE] = {
+            "partial": bool(unscreened),
+            "screened": len(shared[RELEVANT_RESUMES]) - len(unscreened),
+            "unscreened": len(unscreened),
+            "below_min_similarity": below_cutoff,
+        }
+        if unscreened:
+            configured_logger.warning(
+                f"Wave screening stopped with {len(unscreened)} relevant resumes unscreened "
+                f"({below_cutoff} below the similarity cutoff), results are partial")
+        return action
+
+
+class WaveScreenResumesNode(WaveScreeningMixin, ScreenResumesNode):
+    pass
+
+
+class WavePackedScreenResumesNode(WaveScreeningMixin, PackedScreenResumesNode):
+    pass
+
+
 class ReduceFilterResultsNode(Node):
     """Reduce node: Count and print out how many candidates qualify."""
 
@@ -216,20 +654,29 @@ class ReduceFilterResultsNode(Node):
     def post(self, shared, prep_res, exec_res):
         try:
             filter_summary, qualified_resume_files = exec_res
+            coverage = shared.get(SCREENING_COVERAGE)
+            if coverage and coverage["partial"]:
+                filter_summary["partial"] = True
+                filter_summary["unscreened_count"] = coverage["unscreened"]
             shared[FILTER_SUMMARY] = filter_summary
 
             configured_logger.info("\n==== Resume Hard Filtering Summary ====")
             configured_logger.info(f"Total candidates evaluation: {filter_summary['total_candidates']} ")
             configured_logger.info(
                 f"Qualified candidates: {filter_summary['qualified_count']} ({filter_summary['qualified_percentage']}%")
+            if filter_summary.get("partial"):
+                configured_logger.info(f"Partial: {filter_summary['unscreened_count']} relevant resumes not screened")
 
             if filter_summary["qualified_names"]:
                 configured_logger.info("\nQualified Candidates:")
                 for name in filter_summary['qualified_names']:
                     configured_logger.info(f"- {name}")
 
-            shared[QUALIFIED_RESUMES] = {filename: shared[RELEVANT_RESUMES][filename] for filename in
-                                         qualified_resume_files}
+            # Near-duplicates are ranked with their representative's score instead of being reranked
+            duplicates = shared.get(DUPLICATES, {})
+            shared[QUALIFIED_RESUMES] = select_resumes(shared[RELEVANT_RESUMES],
+                                                       [filename for filename in qualified_resume_files
+                                                        if filename not in duplicates])
 
             return DEFAULT
         except Exception as e:
@@ -238,6 +685,12 @@ class ReduceFilterResultsNode(Node):
 
 
 class RankResumesNode(Node):
+    def __init__(self, criteria=FULL_CRITERIA, full_path=RANKING_FULL_PATH, keep_all=False, **kwargs):
+        super().__init__(**kwargs)
+        self.criteria = criteria
+        self.full_path = full_path
+        self.keep_all = keep_all  # keep every ranked resume, not just the top SCREENING_TOP_N
+
     def prep(self, shared):
         try:
             return shared[QUALIFIED_RESUMES]
@@ -248,18 +701,14 @@ class RankResumesNode(Node):
     def exec(self, prep_res: Dict):
         """ Remember: exec should be isolated from shared environment"""
         try:
-            filenames = []
-            resumes = []
-
-            for filename, resume in prep_res.items():
-                filenames.append(filename)
-                resumes.append(resume)
+            def resume_scores():
+                # Rerank chunk by chunk; only the best SCREENING_TOP_N (filename, score) pairs stay in memory
+                for filenames in iter_chunks(prep_res, RANKING_CHUNK_SIZE):
+                    scores = call_reranker(self.criteria, [prep_res[filename] for filename in filenames])
+                    yield from zip(filenames, (float(score) for score in scores))
 
-            scores = call_reranker(FULL_CRITERIA, resumes)
-
-            resume_scores = zip(zip(filenames, resumes), scores)
-
-            ranked_resumes = sorted(resume_scores, key=lambda x: x[1], reverse=True)
+            top_n = len(prep_res) if self.keep_all else SCREENING_TOP_N
+            ranked_resumes = rank_top_n(resume_scores(), top_n, self.full_path)
 
             configured_logger.info(ranked_resumes)
 
@@ -270,6 +719,12 @@ class RankResumesNode(Node):
 
     def post(self, shared, prep_res, exec_res):
         try:
+            duplicates = shared.get(DUPLICATES)
+            if duplicates:
+                ranked = exec_res
+                top_n = len(shared[QUALIFIED_RESUMES]) + len(duplicates) if self.keep_all else SCREENING_TOP_N
+                exec_res = expand_ranking(ranked, duplicates, shared[QUALIFIED_RESUMES], top_n)
+                metrics.increment("dedup_saved_reranker_pairs", exec_res.total - ranked.total)
             shared[RANKED_RESUMES] = exec_res
             return DEFAULT
         except Exception as e:
@@ -280,6 +735,10 @@ class RankResumesNode(Node):
 class ProcessRankResultsNode(Node):
     """Reduce node: Process and summarize ranked resume results."""
 
+    def __init__(self, full_path=RANKING_FULL_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.full_path = full_path  # where RankResumesNode wrote the complete ranking, if anywhere
+
     def prep(self, shared):
         try:
             return shared[RANKED_RESUMES]
@@ -289,25 +748,28 @@ class ProcessRankResultsNode(Node):
 
     def exec(self, ranked_results):
         """
-        ranked_results: List of tuples like [ ((filename, resume), score), ... ]
+        ranked_results: best-first list of tuples like [ (filename, score), ... ], usually only the top N
+        of a RankedList whose `total` counts every ranked resume
         """
         try:
-            total_ranked = len(ranked_results)
+            total_ranked = getattr(ranked_results, "total", len(ranked_results))
             top_n = SCREENING_TOP_N
 
             # Extract filenames and scores
-            ranked_filenames = [item[0][0] for item in ranked_results]
-            ranked_scores = [item[1] for item in ranked_results]
+            ranked_filenames = [filename for filename, _ in ranked_results]
+            ranked_scores = [score for _, score in ranked_results]
 
             # Build summary dict
             summary = {
                 "total_ranked": total_ranked,
-                "top_n": min(top_n, total_ranked),
+                "top_n": min(top_n, len(ranked_results)),
                 "top_candidates": [
-                    {"filename": ranked_results[i][0][0], "score": ranked_results[i][1]}
-                    for i in range(min(top_n, total_ranked))
+                    {"filename": filename, "score": score}
+                    for filename, score in ranked_results[:top_n]
                 ],
             }
+            if self.full_path:
+                summary["full_ranking"] = self.full_path
 
             return summary, ranked_filenames, ranked_scores
         except Exception as e:
@@ -317,12 +779,17 @@ class ProcessRankResultsNode(Node):
     def post(self, shared, prep_res, exec_res):
         try:
             summary, ranked_filenames, ranked_scores = exec_res
+            coverage = shared.get(SCREENING_COVERAGE)
+            if coverage and coverage["partial"]:
+                summary["partial"] = True
             shared["RANKING_SUMMARY"] = summary
             shared["RANKED_FILENAMES"] = ranked_filenames
             shared["RANKED_SCORES"] = ranked_scores
 
             print("\n==== Resume Ranking Summary ====")
             print(f"Total ranked resumes: {summary['total_ranked']}")
+            if summary.get("partial"):
+                print("Partial: screening stopped early, unscreened resumes were not ranked")
             print(f"Top {summary['top_n']} candidates:")
 
             for candidate in summary["top_candidates"]:
@@ -0,0 +1,198 @@
+import asyncio
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from pocketflow import Flow, Node
+
+from src.config import DATA_DIR_NAME, RESUME_INGESTION, THRESHOLD, PREFILTER_TOP_K, PREFILTER_INDEX, \
+    SCREENING_PACKED, SCREENING_PACK_MAX_RESUMES, RERANKER_BATCH_SIZE, PIPELINE_QUEUE_SIZE, PIPELINE_EMBED_WORKERS, \
+    PIPELINE_EMBED_BATCH_SIZE, PIPELINE_SCREEN_WORKERS, PIPELINE_RERANK_WORKERS, SCREENING_TOP_N, RANKING_FULL_PATH, \
+    PRESCREEN_ENABLED, RESUME_STORE_PATH, SCREENING_MODE, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, DEDUP_ENABLED
+from src.constants import RESUMES, DEFAULT, CRITERIA_EMBEDDING, RESUME_EMBEDDINGS, EMBEDDING_FAILURES, \
+    RELEVANT_RESUMES, RESUME_SIMILARITIES, EVALUATIONS, RANKED_RESUMES, QUALIFIES
+from src.prompts import FULL_CRITERIA
+from src.utils.embedding_cache import embed_with_cache
+from src.utils.ingest import LazyResumes, scan_resumes, read_resume, select_resumes
+from src.utils.logger import configured_logger
+from src.utils.models import get_embedding_provider, call_reranker, close_async_openai_client
+from src.utils.pipeline import Pipeline, Stage
+from src.utils.prescreen import prescreen_resume, rejection_evaluation
+from src.utils.rate_limiter import RateLimiter
+from src.utils.resume_store import ResumeStore, EmbeddingMatrix
+from src.utils.ranking import rank_top_n
+from src.utils.similarity import stack_embeddings, cosine_scores
+from .nodes import EmbedCriteriaNode, ScreenResumesNode, PackedScreenResumesNode, ReduceFilterResultsNode, \
+    ProcessRankResultsNode
+
+
+@contextmanager
+def _event_loop_thread():
+    """An event loop running on its own thread, so pipeline worker threads can share async clients and limiters."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="pipeline-event-loop", daemon=True)
+    thread.start()
+    try:
+        yield loop
+    finally:
+        # The async OpenAI client's connections are bound to this loop
+        asyncio.run_coroutine_threadsafe(close_async_openai_client(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+class PipelinedResumesNode(Node):
+    """
+    Read, embed, prefilter, pre-screen, screen and rerank every resume as one streaming pipeline: a resume moves on
+    to the next stage as soon as its current stage is done with it, so the stages overlap instead of
+    each waiting for the whole corpus. The prefilter decides per resume against THRESHOLD with the
+    exact cosine score; PREFILTER_TOP_K and the IVF index need the whole corpus and are not applied.
+    Screening workers share one event loop and one RateLimiter, and retry 429 and 5xx responses like
+    concurrent batch screening does.
+    Fills the same shared keys as the batch flow up to RANKED_RESUMES.
+    """
+
+    def prep(self, shared):
+        try:
+            if PREFILTER_TOP_K is not None or PREFILTER_INDEX != "exact":
+                configured_logger.warning("Pipelined prefilter only applies THRESHOLD with exact cosine scores")
+            return shared[CRITERIA_EMBEDDING]
+        except Exception as e:
+            configured_logger.error(f"Error in PipelinedResumesNode.prep: {str(e)}")
+            raise
+
+    def exec(self, criteria_embedding):
+        try:
+            data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                    DATA_DIR_NAME)
+            lazy = RESUME_INGESTION == "lazy"
+            entries = list(scan_resumes(data_dir)) if lazy else \
+                [filename for filename in os.listdir(data_dir) if filename.endswith(".txt")]
+
+            # Stage functions run on several threads; each only adds its own keys to these dicts
+            resumes, embeddings, failures, similarities, evaluations = {}, {}, [], {}, {}
+            lock = threading.Lock()
+            provider = get_embedding_provider()
+
+            def read():
+                for entry in entries:
+                    if lazy:
+                        yield entry.id, read_resume(entry.path)
+                    else:
+                        with open(os.path.join(data_dir, entry), "r", encoding="utf-8", errors="replace") as file:
+                            content = file.read()
+                        resumes[entry] = content
+                        yield entry, content
+
+            def embed(batch):
+                results = embed_with_cache([content for _, content in batch], provider.embed, provider.model)
+                passed = []
+                for (filename, content), embedding in zip(batch, results):
+                    if embedding:
+                        embeddings[filename] = np.asarray(embedding, dtype=np.float32)
+                        passed.append((filename, content, embedding))
+                    else:
+                        with lock:
+                            failures.append(filename)
+                return passed
+
+            def prefilter(batch):
+                scores = cosine_scores(stack_embeddings(embedding for _, _, embedding in batch), criteria_embedding)
+                passed = []
+                for (filename, content, _), score in zip(batch, scores.tolist()):
+                    if score > THRESHOLD:
+                        similarities[filename] = score
+                        passed.append((filename, content))
+                return passed
+
+            def prescreen(batch):
+                passed = []
+                for filename, content in batch:
+                    result = prescreen_resume(content) if PRESCREEN_ENABLED else None
+                    if result is not None and result.rule is not None:
+                        evaluations[filename] = rejection_evaluation(content, result)
+                    else:
+                        passed.append((filename, content))
+                return passed
+
+            screen_node = PackedScreenResumesNode() if SCREENING_PACKED else ScreenResumesNode()
+            rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
+
+            def screen(batch):
+                item = batch if SCREENING_PACKED else batch[0]
+                result = asyncio.run_coroutine_threadsafe(
+                    screen_node.exec_async_with_retries(item, rate_limiter), loop).result()
+                results = result if SCREENING_PACKED else [result]
+                contents = dict(batch)
+                passed = []
+                for filename, evaluation in results:
+                    evaluations[filename] = evaluation
+                    if evaluation.get(QUALIFIES, False):
+                        passed.append((filename, contents[filename]))
+                return passed
+
+            def rerank(batch):
+                scores = call_reranker(FULL_CRITERIA, [content for _, content in batch])
+                return [(filename, float(score)) for (filename, _), score in zip(batch, scores)]
+
+            pipeline = Pipeline([
+                Stage("embed", embed, PIPELINE_EMBED_WORKERS, PIPELINE_EMBED_BATCH_SIZE),
+                Stage("prefilter", prefilter, 1, PIPELINE_EMBED_BATCH_SIZE),
+                Stage("prescreen", prescreen, 1, PIPELINE_EMBED_BATCH_SIZE),
+                Stage("screen", screen, PIPELINE_SCREEN_WORKERS, SCREENING_PACK_MAX_RESUMES if SCREENING_PACKED else 1),
+                Stage("rerank", rerank, PIPELINE_RERANK_WORKERS, RERANKER_BATCH_SIZE),
+            ], PIPELINE_QUEUE_SIZE)
+            # The top N does not depend on the order scores arrive in
+            with _event_loop_thread() as loop:
+                ranked_resumes = rank_top_n(pipeline.run(read()), SCREENING_TOP_N, RANKING_FULL_PATH)
+
+            # Texts arrive while the stages run, they move into a store once everything is read
+            resumes = LazyResumes(entries) if lazy else ResumeStore.build(resumes.items(), RESUME_STORE_PATH).view()
+            # Stages finish in any order; sort by filename so the output does not depend on timing
+            return {
+                RESUMES: resumes,
+                RESUME_EMBEDDINGS: EmbeddingMatrix.from_items(sorted(embeddings.items())),
+                EMBEDDING_FAILURES: sorted(failures),
+                RELEVANT_RESUMES: select_resumes(resumes, sorted(similarities)),
+                RESUME_SIMILARITIES: dict(sorted(similarities.items())),
+                EVALUATIONS: dict(sorted(evaluations.items())),
+                RANKED_RESUMES: ranked_resumes,
+            }
+        except Exception as e:
+            configured_logger.error(f"Error in PipelinedResumesNode.exec: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            shared.update(exec_res)
+            if shared[EMBEDDING_FAILURES]:
+                configured_logger.error(f"Resumes without embeddings: {shared[EMBEDDING_FAILURES]}")
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in PipelinedResumesNode.post: {str(e)}")
+            raise
+
+
+def create_pipelined_resume_processing_flow():
+    """
+    create_resume_processing_flow with the per-resume stages streamed concurrently. Without the whole corpus
+    up front there is no top k, no waves and no near-duplicate clustering, so with PREFILTER_TOP_K,
+    SCREENING_MODE='waves' or DEDUP_ENABLED the results differ.
+    """
+    if SCREENING_MODE == "waves":
+        # Resumes reach screening in arrival order, not by similarity, so there are no waves to stop early
+        configured_logger.warning("--pipelined screens every relevant resume, SCREENING_MODE='waves' is ignored")
+    if DEDUP_ENABLED:
+        # Clustering needs every resume's signature before the first one could be skipped
+        configured_logger.warning("--pipelined screens and ranks near-duplicates too, DEDUP_ENABLED is ignored")
+
+    embed_criteria_node = EmbedCriteriaNode()
+    pipelined_resumes_node = PipelinedResumesNode()
+    reduce_filter_results_node = ReduceFilterResultsNode()
+    process_rank_results_node = ProcessRankResultsNode()
+
+    embed_criteria_node >> pipelined_resumes_node >> reduce_filter_results_node >> process_rank_results_node
+
+    return Flow(start=embed_criteria_node)
@@ -0,0 +1,357 @@
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from pocketflow import Flow, Node
+
+from src.config import DATA_DIR_NAME, PREFILTER_TOP_K, SCREENING_TOP_N, SCREENING_PACKED, SHARD_SPOOL_DIR, SHARD_WORKERS, \
+    SHARD_START_METHOD, SHARD_POLL_SECONDS, RANKING_FULL_PATH, DEDUP_ENABLED
+from src.constants import RESUMES, DEFAULT, EMBEDDING_FAILURES, RELEVANT_RESUMES, RESUME_SIMILARITIES, \
+    EVALUATIONS, RANKED_RESUMES, RESUME_EMBEDDINGS, SHARD_RESULTS, DUPLICATES, DUPLICATE_NAMES, DUPLICATE_OF, \
+    DEDUP_SIGNATURES, CANDIDATE_NAME
+from src.utils.dedup import minhash_signatures, signature_clusters, duplicate_map, expand_ranking
+from src.utils.ingest import LazyResumes, ResumeEntry, scan_resumes, select_resumes, candidate_name
+from src.utils.logger import configured_logger
+from src.utils.metrics import metrics
+from src.utils.ranking import rank_top_n
+from src.utils.result_store import file_digest
+from .instrumentation import instrument_flow
+from .nodes import EmbedCriteriaNode, EmbedResumesNode, PrefilterResumesNode, ScreenResumesNode, \
+    PackedScreenResumesNode, ReduceFilterResultsNode, RankResumesNode, ProcessRankResultsNode, PrescreenResumesNode, \
+    DedupResumesNode
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+TASKS = "tasks"
+CLAIMED = "claimed"
+RESULTS = "results"
+
+
+def shard_of(content_hash: str, shards: int) -> int:
+    return int(content_hash[:16], 16) % shards
+
+
+def shard_name(shard: int) -> str:
+    return f"shard-{shard:04d}"
+
+
+def _write_json(path: Path, data):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def global_duplicates(partials: List[Dict]) -> Dict[str, str]:
+    """
+    Near-duplicate map over every shard's resumes. Near-duplicates hash to different shards, so a shard only
+    finds its own; this clusters the MinHash signatures of all shards together, in id order.
+    """
+    signatures = {resume_id: signature for partial in partials
+                  for resume_id, signature in partial.get("signatures", {}).items()}
+    ids = sorted(signatures)
+    if not ids:
+        return {}
+    return duplicate_map(signature_clusters(ids, np.array([signatures[resume_id] for resume_id in ids],
+                                                          dtype=np.uint32)))
+
+
+def merge_partials(partials: List[Dict], top_k: Optional[int] = PREFILTER_TOP_K, top_n: int = SCREENING_TOP_N,
+                   full_path=None) -> Dict:
+    """
+    Combine per-shard results into corpus-wide ones, independent of shard count and completion order.
+    Shards apply PREFILTER_TOP_K locally, and every resume of the global top k is in its shard's local top k,
+    so the shards screen a superset of it. The global top k is re-selected here and anything screened
+    outside it is dropped. Shards return every ranked resume, not just their top N, so the global top N
+    of what remains is complete; the full ranking is written to `full_path` if given.
+    Near-duplicates are found again across shards and, as in the single-process flow, take their
+    representative's evaluation and score in place of their own.
+    """
+    duplicates = global_duplicates(partials)
+    names = {resume_id: name for partial in partials for resume_id, name in partial.get("names", {}).items()}
+    similarities = {}
+    for partial in partials:
+        similarities.update((filename, similarity) for filename, similarity in partial["similarities"].items()
+                            if filename not in duplicates)
+    relevant = sorted(similarities, key=lambda filename: (-similarities[filename], filename))
+    if top_k is not None:
+        relevant = relevant[:top_k]
+    relevant = set(relevant)
+
+    evaluations = {filename: evaluation for partial in partials
+                   for filename, evaluation in partial["evaluations"].items() if filename in relevant}
+    evaluations.update({duplicate: {**evaluations[representative], DUPLICATE_OF: representative,
+                                    CANDIDATE_NAME: names.get(duplicate,
+                                                              evaluations[representative].get(CANDIDATE_NAME))}
+                        for duplicate, representative in duplicates.items()
+                        if isinstance(evaluations.get(representative), dict)})
+    ranked_ids = [filename for partial in partials for filename, _ in partial["ranked"] if filename in relevant]
+    ranking = rank_top_n(((filename, score) for partial in partials for filename, score in partial["ranked"]
+                          if filename in relevant), top_n, full_path)
+    if duplicates:
+        ranking = expand_ranking(ranking, duplicates, ranked_ids, top_n)
+    return {
+        EMBEDDING_FAILURES: sorted(filename for partial in partials for filename in partial["embedding_failures"]
+                                   if filename not in duplicates),
+        RESUME_SIMILARITIES: {filename: similarities[filename] for filename in sorted(relevant)},
+        EVALUATIONS: dict(sorted(evaluations.items())),
+        RANKED_RESUMES: ranking,
+        DUPLICATES: duplicates,
+        DUPLICATE_NAMES: {duplicate: names[duplicate] for duplicate in duplicates if duplicate in names},
+    }
+
+
+class ShardPrefilterResumesNode(PrefilterResumesNode):
+    """Shards always prefilter with exact scores; one persistent IVF index cannot be updated by many workers."""
+
+    @staticmethod
+    def _search_index(criteria_embedding, resume_embeddings, resumes):
+        return PrefilterResumesNode._search_exact(criteria_embedding, resume_embeddings)
+
+
+class ShardDedupResumesNode(DedupResumesNode):
+    """Dedup within the shard, keeping every resume's MinHash signature and name for the global pass of the merge."""
+
+    def exec(self, resumes):
+        try:
+            if not DEDUP_ENABLED:
+                return {}, {}, {}
+            names = {}
+
+            def texts():
+                for resume_id, text in resumes.items():
+                    names[resume_id] = candidate_name(text)
+                    yield resume_id, text
+
+            ids, matrix = minhash_signatures(texts())
+            signatures = {resume_id: signature.tolist() for resume_id, signature in zip(ids, matrix)}
+            return duplicate_map(signature_clusters(ids, matrix)), signatures, names
+        except Exception as e:
+            configured_logger.error(f"Error in ShardDedupResumesNode.exec: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        duplicates, signatures, names = exec_res
+        shared[DEDUP_SIGNATURES] = {"signatures": signatures, "names": names}
+        return super().post(shared, prep_res, duplicates)
+
+
+class WriteShardResultNode(Node):
+    """Write the shard's partial results and metrics to the spool, keeping only what the merge needs."""
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = path
+
+    def prep(self, shared):
+        try:
+            return {
+                "resumes": sorted(shared[RESUMES]),
+                "embedding_failures": shared[EMBEDDING_FAILURES],
+                "similarities": shared[RESUME_SIMILARITIES],
+                "evaluations": shared[EVALUATIONS],
+                "ranked": shared[RANKED_RESUMES],
+                **shared[DEDUP_SIGNATURES],
+                "metrics": metrics.snapshot(),
+            }
+        except Exception as e:
+            configured_logger.error(f"Error in WriteShardResultNode.prep: {str(e)}")
+            raise
+
+    def exec(self, partial):
+        try:
+            _write_json(self.path, partial)
+            return len(partial["resumes"])
+        except Exception as e:
+            configured_logger.error(f"Error in WriteShardResultNode.exec: {str(e)}")
+            raise
+
+
+def create_shard_flow(result_path: Path):
+    """Map side: the dedup -> embed -> prefilter -> pre-screen -> screen -> rerank sub-flow over one shard's resumes."""
+
+    embed_criteria_node = EmbedCriteriaNode()
+    dedup_resumes_node = ShardDedupResumesNode()
+    embed_resumes_node = EmbedResumesNode()
+    prefilter_resumes_node = ShardPrefilterResumesNode()
+    prescreen_resumes_node = PrescreenResumesNode()
+    screen_resumes_node = PackedScreenResumesNode() if SCREENING_PACKED else ScreenResumesNode()
+    reduce_filter_results_node = ReduceFilterResultsNode()
+    # Every ranked resume goes to the merge, which writes the full ranking once
+    rank_resumes_node = RankResumesNode(full_path=None, keep_all=True)
+    write_shard_result_node = WriteShardResultNode(result_path)
+
+    embed_criteria_node >> dedup_resumes_node >> embed_resumes_node >> prefilter_resumes_node >> prescreen_resumes_node >> screen_resumes_node >> reduce_filter_results_node >> rank_resumes_node >> write_shard_result_node
+
+    return Flow(start=embed_criteria_node)
+
+
+def claim_task(spool: Path) -> Optional[Path]:
+    """Atomically take one pending shard; rename fails for every worker but one."""
+    for task in sorted((spool / TASKS).glob("*.json")):
+        claimed = spool / CLAIMED / task.name
+        try:
+            os.rename(task, claimed)
+            return claimed
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def run_worker(spool_dir) -> int:
+    """Process shards from the spool until none are left; returns how many this worker took."""
+    spool = PROJECT_ROOT / spool_dir
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    while (task_path := claim_task(spool)) is not None:
+        with open(task_path, "r", encoding="utf-8") as f:
+            task = json.load(f)
+        name = shard_name(task["shard"])
+        configured_logger.info(f"Worker {worker} took {name} ({len(task['resumes'])} resumes)")
+        try:
+            shared = {RESUMES: LazyResumes(ResumeEntry(*entry) for entry in task["resumes"])}
+            metrics.reset()  # each partial carries the metrics of its own shard only
+            instrument_flow(create_shard_flow(spool / RESULTS / f"{name}.json")).run(shared)
+        except Exception as e:
+            configured_logger.error(f"Worker {worker} failed on {name}: {str(e)}")
+            _write_json(spool / RESULTS / f"{name}.error", {"worker": worker, "error": str(e)})
+        processed += 1
+    return processed
+
+
+class DispatchShardsNode(Node):
+    """
+    Partition data/ by content hash into shards, spool one task per shard and wait for every result.
+    Local worker processes are started here; workers elsewhere join by running this module on the spool.
+    """
+
+    def __init__(self, shards: int, workers=SHARD_WORKERS, spool_dir=SHARD_SPOOL_DIR,
+                 start_method=SHARD_START_METHOD):
+        super().__init__()
+        self.shards = shards
+        self.workers = workers
+        self.spool = PROJECT_ROOT / spool_dir
+        self.start_method = start_method
+
+    def prep(self, shared):
+        return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                            DATA_DIR_NAME)
+
+    def exec(self, data_dir):
+        try:
+            entries = list(scan_resumes(data_dir))
+            tasks = [[] for _ in range(self.shards)]
+            for entry in entries:
+                tasks[shard_of(file_digest(entry.path), self.shards)].append(list(entry))
+
+            for directory in (TASKS, CLAIMED, RESULTS):
+                (self.spool / directory).mkdir(parents=True, exist_ok=True)
+                for stale in (self.spool / directory).iterdir():
+                    stale.unlink()
+            for shard, resumes in enumerate(tasks):
+                _write_json(self.spool / TASKS / f"{shard_name(shard)}.json", {"shard": shard, "resumes": resumes})
+            configured_logger.info(
+                f"Spooled {len(entries)} resumes in {self.shards} shards: {[len(resumes) for resumes in tasks]}")
+
+            context = multiprocessing.get_context(self.start_method)
+            processes = [context.Process(target=run_worker, args=(str(self.spool),), daemon=True)
+                         for _ in range(min(self.workers, self.shards))]
+            for process in processes:
+                process.start()
+            partials = self._wait(processes)
+            return LazyResumes(entries), partials
+        except Exception as e:
+            configured_logger.error(f"Error in DispatchShardsNode.exec: {str(e)}")
+            raise
+
+    def _wait(self, processes) -> List[Dict]:
+        names = [shard_name(shard) for shard in range(self.shards)]
+        while True:
+            errors = [name for name in names if (self.spool / RESULTS / f"{name}.error").exists()]
+            if errors:
+                raise RuntimeError(f"Shards failed: {errors}")
+            done = [name for name in names if (self.spool / RESULTS / f"{name}.json").exists()]
+            if len(done) == len(names):
+                break
+            crashed = [process.exitcode for process in processes if process.exitcode not in (None, 0)]
+            if crashed:
+                # A killed worker leaves its shard claimed forever; remote workers only take pending tasks
+                raise RuntimeError(f"Worker processes exited with codes {crashed} before all shards finished")
+            time.sleep(SHARD_POLL_SECONDS)
+        for process in processes:
+            process.join()
+
+        partials = []
+        for name in names:  # shard order, not completion order
+            with open(self.spool / RESULTS / f"{name}.json", "r", encoding="utf-8") as f:
+                partials.append(json.load(f))
+        return partials
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            shared[RESUMES], shared[SHARD_RESULTS] = exec_res
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in DispatchShardsNode.post: {str(e)}")
+            raise
+
+
+class MergeShardResultsNode(Node):
+    """Reduce side: merge the partial results into the shared keys ReduceFilterResultsNode and ProcessRankResultsNode read."""
+
+    def prep(self, shared):
+        try:
+            return shared.pop(SHARD_RESULTS)
+        except Exception as e:
+            configured_logger.error(f"Error in MergeShardResultsNode.prep: {str(e)}")
+            raise
+
+    def exec(self, partials):
+        try:
+            for partial in partials:
+                metrics.merge(partial["metrics"])
+            return merge_partials(partials, PREFILTER_TOP_K, SCREENING_TOP_N, RANKING_FULL_PATH)
+        except Exception as e:
+            configured_logger.error(f"Error in MergeShardResultsNode.exec: {str(e)}")
+            raise
+
+    def post(self, shared, prep_res, exec_res):
+        try:
+            resumes = shared[RESUMES]
+            shared[EMBEDDING_FAILURES] = exec_res[EMBEDDING_FAILURES]
+            shared[RESUME_SIMILARITIES] = exec_res[RESUME_SIMILARITIES]
+            shared[RELEVANT_RESUMES] = select_resumes(resumes, exec_res[RESUME_SIMILARITIES])
+            shared[EVALUATIONS] = exec_res[EVALUATIONS]
+            shared[RANKED_RESUMES] = exec_res[RANKED_RESUMES]
+            shared[DUPLICATES] = exec_res[DUPLICATES]
+            shared[DUPLICATE_NAMES] = exec_res[DUPLICATE_NAMES]
+            shared.setdefault(RESUME_EMBEDDINGS, {})  # embeddings stay with the workers
+            return DEFAULT
+        except Exception as e:
+            configured_logger.error(f"Error in MergeShardResultsNode.post: {str(e)}")
+            raise
+
+
+def create_sharded_resume_processing_flow(shards: int, workers=SHARD_WORKERS, spool_dir=SHARD_SPOOL_DIR,
+                                          start_method=SHARD_START_METHOD):
+    """Map-reduce over K content-hash shards: the map runs in worker processes, the reduce here."""
+
+    dispatch_shards_node = DispatchShardsNode(shards, workers, spool_dir, start_method)
+    merge_shard_results_node = MergeShardResultsNode()
+    reduce_filter_results_node = ReduceFilterResultsNode()
+    process_rank_results_node = ProcessRankResultsNode()
+
+    dispatch_shards_node >> merge_shard_results_node >> reduce_filter_results_node >> process_rank_results_node
+
+    return Flow(start=dispatch_shards_node)
+
+
+if __name__ == "__main__":
+    # Remote worker: python -m src.workflow.sharded <spool dir on the shared filesystem>
+    run_worker(sys.argv[1] if len(sys.argv) > 1 else SHARD_SPOOL_DIR)
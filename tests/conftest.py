@@ -4,6 +4,8 @@ import pytest
 
 from src.config import DATA_DIR_NAME
 from src.constants import QUALIFIED_RESUMES
+from src.utils import embedding_cache, models
+from src.workflow import nodes
 
 DATA_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
@@ -43,3 +45,32 @@ def qualified_resumes():
         with open(path, "r", encoding="utf-8") as f:
             resumes[filename] = f.read()
     return {QUALIFIED_RESUMES: resumes}
+
+
+@pytest.fixture
+def offline_models(monkeypatch):
+    """
+    Run the flows without network or caches: install(generate_embeddings, call_llm, call_reranker, data_dir)
+    swaps in fakes, call_llm standing in for acall_llm too, and screens one resume at a time. Modules that
+    import a model function themselves (pipeline, incremental) still need their own patch.
+    """
+
+    def install(generate_embeddings=None, call_llm=None, call_reranker=None, data_dir=None):
+        monkeypatch.setattr(embedding_cache, "EMBEDDING_CACHE_ENABLED", False)
+        monkeypatch.setattr(nodes, "EMBEDDING_CACHE_ENABLED", False)
+        monkeypatch.setattr(nodes, "get_llm_cache", lambda temperature=0.0: None)
+        monkeypatch.setattr(nodes, "SCREENING_CONCURRENCY", 1)
+        if generate_embeddings is not None:
+            monkeypatch.setattr(models, "generate_embeddings", generate_embeddings)
+        if call_llm is not None:
+            async def acall_llm(prompt, temperature=0.0, rate_limiter=None, use_cache=True):
+                return call_llm(prompt, temperature, use_cache=use_cache)
+
+            monkeypatch.setattr(nodes, "call_llm", call_llm)
+            monkeypatch.setattr(nodes, "acall_llm", acall_llm)
+        if call_reranker is not None:
+            monkeypatch.setattr(nodes, "call_reranker", call_reranker)
+        if data_dir is not None:
+            monkeypatch.setattr(nodes, "DATA_DIR_NAME", str(data_dir))
+
+    return install
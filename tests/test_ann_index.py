@@ -0,0 +1,61 @@
+import numpy as np
+
+from src.utils.ann_index import IVFIndex, measure_recall, index_directory
+
+
+def clustered_vectors(size, dim=32, clusters=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return centers[rng.integers(clusters, size=size)] + 0.3 * rng.normal(size=(size, dim))
+
+
+def test_ivf_recall_against_brute_force(tmp_path):
+    vectors = clustered_vectors(2000)
+    index = IVFIndex(directory=tmp_path, nlist=32, nprobe=8)
+    index.upsert([f"resume_{i}.txt" for i in range(len(vectors))], vectors)
+    queries = clustered_vectors(10, seed=1)
+
+    assert measure_recall(index, queries, k=20, nprobe=len(index.centroids))["recall"] == 1.0
+    assert measure_recall(index, queries, k=20)["recall"] >= 0.9
+
+
+def test_ivf_incremental_updates_persist(tmp_path):
+    vectors = clustered_vectors(300)
+    index = IVFIndex(directory=tmp_path)
+    index.upsert([f"resume_{i}.txt" for i in range(300)], vectors, versions=["v1"] * 300)
+
+    # Unchanged versions are skipped, a changed one is replaced, removed ids disappear
+    assert index.upsert(["resume_0.txt", "resume_1.txt"], vectors[:2], versions=["v1", "v2"]) == 1
+    index.remove(["resume_2.txt"])
+    index.save()
+
+    reloaded = IVFIndex(directory=tmp_path)
+    assert len(reloaded) == 299
+    assert reloaded.version("resume_1.txt") == "v2"
+    ids, scores = reloaded.search(vectors[5], threshold=0.99, nprobe=len(reloaded.centroids))
+    assert ids == ["resume_5.txt"]
+    assert "resume_2.txt" not in reloaded.exact_search(vectors[2], k=5)[0]
+
+
+def test_save_compacts_tombstoned_rows(tmp_path):
+    vectors = clustered_vectors(100)
+    index = IVFIndex(directory=tmp_path)
+    index.upsert([f"resume_{i}.txt" for i in range(100)], vectors, versions=["v1"] * 100)
+    index.remove([f"resume_{i}.txt" for i in range(0, 100, 2)])
+    index.upsert(["resume_1.txt"], vectors[:1], versions=["v2"])
+    index.save()
+
+    assert (tmp_path / "vectors.f32").stat().st_size == 50 * 32 * 4
+    reloaded = IVFIndex(directory=tmp_path)
+    assert len(reloaded.ids) == len(reloaded) == 50
+    assert reloaded.version("resume_1.txt") == "v2" and reloaded.version("resume_3.txt") == "v1"
+    assert reloaded.exact_search(vectors[3], k=1)[0] == ["resume_3.txt"]
+    assert reloaded.search(vectors[0], k=1, nprobe=len(reloaded.centroids))[0] == ["resume_1.txt"]
+
+
+def test_each_embedding_model_gets_its_own_index(tmp_path):
+    openai = index_directory("text-embedding-3-small", tmp_path)
+    local = index_directory("sentence-transformers/all-MiniLM-L6-v2", tmp_path)
+    IVFIndex(directory=openai).upsert(["a.txt"], clustered_vectors(1))
+    assert local != openai and local.startswith(str(tmp_path))
+    assert len(IVFIndex(directory=local)) == 0
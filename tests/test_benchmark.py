@@ -0,0 +1,40 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+from openai import OpenAI
+
+from src.scripts.fake_openai_server import make_handler, fake_evaluation
+from src.scripts.generate_synthetic_resumes import synthetic_resume, condition_generator
+
+
+@pytest.fixture
+def fake_client():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency_ms=0, jitter_ms=0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield OpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="test")
+    server.shutdown()
+
+
+def test_synthetic_resumes_match_fake_verdicts():
+    for number in range(200):
+        resume = synthetic_resume(number)
+        assert resume == synthetic_resume(number)
+        assert fake_evaluation(resume)["qualifies"] == condition_generator(number)
+
+
+def test_fake_server_embeddings(fake_client):
+    response = fake_client.embeddings.create(model="text-embedding-3-small", input=["python developer", "chef"])
+    vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+    assert vectors.shape == (2, 256)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert response.usage.total_tokens > 0
+
+
+def test_fake_server_chat_completion(fake_client):
+    prompt = f"Evaluate this candidate.\nResume:\n{synthetic_resume(4)}\nReturn your evaluation as YAML."
+    response = fake_client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}])
+    content = response.choices[0].message.content
+    assert content.startswith("```yaml") and "qualifies: true" in content
@@ -0,0 +1,85 @@
+import pickle
+
+import pytest
+from pocketflow import Node, BatchNode, Flow
+
+from src.workflow.checkpoint import Checkpoint, ProgressLog, checkpointed
+
+
+class LoadNode(Node):
+    runs = 0
+
+    def exec(self, _):
+        LoadNode.runs += 1
+        return list(range(6))
+
+    def post(self, shared, prep_res, exec_res):
+        shared["items"] = exec_res
+
+
+class SquareNode(BatchNode):
+    seen = []
+    fail_at = None
+
+    def prep(self, shared):
+        return shared["items"]
+
+    def exec(self, item):
+        if item == SquareNode.fail_at:
+            raise RuntimeError("quota exceeded")
+        SquareNode.seen.append(item)
+        return item * item
+
+    def post(self, shared, prep_res, exec_res):
+        shared["squares"] = exec_res
+
+
+def build_flow():
+    load = LoadNode()
+    load >> SquareNode()
+    return Flow(start=load)
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    LoadNode.runs, SquareNode.seen, SquareNode.fail_at = 0, [], None
+
+
+def test_resume_skips_completed_nodes_and_items(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "checkpoint")
+    SquareNode.fail_at = 4
+
+    with pytest.raises(RuntimeError):
+        checkpointed(build_flow(), checkpoint=checkpoint).run({})
+    assert SquareNode.seen == [0, 1, 2, 3]
+
+    SquareNode.seen, SquareNode.fail_at = [], None
+    shared = {}
+    checkpointed(build_flow(), resume=True, checkpoint=checkpoint).run(shared)
+
+    assert LoadNode.runs == 1
+    assert SquareNode.seen == [4, 5]
+    assert shared == {"items": list(range(6)), "squares": [0, 1, 4, 9, 16, 25]}
+
+
+def test_fresh_run_discards_previous_checkpoint(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "checkpoint")
+    checkpointed(build_flow(), checkpoint=checkpoint).run({})
+    checkpointed(build_flow(), checkpoint=checkpoint).run({})
+
+    assert LoadNode.runs == 2
+    assert SquareNode.seen == list(range(6)) * 2
+
+
+@pytest.mark.parametrize("torn", [b"\x80\x05\x95", pickle.dumps(("c", "x" * 100))[:-20]])
+def test_progress_log_ignores_torn_last_record(tmp_path, torn):
+    log = ProgressLog(tmp_path / "node.progress")
+    log.append("a", 1)
+    log.append("b", 2)
+    with open(log.path, "ab") as f:
+        f.write(torn)  # crash in the middle of the next append
+
+    assert log.load() == {"a": 1, "b": 2}
+    # Resumed work appends after the last intact record, not after the torn bytes
+    log.append("c", 3)
+    assert log.load() == {"a": 1, "b": 2, "c": 3}
@@ -0,0 +1,77 @@
+import pytest
+
+from src.constants import CANDIDATE_NAME, DUPLICATE_OF, DUPLICATES, EVALUATIONS, FILTER_SUMMARY, RANKED_RESUMES, RESUMES
+from src.prompts import MANDATORY_CRITERIA
+from src.scripts.generate_synthetic_resumes import synthetic_resume
+from src.utils.dedup import near_duplicate_clusters, lsh_bands, duplicate_map
+from src.utils.metrics import metrics
+from src.workflow import nodes
+from src.workflow.flow import create_resume_processing_flow
+
+
+def reupload(number):
+    """Resume `number` re-sent with a small edit, as a reapplying candidate would."""
+    return synthetic_resume(number).replace("Worked on", "Contributed to", 1) + "References available on request.\n"
+
+
+def test_near_duplicates_cluster_and_distinct_resumes_do_not():
+    texts = [(f"resume_{number}.txt", synthetic_resume(number)) for number in range(500)]
+    texts += [("copy_of_7.txt", synthetic_resume(7)), ("edited_7.txt", reupload(7)), ("edited_40.txt", reupload(40))]
+
+    clusters = near_duplicate_clusters(texts, threshold=0.7)
+
+    assert clusters == [["copy_of_7.txt", "edited_7.txt", "resume_7.txt"], ["edited_40.txt", "resume_40.txt"]]
+    assert duplicate_map(clusters) == {"edited_7.txt": "copy_of_7.txt", "resume_7.txt": "copy_of_7.txt",
+                                       "resume_40.txt": "edited_40.txt"}
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9])
+def test_lsh_bands_favour_recall_around_the_threshold(threshold):
+    bands, rows = lsh_bands(threshold, 128)
+    assert bands * rows <= 128
+
+    def shares_bucket(similarity):
+        return 1 - (1 - similarity ** rows) ** bands
+
+    assert shares_bucket(min(1.0, threshold + 0.1)) > 0.8
+    assert shares_bucket(threshold - 0.3) < 0.1
+
+
+def test_duplicates_share_their_representatives_evaluation_and_score(tmp_path, monkeypatch, offline_models):
+    prompts, reranked = [], []
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        prompts.append(prompt)
+        name = prompt.split("Resume:\n")[1].split("\n")[0]
+        return f"```yaml\ncandidate_name: {name}\nqualifies: true\nreasons: []\n```"
+
+    def fake_call_reranker(query, items):
+        reranked.extend(items)
+        return [float(len(item)) for item in items]
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for number in range(0, 40, 4):  # qualifying synthetic resumes only
+        (data_dir / f"resume_{number}.txt").write_text(synthetic_resume(number))
+    # Same resume re-sent under the candidate's married name
+    (data_dir / "resume_8_again.txt").write_text(synthetic_resume(8).replace("Candidate 8", "Candidate 8 Novak", 1)
+                                                 + "References available on request.\n")
+    offline_models(lambda texts: [[1.0, 0.0] for _ in texts], fake_call_llm, fake_call_reranker, data_dir)
+    monkeypatch.setattr(nodes, "SCREENING_TOP_N", 20)
+    metrics.reset()
+    shared = {}
+
+    create_resume_processing_flow().run(shared)
+
+    assert shared[DUPLICATES] == {"resume_8_again.txt": "resume_8.txt"}
+    assert "resume_8_again.txt" not in shared[RESUMES]
+    assert len(prompts) == len(reranked) == 10
+    assert shared[EVALUATIONS]["resume_8_again.txt"][DUPLICATE_OF] == "resume_8.txt"
+    assert shared[EVALUATIONS]["resume_8.txt"][CANDIDATE_NAME] == "Candidate 8"
+    assert shared[EVALUATIONS]["resume_8_again.txt"][CANDIDATE_NAME] == "Candidate 8 Novak"
+    assert shared[FILTER_SUMMARY]["total_candidates"] == 11
+    scores = dict(shared[RANKED_RESUMES])
+    assert scores["resume_8_again.txt"] == scores["resume_8.txt"]
+    assert shared[RANKED_RESUMES].total == 11
+    assert {name: metrics.counters[f"dedup_saved_{name}"] for name in ("embeddings", "llm_screens", "reranker_pairs")} \
+        == {"embeddings": 1, "llm_screens": 1, "reranker_pairs": 1}
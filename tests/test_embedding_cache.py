@@ -0,0 +1,99 @@
+import multiprocessing
+import threading
+
+from src.utils import embedding_cache
+from src.utils.embedding_cache import EmbeddingCache, embed_with_cache
+
+
+def test_embedding_cache_round_trip_and_eviction(tmp_path):
+    cache = EmbeddingCache("test-model", cache_dir=tmp_path, max_entries=2)
+
+    cache.put_many(["alpha", "beta"], [[1.0, 0.0], [0.0, 1.0]])
+    assert cache.get_many(["alpha", "gamma"]) == [[1.0, 0.0], None]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # "beta" is least recently used, so it makes room for "gamma"
+    cache.put_many(["gamma"], [[0.5, 0.5]])
+    assert "beta" not in cache
+    assert cache.evictions == 1
+    cache.flush()
+
+    reloaded = EmbeddingCache("test-model", cache_dir=tmp_path, max_entries=2)
+    assert reloaded.get_many(["alpha", "gamma"]) == [[1.0, 0.0], [0.5, 0.5]]
+    assert len(reloaded) == 2
+
+
+def test_concurrent_writers_keep_every_vector_with_its_text(tmp_path):
+    cache = EmbeddingCache("test-model", cache_dir=tmp_path)
+    texts = [[f"resume {thread} {i}" for i in range(200)] for thread in range(8)]
+
+    def write(thread):
+        for i, text in enumerate(texts[thread]):
+            cache.put_many([text], [[float(thread), float(i)]])
+            if i % 20 == 0:
+                cache.flush()
+
+    threads = [threading.Thread(target=write, args=(thread,)) for thread in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.flush()
+
+    for cache_to_check in (cache, EmbeddingCache("test-model", cache_dir=tmp_path)):
+        for thread in range(8):
+            assert cache_to_check.get_many(texts[thread]) == [[float(thread), float(i)] for i in range(200)]
+
+
+def _write_from_process(cache_dir, worker):
+    cache = EmbeddingCache("test-model", cache_dir=cache_dir)
+    for i in range(100):
+        cache.put_many([f"worker {worker} resume {i}"], [[float(worker), float(i)]])
+
+
+def test_processes_sharing_a_cache_directory_keep_every_vector_with_its_text(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_write_from_process, args=(str(tmp_path), worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    cache = EmbeddingCache("test-model", cache_dir=tmp_path)
+    assert len(cache) == 400
+    for worker in range(4):
+        assert cache.get_many([f"worker {worker} resume {i}" for i in range(100)]) == \
+            [[float(worker), float(i)] for i in range(100)]
+
+
+def test_index_is_reloaded_only_after_another_writer_changed_it(tmp_path, monkeypatch):
+    cache = EmbeddingCache("test-model", cache_dir=tmp_path)
+    other = EmbeddingCache("test-model", cache_dir=tmp_path)
+    cache.put_many(["alpha"], [[1.0, 0.0]])
+    loads = []
+    original_load = EmbeddingCache._load
+    monkeypatch.setattr(EmbeddingCache, "_load", lambda self: loads.append(self) or original_load(self))
+
+    cache.put_many(["beta"], [[0.0, 1.0]])
+    cache.flush()
+    assert cache.get_many(["alpha", "beta"]) == [[1.0, 0.0], [0.0, 1.0]]
+    assert loads == []
+
+    other.put_many(["gamma"], [[0.5, 0.5]])
+    assert loads == [other]
+    assert cache.get_many(["gamma"]) == [[0.5, 0.5]]
+    assert loads == [other, cache]
+
+
+def test_embed_with_cache_writes_the_index_once_per_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_caches", {"test-model": EmbeddingCache("test-model", cache_dir=tmp_path)})
+    monkeypatch.setattr(embedding_cache, "EMBEDDING_CACHE_ENABLED", True)
+    flushes = []
+    original_flush = EmbeddingCache._flush
+    monkeypatch.setattr(EmbeddingCache, "_flush", lambda self: flushes.append(self) or original_flush(self))
+
+    embed_with_cache(["alpha", "beta"], lambda texts: [[float(len(text)), 1.0] for text in texts], "test-model")
+    assert len(flushes) == 1
+    assert embed_with_cache(["alpha"], lambda texts: [], "test-model") == [[5.0, 1.0]]
+    assert len(flushes) == 1
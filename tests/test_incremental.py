@@ -0,0 +1,98 @@
+import datetime
+import os
+
+import pytest
+
+from src.constants import EVALUATIONS, FILTER_SUMMARY, MANIFEST_DIFF, PRESCREEN_RULE
+from src.prompts import MANDATORY_CRITERIA
+from src.utils.result_store import ResultStore
+from src.workflow import incremental, nodes
+from src.workflow.incremental import create_incremental_resume_processing_flow, SyncManifestNode
+
+
+@pytest.fixture
+def offline_pipeline(tmp_path, monkeypatch, offline_models):
+    """Incremental flow over tmp_path with fake models that record what they were asked to process."""
+    calls = {"embedded": [], "screened": [], "reranked": []}
+
+    def fake_generate_embeddings(texts):
+        calls["embedded"] += [text for text in texts if text != MANDATORY_CRITERIA]
+        return [[1.0, 0.0] if "engineer" in text else [0.0, 1.0] for text in texts]
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        resume = prompt.split("Resume:\n")[1].split("\n")[0]
+        calls["screened"].append(resume)
+        return f"```yaml\ncandidate_name: {resume}\nqualifies: {'senior' in resume}\nreasons: []\n```"
+
+    def fake_call_reranker(query, items):
+        calls["reranked"] += items
+        return [float(len(item)) for item in items]
+
+    offline_models(fake_generate_embeddings, fake_call_llm)
+    monkeypatch.setattr(incremental, "call_reranker", fake_call_reranker)
+    monkeypatch.setattr(SyncManifestNode, "prep", lambda self, shared: str(tmp_path / "data"))
+
+    (tmp_path / "data").mkdir()
+    store = ResultStore(path=tmp_path / "results.sqlite3")
+
+    def run():
+        for values in calls.values():
+            values.clear()
+        shared = {}
+        create_incremental_resume_processing_flow(store).run(shared)
+        return shared
+
+    return tmp_path / "data", run, calls
+
+
+def test_incremental_rerun_only_processes_changes(offline_pipeline):
+    data_dir, run, calls = offline_pipeline
+    (data_dir / "a.txt").write_text("senior engineer A")
+    (data_dir / "b.txt").write_text("junior engineer B")
+    (data_dir / "c.txt").write_text("senior chef C")
+
+    first = run()
+    assert sorted(calls["screened"]) == ["junior engineer B", "senior engineer A"]
+    assert first[FILTER_SUMMARY]["qualified_count"] == 1
+
+    second = run()
+    assert calls == {"embedded": [], "screened": [], "reranked": []}
+    assert second[EVALUATIONS] == first[EVALUATIONS]
+    assert second["RANKED_FILENAMES"] == ["a.txt"]
+
+    (data_dir / "b.txt").write_text("senior engineer B, promoted")
+    os.remove(data_dir / "a.txt")
+    third = run()
+    assert third[MANIFEST_DIFF] == {"added": 0, "changed": 1, "deleted": 1, "unchanged": 1}
+    assert calls["embedded"] == calls["screened"] == calls["reranked"] == ["senior engineer B, promoted"]
+    assert list(third[EVALUATIONS]) == ["b.txt"]
+    assert third["RANKED_FILENAMES"] == ["b.txt"]
+
+
+def test_criteria_change_invalidates_dependent_stages(offline_pipeline, monkeypatch):
+    data_dir, run, calls = offline_pipeline
+    (data_dir / "a.txt").write_text("senior engineer A")
+    run()
+
+    monkeypatch.setattr(incremental, "MANDATORY_CRITERIA", "- Must know Rust")
+    run()
+
+    # Embeddings do not depend on the criteria, evaluations do
+    assert calls["embedded"] == []
+    assert calls["screened"] == ["senior engineer A"]
+
+
+def test_prescreen_rejections_are_not_stored(offline_pipeline, monkeypatch):
+    data_dir, run, calls = offline_pipeline
+    (data_dir / "a.txt").write_text(f"junior engineer A\nDeveloper, Acme ({datetime.date.today().year} - Present)")
+    (data_dir / "b.txt").write_text("senior engineer B")
+
+    first = run()
+    assert PRESCREEN_RULE in first[EVALUATIONS]["a.txt"]
+    assert calls["screened"] == ["senior engineer B"]
+
+    monkeypatch.setattr(nodes, "PRESCREEN_ENABLED", False)
+    second = run()
+    assert calls["screened"] == ["junior engineer A"]
+    assert PRESCREEN_RULE not in second[EVALUATIONS]["a.txt"]
+    assert list(second[EVALUATIONS]) == ["a.txt", "b.txt"]
@@ -0,0 +1,42 @@
+from src.constants import RESUMES
+from src.utils.ingest import LazyResumes, scan_resumes, iter_chunks, select_resumes
+from src.workflow import nodes
+
+
+def write_resumes(root):
+    (root / "2024").mkdir()
+    (root / "resume_a.txt").write_text("Alice")
+    (root / "2024" / "resume_b.txt").write_text("Bob Builder")
+    (root / "notes.md").write_text("not a resume")
+
+
+def test_scan_resumes_walks_tree_without_reading(tmp_path):
+    write_resumes(tmp_path)
+
+    entries = sorted(scan_resumes(str(tmp_path)))
+
+    assert [(entry.id, entry.size) for entry in entries] == [("2024/resume_b.txt", 11), ("resume_a.txt", 5)]
+
+
+def test_lazy_resumes_read_on_access(tmp_path):
+    write_resumes(tmp_path)
+    resumes = LazyResumes(scan_resumes(str(tmp_path)))
+
+    assert len(resumes) == 2
+    assert resumes["resume_a.txt"] == "Alice"
+    relevant = select_resumes(resumes, ["2024/resume_b.txt"])
+    assert isinstance(relevant, LazyResumes)
+    assert dict(relevant.items()) == {"2024/resume_b.txt": "Bob Builder"}
+    assert list(iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_embed_resumes_streams_lazy_resumes_in_chunks(tmp_path, monkeypatch):
+    for i in range(5):
+        (tmp_path / f"resume_{i}.txt").write_text(f"Candidate {i}")
+    monkeypatch.setattr(nodes, "EMBEDDING_CACHE_ENABLED", False)
+    monkeypatch.setattr(nodes, "INGEST_CHUNK_SIZE", 2)
+
+    batches = nodes.EmbedResumesNode().prep({RESUMES: LazyResumes(scan_resumes(str(tmp_path)))})
+
+    assert not isinstance(batches, list)
+    assert sorted(len(batch) for batch in batches) == [1, 2, 2]
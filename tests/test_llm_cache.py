@@ -0,0 +1,43 @@
+import time
+
+from src.utils.llm_cache import LLMResponseCache, get_llm_cache
+
+
+def test_llm_cache_stores_response_and_parsed_evaluation(tmp_path):
+    cache = LLMResponseCache(path=tmp_path / "llm.sqlite3")
+
+    cache.put("gpt-4o-mini", 0.0, "prompt", response="qualifies: true")
+    cache.put("gpt-4o-mini", 0.0, "prompt", parsed={"qualifies": True})
+
+    assert cache.get("gpt-4o-mini", 0.0, "prompt") == ("qualifies: true", {"qualifies": True})
+    assert cache.get("gpt-4o", 0.0, "prompt") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_llm_cache_ttl_and_size_eviction(tmp_path):
+    cache = LLMResponseCache(path=tmp_path / "llm.sqlite3", ttl_seconds=0.2, max_entries=2)
+    for prompt in ["a", "b", "c"]:
+        cache.put("model", 0.0, prompt, response=prompt)
+    cache.evict()
+    assert len(cache) == 2
+    assert cache.get("model", 0.0, "a") is None
+
+    time.sleep(0.3)
+    assert cache.get("model", 0.0, "c") is None
+
+
+def test_llm_cache_refreshes_an_expired_entry_on_put(tmp_path):
+    cache = LLMResponseCache(path=tmp_path / "llm.sqlite3", ttl_seconds=0.2)
+    cache.put("model", 0.0, "prompt", response="old", parsed={"qualifies": False})
+    time.sleep(0.3)
+    assert cache.get("model", 0.0, "prompt") is None
+
+    cache.put("model", 0.0, "prompt", response="new")
+    # The expired parsed result belongs to the old response and is not served with the new one
+    assert cache.get("model", 0.0, "prompt") == ("new", None)
+
+
+def test_only_deterministic_calls_are_cached(monkeypatch):
+    assert get_llm_cache(temperature=1.0) is None
+    monkeypatch.setenv("LLM_CACHE_BYPASS", "true")
+    assert get_llm_cache(temperature=0.0) is None
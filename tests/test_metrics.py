@@ -0,0 +1,107 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from pocketflow import Node, BatchNode, Flow
+
+from src.utils.metrics import metrics, Histogram
+from src.workflow.checkpoint import Checkpoint, checkpointed
+from src.workflow.instrumentation import instrument_flow
+
+
+class LoadNode(Node):
+    def exec(self, _):
+        return [0.001, 0.002, 0.03]
+
+    def post(self, shared, prep_res, exec_res):
+        shared["delays"] = exec_res
+
+
+class SleepNode(BatchNode):
+    def prep(self, shared):
+        return shared["delays"]
+
+    def exec(self, delay):
+        time.sleep(delay)
+        return delay
+
+
+def build_flow():
+    load = LoadNode()
+    load >> SleepNode()
+    return Flow(start=load)
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_node_phases_and_item_latencies_are_recorded(tmp_path):
+    flow = instrument_flow(build_flow())
+    checkpointed(flow, checkpoint=Checkpoint(tmp_path / "checkpoint")).run({})
+
+    report = metrics.report()
+    assert set(report["nodes"]) == {"LoadNode", "SleepNode"}
+    assert report["nodes"]["SleepNode"]["runs"] == 1
+    assert report["nodes"]["SleepNode"]["exec_seconds"] >= 0.033
+    items = report["item_latency_seconds"]["SleepNode"]
+    assert items["count"] == 3 and items["max"] >= 0.03
+    assert "LoadNode" not in report["item_latency_seconds"]
+    assert report["peak_rss_bytes"] > 0
+
+
+def test_instrumented_nodes_keep_their_class_name():
+    flow = instrument_flow(instrument_flow(build_flow()))
+    assert type(flow.start_node).__name__ == "LoadNode"
+    assert isinstance(flow.start_node, LoadNode)
+
+
+def test_usage_counters_and_exports(tmp_path):
+    metrics.record_usage("llm", "gpt-4o-mini", SimpleNamespace(prompt_tokens=100, completion_tokens=20,
+                                                               total_tokens=120))
+    metrics.record_usage("llm", "gpt-4o-mini", None)
+    metrics.observe_item("ScreenResumesNode", 0.2)
+
+    report = json.loads(metrics.write_json(tmp_path / "report.json").read_text())
+    assert report["counters"]["llm_requests"] == 2
+    assert report["counters"]["llm_prompt_tokens"] == 100
+
+    prometheus = metrics.write_prometheus(tmp_path / "metrics.prom").read_text()
+    assert 'resume_pipeline_events_total{name="llm_completion_tokens"} 20' in prometheus
+    assert 'resume_pipeline_item_seconds_bucket{node="ScreenResumesNode",le="0.25"} 1' in prometheus
+    assert 'resume_pipeline_item_seconds_count{node="ScreenResumesNode"} 1' in prometheus
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.observe(value / 100)
+
+    assert histogram.percentile(50) == pytest.approx(0.51)
+    assert histogram.percentile(99) == pytest.approx(1.0)
+    assert histogram.counts[-1] == 0
+
+
+def test_snapshot_merges_into_another_report():
+    metrics.increment("llm_requests", 3)
+    metrics.add_time("ScreenResumesNode", "post", 0.5)
+    for value in range(1, 51):
+        metrics.observe_item("ScreenResumesNode", value / 100)
+    snapshot = json.loads(json.dumps(metrics.snapshot()))  # as it travels through the spool
+    metrics.reset()
+
+    metrics.increment("llm_requests")
+    for value in range(51, 101):
+        metrics.observe_item("ScreenResumesNode", value / 100)
+    metrics.merge(snapshot)
+
+    report = metrics.report()
+    assert report["counters"]["llm_requests"] == 4
+    assert report["nodes"]["ScreenResumesNode"]["runs"] == 1
+    items = report["item_latency_seconds"]["ScreenResumesNode"]
+    assert items["count"] == 100 and items["max"] == pytest.approx(1.0)
+    assert items["p50"] == pytest.approx(0.51)
@@ -1,5 +1,16 @@
-from src.prompts import MANDATORY_CRITERIA
-from src.utils.models import call_reranker, call_llm, generate_embedding
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import openai
+import pytest
+
+from src.prompts import MANDATORY_CRITERIA, FULL_CRITERIA
+from src.utils import models
+from src.utils.models import call_reranker, call_llm, generate_embeddings, \
+    pack_embedding_batches, shard_indices, generate_local_embeddings, get_embedding_provider
 
 
 def test_reranker_scores_match_length(resume_data):
@@ -25,7 +36,132 @@ def test_llm_response_short_joke():
 
 
 def test_generate_embedding_single_input():
-    embedding = generate_embedding(["look at me now"])
+    embedding, = generate_embeddings(["look at me now"])
     assert isinstance(embedding, list)
     assert all(isinstance(x, (int, float)) for x in embedding)
     print("Embedding length:", len(embedding))
+
+
+def test_pack_embedding_batches_respects_limits():
+    texts = ["x" * 300] * 10  # ~100 estimated tokens each
+
+    batches = pack_embedding_batches(texts, max_batch_size=4, max_batch_tokens=250)
+
+    assert [index for batch in batches for index in batch] == list(range(len(texts)))
+    assert all(len(batch) <= 2 for batch in batches)
+
+
+def test_generate_embeddings_isolates_rejected_inputs(monkeypatch):
+    class FakeEmbeddings:
+        def create(self, input, model):
+            if "bad" in input:
+                raise openai.BadRequestError("rejected", response=httpx.Response(400, request=httpx.Request(
+                    "POST", "https://api.openai.com/v1/embeddings")), body=None)
+            data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+            return SimpleNamespace(data=list(reversed(data)))
+
+    monkeypatch.setattr(models.openai_client, "embeddings", FakeEmbeddings())
+
+    embeddings = generate_embeddings(["a", "bb", "bad", "dddd"])
+
+    assert embeddings == [[1.0], [2.0], None, [4.0]]
+
+
+def test_call_reranker_buckets_by_length_and_keeps_input_order(monkeypatch):
+    class FakeCrossEncoder:
+        def __init__(self):
+            self.batches = []
+
+        def predict(self, pairs, batch_size, show_progress_bar):
+            self.batches.append([len(item) for _, item in pairs])
+            return [float(len(item)) for _, item in pairs]
+
+    fake = FakeCrossEncoder()
+    monkeypatch.setitem(models._rerankers, ("fake-reranker", "torch"), fake)
+    items = ["x" * length for length in (50, 3, 40, 1, 30, 2)]
+
+    scores = call_reranker("query", items, model_name="fake-reranker", batch_size=3, backend="torch",
+                           use_cache=False)
+
+    assert scores.tolist() == [50.0, 3.0, 40.0, 1.0, 30.0, 2.0]
+    assert fake.batches == [[1, 2, 3], [30, 40, 50]]
+    assert models.get_reranker("fake-reranker", "torch") is fake
+
+
+class NumberedCrossEncoder:
+    """Picklable stand-in for a CrossEncoder: an item "resume <n> ..." scores n."""
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        return [float(item.split()[1]) for _, item in pairs]
+
+
+def _init_fake_rerank_worker(model_name, backend):
+    models._rerankers[(model_name, backend)] = NumberedCrossEncoder()
+
+
+def test_parallel_reranker_returns_scores_in_input_order(monkeypatch):
+    # A spawn pool whose workers load the fake instead of a model; this process has no reranker at all,
+    # so every score has to come back from a worker
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_fake_rerank_worker, initargs=("fake-reranker", "torch"))
+    monkeypatch.setitem(models._rerank_pools, ("fake-reranker", "torch", 2), pool)
+    monkeypatch.setattr(models, "RERANKER_PARALLEL_MIN_ITEMS", 10)
+    items = [f"resume {number} " + "x" * (number * 7 % 13) for number in range(40)]
+
+    try:
+        scores = call_reranker("query", items, model_name="fake-reranker", batch_size=4, backend="torch",
+                               workers=2, use_cache=False)
+    finally:
+        pool.shutdown()
+
+    assert scores.tolist() == [float(number) for number in range(40)]
+    assert ("fake-reranker", "torch") not in models._rerankers
+
+
+def test_local_embeddings_are_batched_normalized_and_in_input_order(monkeypatch):
+    class FakeBiEncoder:
+        def __init__(self):
+            self.batches = []
+
+        def get_sentence_embedding_dimension(self):
+            return 2
+
+        def encode(self, texts, batch_size, normalize_embeddings, convert_to_numpy, show_progress_bar):
+            self.batches.append([len(text) for text in texts])
+            vectors = np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+            return vectors / np.linalg.norm(vectors, axis=1, keepdims=True) if normalize_embeddings else vectors
+
+    fake = FakeBiEncoder()
+    monkeypatch.setitem(models._bi_encoders, "fake-bi-encoder", fake)
+    texts = ["x" * length for length in (5, 1, 4, 2)]
+
+    embeddings = generate_local_embeddings(texts, model_name="fake-bi-encoder", batch_size=2)
+
+    assert fake.batches == [[1, 2], [4, 5]]
+    assert [round(embedding[0] / embedding[1]) for embedding in embeddings] == [5, 1, 4, 2]
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+    assert get_embedding_provider("local").embed is generate_local_embeddings
+    with pytest.raises(ValueError):
+        get_embedding_provider("unknown")
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_reranker_matches_torch_ranking(resume_data, backend):
+    pytest.importorskip("optimum.onnxruntime")
+    _, resumes = resume_data
+
+    torch_scores = call_reranker(FULL_CRITERIA, resumes, backend="torch", use_cache=False)
+    onnx_scores = call_reranker(FULL_CRITERIA, resumes, backend=backend, use_cache=False)
+
+    assert len(onnx_scores) == len(resumes)
+    assert np.argsort(-onnx_scores).tolist() == np.argsort(-torch_scores).tolist()
+
+
+def test_shard_indices_balances_lengths_and_covers_every_item():
+    items = ["x" * length for length in range(1, 11)]
+
+    shards = shard_indices(items, 3)
+
+    assert sorted(index for shard in shards for index in shard) == list(range(len(items)))
+    assert [len(shard) for shard in shards] == [4, 3, 3]
+    assert shard_indices(items[:2], 3) == [[0], [1]]
@@ -0,0 +1,120 @@
+import pytest
+import yaml
+
+from src.constants import EVALUATIONS, FILTER_SUMMARY, RANKED_RESUMES, JOB_RESULTS, QUALIFIES
+from src.utils import models
+from src.workflow import multi_job, nodes
+from src.workflow.flow import create_resume_processing_flow
+from src.workflow.instrumentation import instrument_flow
+from src.workflow.multi_job import create_multi_job_resume_processing_flow, load_jobs
+
+JOBS_YAML = """
+engineer:
+  mandatory: Must be a senior engineer
+  preferred: Cloud experience
+chef:
+  mandatory: Must be a senior chef
+"""
+
+
+@pytest.fixture
+def fake_models(tmp_path, offline_models):
+    embedded, reranker_queries = [], []
+
+    def fake_generate_embeddings(texts):
+        embedded.extend(texts)
+        return [[1.0, 0.0] if "engineer" in text else [0.0, 1.0] for text in texts]
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        resume = prompt.split("Resume:\n")[1].split("\n")[0]
+        role = "engineer" if "senior engineer" in prompt.split("Resume:\n")[0] else "chef"
+        qualifies = "senior" in resume and role in resume
+        return f"```yaml\ncandidate_name: {resume}\nqualifies: {qualifies}\nreasons: []\n```"
+
+    def fake_call_reranker(query, items):
+        reranker_queries.append(query)
+        return [float(len(item)) for item in items]
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(12):
+        level = "senior" if i % 3 else "junior"
+        role = "engineer" if i % 2 else "chef"
+        (data_dir / f"resume_{i}.txt").write_text(f"{level} {role} {'x' * i}")
+    jobs_path = tmp_path / "jobs.yaml"
+    jobs_path.write_text(JOBS_YAML)
+
+    offline_models(fake_generate_embeddings, fake_call_llm, fake_call_reranker, data_dir)
+    return jobs_path, embedded, reranker_queries
+
+
+def test_load_jobs_builds_reranker_query(tmp_path):
+    path = tmp_path / "jobs.yaml"
+    path.write_text(JOBS_YAML)
+    jobs = load_jobs(path)
+
+    assert list(jobs) == ["engineer", "chef"]
+    assert jobs["engineer"].full == "Must be a senior engineer\n\nCloud experience"
+    assert jobs["chef"].full == "Must be a senior chef"
+    assert not jobs["chef"].prescreen
+
+    path.write_text("engineer:\n  preferred: Cloud experience\n")
+    with pytest.raises(ValueError, match="no mandatory criteria"):
+        load_jobs(path)
+
+
+def test_multi_job_flow_ranks_every_job_with_one_embedding_pass(fake_models):
+    jobs_path, embedded, reranker_queries = fake_models
+    jobs = load_jobs(jobs_path)
+    shared = {}
+    flow = create_multi_job_resume_processing_flow(jobs)
+    instrument_flow(flow)
+    flow.run(shared)
+
+    # Every resume and every job's criteria embedded exactly once
+    assert len(embedded) == 12 + 2
+    assert sorted(reranker_queries) == sorted({job.full for job in jobs.values()})
+
+    engineer, chef = shared[JOB_RESULTS]["engineer"], shared[JOB_RESULTS]["chef"]
+    assert engineer[FILTER_SUMMARY]["total_candidates"] == 6
+    assert set(engineer[EVALUATIONS]) == {f"resume_{i}.txt" for i in range(1, 12, 2)}
+    assert [filename for filename, _ in engineer[RANKED_RESUMES]] == \
+        ["resume_11.txt", "resume_7.txt", "resume_5.txt", "resume_1.txt"]
+    assert [filename for filename, _ in chef[RANKED_RESUMES]] == \
+        ["resume_10.txt", "resume_8.txt", "resume_4.txt", "resume_2.txt"]
+    assert all(not evaluation[QUALIFIES] for evaluation in chef[EVALUATIONS].values()
+               if "engineer" in evaluation["candidate_name"])
+
+
+def test_single_job_matches_batch_flow(fake_models, monkeypatch):
+    jobs_path, _, _ = fake_models
+    monkeypatch.setattr(multi_job, "JOB_PRESCREEN_DEFAULT", True)
+    jobs_path.write_text(yaml.safe_dump({"default": {"mandatory": nodes.MANDATORY_CRITERIA}}))
+    jobs = load_jobs(jobs_path)
+    monkeypatch.setattr(nodes, "call_llm", lambda prompt, temperature=0.0, use_cache=True: (
+        f"```yaml\ncandidate_name: x\nqualifies: {'senior' in prompt.split('Resume:')[1]}\nreasons: []\n```"))
+    monkeypatch.setattr(models, "generate_embeddings",
+                        lambda texts: [[1.0, 0.0] if "engineer" in text or "Criteria" in text else [0.0, 1.0]
+                                       for text in texts])
+
+    batch_shared, multi_shared = {}, {}
+    create_resume_processing_flow().run(batch_shared)
+    create_multi_job_resume_processing_flow(jobs).run(multi_shared)
+
+    assert multi_shared[JOB_RESULTS]["default"][EVALUATIONS] == batch_shared[EVALUATIONS]
+    assert multi_shared[JOB_RESULTS]["default"][FILTER_SUMMARY] == batch_shared[FILTER_SUMMARY]
+
+
+def test_each_job_writes_its_own_full_ranking(fake_models, tmp_path, monkeypatch):
+    jobs_path, _, _ = fake_models
+    monkeypatch.setattr(multi_job, "RANKING_FULL_PATH", str(tmp_path / "ranking.tsv"))
+    shared = {}
+
+    create_multi_job_resume_processing_flow(load_jobs(jobs_path)).run(shared)
+
+    for job in ("engineer", "chef"):
+        path = shared[JOB_RESULTS][job]["RANKING_SUMMARY"]["full_ranking"]
+        assert path == str(tmp_path / f"ranking.{job}.tsv")
+        with open(path, encoding="utf-8") as f:
+            ranked = [line.split("\t")[0] for line in f]
+        assert ranked and all(job in (tmp_path / "data" / filename).read_text() for filename in ranked)
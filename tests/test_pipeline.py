@@ -0,0 +1,144 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from src.constants import EVALUATIONS, RANKED_RESUMES, RELEVANT_RESUMES, EMBEDDING_FAILURES
+from src.prompts import MANDATORY_CRITERIA
+from src.utils import models
+from src.utils.pipeline import Pipeline, Stage
+from src.workflow import nodes, pipeline
+from src.workflow.flow import create_resume_processing_flow
+from src.workflow.pipeline import create_pipelined_resume_processing_flow
+
+
+def test_stages_overlap_and_keep_every_item():
+    started = {}
+
+    def slow_stage(name):
+        def run(batch):
+            started.setdefault(name, time.perf_counter())
+            time.sleep(0.01 * len(batch))
+            return batch
+        return run
+
+    results = Pipeline([Stage("first", slow_stage("first"), workers=2),
+                        Stage("second", slow_stage("second"), workers=2)], queue_size=2).run(range(20))
+
+    assert sorted(results) == list(range(20))
+    # The second stage started long before the first one got through all 20 items
+    assert started["second"] - started["first"] < 0.05
+
+
+def test_stage_error_stops_the_pipeline():
+    def explode(batch):
+        if 3 in batch:
+            raise ValueError("boom")
+        return batch
+
+    with pytest.raises(ValueError, match="boom"):
+        Pipeline([Stage("explode", explode, workers=2)], queue_size=1).run(range(1000))
+
+
+def test_micro_batches_respect_batch_size():
+    sizes, lock = [], threading.Lock()
+
+    def record(batch):
+        with lock:
+            sizes.append(len(batch))
+        return [sum(batch)]
+
+    results = Pipeline([Stage("sum", record, batch_size=4)], queue_size=16).run([1] * 40)
+
+    assert sum(results) == 40
+    assert max(sizes) <= 4
+
+
+@pytest.fixture
+def fake_models(tmp_path, monkeypatch, offline_models):
+    def fake_generate_embeddings(texts):
+        return [[1.0, 0.0] if text == MANDATORY_CRITERIA or "engineer" in text else [0.0, 1.0] for text in texts]
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        resume = prompt.split("Resume:\n")[1].split("\n")[0]
+        return f"```yaml\ncandidate_name: {resume}\nqualifies: {'senior' in resume}\nreasons: []\n```"
+
+    def fake_call_reranker(query, items):
+        return [float(len(item)) for item in items]
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(30):
+        level = "senior" if i % 3 else "junior"
+        role = "engineer" if i % 2 else "chef"
+        (data_dir / f"resume_{i}.txt").write_text(f"{level} {role} {'x' * i}")
+
+    offline_models(fake_generate_embeddings, fake_call_llm, fake_call_reranker, data_dir)
+    monkeypatch.setattr(pipeline, "call_reranker", fake_call_reranker)
+    monkeypatch.setattr(pipeline, "DATA_DIR_NAME", str(data_dir))
+
+
+def test_pipelined_flow_warns_that_waves_are_ignored(monkeypatch, caplog):
+    monkeypatch.setattr(pipeline, "SCREENING_MODE", "waves")
+
+    create_pipelined_resume_processing_flow()
+
+    assert "SCREENING_MODE='waves' is ignored" in caplog.text
+
+
+def test_pipelined_flow_warns_that_dedup_is_ignored(monkeypatch, caplog):
+    monkeypatch.setattr(pipeline, "DEDUP_ENABLED", True)
+
+    create_pipelined_resume_processing_flow()
+
+    assert "DEDUP_ENABLED is ignored" in caplog.text
+
+
+def test_pipelined_flow_matches_batch_flow(fake_models):
+    batch_shared, pipelined_shared = {}, {}
+    create_resume_processing_flow().run(batch_shared)
+    create_pipelined_resume_processing_flow().run(pipelined_shared)
+
+    assert pipelined_shared[EVALUATIONS] == batch_shared[EVALUATIONS]
+    assert set(pipelined_shared[RELEVANT_RESUMES]) == set(batch_shared[RELEVANT_RESUMES])
+    assert pipelined_shared[EMBEDDING_FAILURES] == []
+    assert pipelined_shared[RANKED_RESUMES] == batch_shared[RANKED_RESUMES]
+    for key in ("RANKED_FILENAMES", "RANKED_SCORES", "RANKING_SUMMARY"):
+        assert pipelined_shared[key] == batch_shared[key]
+
+
+def test_pipelined_screening_retries_rate_limited_calls(fake_models, monkeypatch):
+    calls, clients = [], []
+
+    class FakeAsyncOpenAI:
+        def __init__(self, **kwargs):
+            self.closed = False
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+            clients.append(self)
+
+        async def create(self, model, temperature, messages):
+            resume = messages[0]["content"].split("Resume:\n")[1].split("\n")[0]
+            calls.append(resume)
+            if calls.count(resume) == 1 and len(calls) <= 3:
+                raise openai.RateLimitError("rate limited", body=None, response=httpx.Response(
+                    429, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")))
+            content = f"```yaml\ncandidate_name: {resume}\nqualifies: {'senior' in resume}\nreasons: []\n```"
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+        async def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(models, "AsyncOpenAI", FakeAsyncOpenAI)
+    monkeypatch.setattr(models, "LLM_BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(nodes, "acall_llm", models.acall_llm)
+    batch_shared, pipelined_shared = {}, {}
+    create_resume_processing_flow().run(batch_shared)
+    create_pipelined_resume_processing_flow().run(pipelined_shared)
+
+    assert pipelined_shared[EVALUATIONS] == batch_shared[EVALUATIONS]
+    # The first three calls were rejected with a 429 and retried
+    assert len(calls) == len(set(calls)) + 3
+    assert len(clients) == 1 and clients[0].closed
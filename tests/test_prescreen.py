@@ -0,0 +1,96 @@
+import datetime
+
+import pytest
+
+from src.constants import EVALUATIONS, FILTER_SUMMARY, PRESCREEN_RULE, QUALIFIES, RELEVANT_RESUMES
+from src.scripts.generate_synthetic_resumes import synthetic_resume, condition_generator, REFERENCE_DATE
+from src.scripts.prescreen_holdout import HOLDOUT_QUALIFIED_RESUMES
+from src.utils.prescreen import prescreen_resume, employment_intervals, years_of_experience, claimed_years, \
+    INSUFFICIENT_EXPERIENCE
+from src.workflow import nodes
+from src.workflow.nodes import PrescreenResumesNode, ScreenResumesNode, ReduceFilterResultsNode
+
+TODAY = datetime.date(2025, 6, 15)
+
+
+def test_employment_ranges_are_merged_across_formats():
+    text = """Engineer, Acme (Jan 2015 - Dec 2016)
+Contractor, Globex (2016 – 2017)
+Developer, Initech (03/2020 to Present)"""
+
+    intervals = employment_intervals(text, TODAY)
+
+    assert len(intervals) == 3
+    # 2015-01..2017-12 once the overlap is merged, plus 2020-03..2025-06
+    assert years_of_experience(intervals) == (35 + 63) / 12
+
+
+def test_only_clear_fails_are_rejected():
+    junior = "John Roe\nB.Sc. in Computer Science\nDeveloper, Acme (Jan 2024 - Present)"
+    claims_more = "Sam Poe\nMaster of Science\n5+ years of professional software experience\n(2024 - Present)"
+    no_dates = "Alex Moe\nBS Computer Science\n2 years of experience"
+
+    assert prescreen_resume(junior, TODAY).rule == INSUFFICIENT_EXPERIENCE
+    assert prescreen_resume(claims_more, TODAY).rule is None
+    assert prescreen_resume(no_dates, TODAY) == (None, 2)
+
+
+@pytest.mark.parametrize("education", ["B.Com, University of Mumbai", "BBA, Goethe University", "A.B., Harvard College",
+                                       "S.B., MIT", "University of Toronto, Computer Science (2010-2014)",
+                                       "High School Diploma, Central High School"])
+def test_degrees_are_left_to_the_llm(education):
+    resume = f"Pat Doe\nEXPERIENCE\nDeveloper, Acme (Jan 2015 - Present)\n\nEDUCATION\n{education}"
+
+    assert prescreen_resume(resume, TODAY).rule is None
+
+
+@pytest.mark.parametrize("resume", [
+    "Ten years of experience building web services.\nDeveloper, Acme (Jan 2024 - Present)",
+    "Over a decade of backend experience.\nDeveloper, Acme (Jan 2024 - Present)",
+    "Twenty-five years' experience in software.\nConsultant, Acme (Jan 2024 - Present)",
+    "Developer, Acme (Jan 2024 - Present)\nB.Sc. Computer Science, 2009",
+    "Freelance developer since 2012\nDeveloper, Acme (Jan 2024 - Present)",
+])
+def test_experience_is_rejected_only_when_the_dates_cover_the_career(resume):
+    assert prescreen_resume(resume, TODAY).rule is None
+
+
+def test_claimed_years_in_words():
+    assert claimed_years("ten years of experience, over a decade of python experience") == [10, 10]
+    assert claimed_years("twenty-five years' experience") == [25]
+    assert claimed_years("5+ years of professional software experience") == [5]
+
+
+def test_synthetic_qualified_resumes_are_never_rejected():
+    for number in range(400):
+        result = prescreen_resume(synthetic_resume(number), REFERENCE_DATE)
+        if condition_generator(number):
+            assert result.rule is None
+
+
+@pytest.mark.parametrize("filename", list(HOLDOUT_QUALIFIED_RESUMES))
+def test_held_out_qualified_resumes_are_never_rejected(filename):
+    assert prescreen_resume(HOLDOUT_QUALIFIED_RESUMES[filename], REFERENCE_DATE).rule is None
+
+
+def test_rejections_skip_the_llm_and_are_counted(monkeypatch, offline_models):
+    prompts = []
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        prompts.append(prompt)
+        return "```yaml\ncandidate_name: Someone\nqualifies: true\nreasons: []\n```"
+
+    offline_models(call_llm=fake_call_llm)
+    monkeypatch.setattr(nodes, "prescreen_resume", lambda text: prescreen_resume(text, REFERENCE_DATE))
+    relevant = {f"resume_{number}.txt": synthetic_resume(number) for number in range(8)}
+    shared = {RELEVANT_RESUMES: relevant}
+
+    PrescreenResumesNode().run(shared)
+    ScreenResumesNode().run(shared)
+    ReduceFilterResultsNode().run(shared)
+
+    rejected = {filename for filename, evaluation in shared[EVALUATIONS].items() if PRESCREEN_RULE in evaluation}
+    assert rejected and not any(condition_generator(int(name[7:-4])) for name in rejected)
+    assert len(prompts) == len(relevant) - len(rejected)
+    assert all(shared[EVALUATIONS][filename][QUALIFIES] is False for filename in rejected)
+    assert shared[FILTER_SUMMARY]["total_candidates"] == len(relevant)
@@ -1,5 +1,8 @@
+from random import Random
+
 from src.constants import RANKED_RESUMES, DEFAULT
 from src.utils.logger import configured_logger
+from src.utils.ranking import TopN, SpilledRanking, rank_key, rank_top_n, read_ranking
 from src.workflow.nodes import RankResumesNode, ProcessRankResultsNode
 
 
@@ -78,3 +81,29 @@ def test_process_rank_results_node(qualified_resumes):
     expected_top_filename = "resume_4.txt"  # or resume_48.txt depending on what you expect
     actual_top_filename = ranked_filenames[0]
     assert actual_top_filename == expected_top_filename, f"Expected top candidate: {expected_top_filename}, got: {actual_top_filename}"
+
+
+def test_top_n_keeps_best_and_merges_in_any_grouping():
+    pairs = [(f"resume_{i}.txt", float(Random(i).randint(0, 20))) for i in range(500)]
+    expected = sorted(pairs, key=rank_key)[:10]
+
+    whole = TopN(10).push_many(pairs).results()
+    merged = TopN(10)
+    for start in range(0, len(pairs), 37):
+        merged.merge(TopN(10).push_many(pairs[start:start + 37]).results())
+
+    assert list(whole) == expected
+    assert list(merged.results()) == expected
+    assert whole.total == merged.total == 500
+
+
+def test_spilled_ranking_writes_complete_sorted_ranking(tmp_path):
+    pairs = [(f"resume_{i}.txt", float((i * 7919) % 101)) for i in range(1000)]
+    full = SpilledRanking(tmp_path / "ranking.tsv", spill_rows=64)
+    for filename, score in pairs:
+        full.add(filename, score)
+    full.finish()
+
+    assert list(read_ranking(tmp_path / "ranking.tsv")) == sorted(pairs, key=rank_key)
+    assert list(rank_top_n(pairs, 5)) == sorted(pairs, key=rank_key)[:5]
+    assert not list(tmp_path.glob("*.run"))
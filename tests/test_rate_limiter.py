@@ -0,0 +1,25 @@
+import asyncio
+import time
+
+from src.utils.rate_limiter import RateLimiter, TokenBucket
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(per_minute=60)  # one unit per second
+    bucket.consume(60)
+
+    assert 1.9 < bucket.wait_time(2) <= 2.0
+    # Requests larger than the bucket are clamped so they can still go through
+    assert bucket.wait_time(1000) <= 60.0
+
+
+def test_rate_limiter_throttles_on_tokens_per_minute():
+    limiter = RateLimiter(requests_per_minute=10_000, tokens_per_minute=600)  # 10 tokens per second
+
+    async def run():
+        started = time.monotonic()
+        await limiter.acquire(600)
+        await limiter.acquire(3)
+        return time.monotonic() - started
+
+    assert 0.25 <= asyncio.run(run()) < 1.0
@@ -1,5 +1,16 @@
-from src.constants import QUALIFIES
-from src.workflow.nodes import ScreenResumesNode
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pocketflow import Flow
+
+from src.constants import QUALIFIES, CANDIDATE_NAME, RELEVANT_RESUMES, EVALUATIONS, RESUME_SIMILARITIES, \
+    SCREENING_COVERAGE, FILTER_SUMMARY
+from src.utils import models
+from src.utils.llm_cache import LLMResponseCache
+from src.workflow import nodes
+from src.workflow.checkpoint import Checkpoint, checkpointed
+from src.workflow.nodes import ScreenResumesNode, WaveScreenResumesNode, ReduceFilterResultsNode
 from tests.conftest import DATA_DIR
 
 
@@ -14,3 +25,164 @@ def test_resume_does_not_qualify():
     _, result = resume_filter.exec(resume_item)
 
     assert result[QUALIFIES] is False
+
+
+def test_concurrent_screening_keeps_input_order(monkeypatch):
+    async def fake_acall_llm(prompt, temperature=0.0, rate_limiter=None, use_cache=True):
+        name = prompt.split("Resume:\n")[1].split("\n")[0]
+        await asyncio.sleep(0.05 if name.endswith("0") else 0)  # first resume finishes last
+        return f"```yaml\ncandidate_name: {name}\nqualifies: true\nreasons: []\n```"
+
+    monkeypatch.setattr(nodes, "acall_llm", fake_acall_llm)
+    monkeypatch.setattr(nodes, "get_llm_cache", lambda temperature=0.0: None)
+    monkeypatch.setattr(nodes, "SCREENING_CONCURRENCY", 4)
+    items = [(f"resume_{i}.txt", f"Candidate {i}") for i in range(10)]
+
+    results = ScreenResumesNode()._exec(items)
+
+    assert [filename for filename, _ in results] == [filename for filename, _ in items]
+    assert [result[CANDIDATE_NAME] for _, result in results] == [f"Candidate {i}" for i in range(10)]
+
+
+def test_concurrent_screening_shares_one_client_and_closes_it(monkeypatch):
+    clients = []
+
+    class FakeAsyncOpenAI:
+        def __init__(self, **kwargs):
+            self.closed = False
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+            clients.append(self)
+
+        async def create(self, model, temperature, messages):
+            name = messages[0]["content"].split("Resume:\n")[1].split("\n")[0]
+            content = f"```yaml\ncandidate_name: {name}\nqualifies: true\nreasons: []\n```"
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+        async def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(models, "AsyncOpenAI", FakeAsyncOpenAI)
+    monkeypatch.setattr(nodes, "get_llm_cache", lambda temperature=0.0: None)
+    monkeypatch.setattr(nodes, "SCREENING_CONCURRENCY", 4)
+    items = [(f"resume_{i}.txt", f"Candidate {i}") for i in range(10)]
+
+    for run in range(2):
+        results = ScreenResumesNode()._exec(items)
+        assert [result[CANDIDATE_NAME] for _, result in results] == [f"Candidate {i}" for i in range(10)]
+        # One client per run, closed before asyncio.run closes its loop
+        assert len(clients) == run + 1 and clients[-1].closed
+
+
+def test_packed_screening_falls_back_for_missing_resumes(monkeypatch):
+    prompts = []
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        prompts.append(prompt)
+        if "=== Resume:" in prompt:
+            # The packed answer silently drops resume_2.txt
+            return ("```yaml\n"
+                    "- filename: resume_1.txt\n  candidate_name: One\n  qualifies: true\n  reasons: []\n"
+                    "- filename: resume_3.txt\n  candidate_name: Three\n  qualifies: false\n  reasons: []\n```")
+        return "```yaml\ncandidate_name: Two\nqualifies: true\nreasons: []\n```"
+
+    monkeypatch.setattr(nodes, "call_llm", fake_call_llm)
+    monkeypatch.setattr(nodes, "get_llm_cache", lambda temperature=0.0: None)
+    monkeypatch.setattr(nodes, "SCREENING_CONCURRENCY", 1)
+    shared = {RELEVANT_RESUMES: {f"resume_{i}.txt": f"Candidate {i}" for i in (1, 2, 3)}}
+
+    nodes.PackedScreenResumesNode().run(shared)
+
+    assert len(prompts) == 2  # one packed call plus one single-resume retry
+    assert list(shared[EVALUATIONS]) == ["resume_1.txt", "resume_2.txt", "resume_3.txt"]
+    assert [evaluation[CANDIDATE_NAME] for evaluation in shared[EVALUATIONS].values()] == ["One", "Two", "Three"]
+
+
+def test_wave_screening_stops_once_enough_candidates_qualify(monkeypatch):
+    screened = []
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        number = int(prompt.split("Resume:\nCandidate ")[1].split("\n")[0])
+        screened.append(number)
+        return f"```yaml\ncandidate_name: Candidate {number}\nqualifies: {number % 2 == 0}\nreasons: []\n```"
+
+    monkeypatch.setattr(nodes, "call_llm", fake_call_llm)
+    monkeypatch.setattr(nodes, "get_llm_cache", lambda temperature=0.0: None)
+    monkeypatch.setattr(nodes, "SCREENING_CONCURRENCY", 1)
+    monkeypatch.setattr(nodes, "SCREENING_WAVE_SIZE", 2)
+    monkeypatch.setattr(nodes, "SCREENING_TARGET_QUALIFIED", 3)
+    monkeypatch.setattr(nodes, "SCREENING_MIN_SIMILARITY", 0.25)
+    shared = {RELEVANT_RESUMES: {f"resume_{i}.txt": f"Candidate {i}" for i in range(12)},
+              RESUME_SIMILARITIES: {f"resume_{i}.txt": 1 - i / 10 for i in range(12)}}
+
+    WaveScreenResumesNode().run(shared)
+    ReduceFilterResultsNode().run(shared)
+
+    # Waves go in descending similarity; the third wave brings the third qualified candidate
+    assert screened == [0, 1, 2, 3, 4, 5]
+    assert sorted(shared[EVALUATIONS]) == [f"resume_{i}.txt" for i in range(6)]
+    assert shared[SCREENING_COVERAGE] == {"partial": True, "screened": 6, "unscreened": 6,
+                                          "below_min_similarity": 4}
+    assert shared[FILTER_SUMMARY]["partial"] is True
+    assert shared[FILTER_SUMMARY]["qualified_count"] == 3
+
+
+def test_resumed_wave_screening_counts_candidates_qualified_before_the_crash(tmp_path, monkeypatch):
+    screened, fail_at = [], [4]
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        number = int(prompt.split("Resume:\nCandidate ")[1].split("\n")[0])
+        if number in fail_at:
+            raise RuntimeError("quota exceeded")
+        screened.append(number)
+        return f"```yaml\ncandidate_name: Candidate {number}\nqualifies: {number % 2 == 0}\nreasons: []\n```"
+
+    monkeypatch.setattr(nodes, "call_llm", fake_call_llm)
+    monkeypatch.setattr(nodes, "get_llm_cache", lambda temperature=0.0: None)
+    monkeypatch.setattr(nodes, "SCREENING_CONCURRENCY", 1)
+    monkeypatch.setattr(nodes, "SCREENING_WAVE_SIZE", 2)
+    monkeypatch.setattr(nodes, "SCREENING_TARGET_QUALIFIED", 3)
+    monkeypatch.setattr(nodes, "SCREENING_MIN_SIMILARITY", None)
+    checkpoint = Checkpoint(tmp_path / "checkpoint")
+
+    def run(resume):
+        shared = {RELEVANT_RESUMES: {f"resume_{i}.txt": f"Candidate {i}" for i in range(12)},
+                  RESUME_SIMILARITIES: {f"resume_{i}.txt": 1 - i / 20 for i in range(12)}}
+        checkpointed(Flow(start=WaveScreenResumesNode()), resume=resume, checkpoint=checkpoint).run(shared)
+        return shared
+
+    with pytest.raises(RuntimeError):
+        run(resume=False)
+    assert screened == [0, 1, 2, 3]
+
+    screened.clear()
+    fail_at.clear()
+    shared = run(resume=True)
+
+    # 0 and 2 qualified before the crash, so the wave bringing 4 is the last one
+    assert screened == [4, 5]
+    assert sorted(shared[EVALUATIONS]) == [f"resume_{i}.txt" for i in range(6)]
+
+
+def test_malformed_reply_is_not_cached_and_retry_recovers(tmp_path, monkeypatch):
+    replies = iter(["```yaml\nqualifies: [unclosed\n```", "```yaml\ncandidate_name: One\nqualifies: true\nreasons: []\n```"])
+    calls = []
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        calls.append(use_cache)
+        return next(replies)
+
+    cache = LLMResponseCache(path=tmp_path / "llm.sqlite3")
+    monkeypatch.setattr(nodes, "call_llm", fake_call_llm)
+    monkeypatch.setattr(nodes, "get_llm_cache", lambda temperature=0.0: cache)
+    monkeypatch.setattr(nodes, "SCREENING_CONCURRENCY", 1)
+    shared = {RELEVANT_RESUMES: {"resume_1.txt": "Candidate 1"}}
+
+    ScreenResumesNode(max_retries=2).run(shared)
+
+    assert shared[EVALUATIONS]["resume_1.txt"][QUALIFIES] is True
+    assert calls == [False, False]  # the screening node is the only cache lookup
+    cached = cache.get(nodes.LLM_MODEL, 0.0, nodes.build_screening_prompt("Candidate 1"))
+    assert cached.response is None and cached.parsed[CANDIDATE_NAME] == "One"
+
+    ScreenResumesNode().run(shared)
+    assert len(calls) == 2  # served from the cache
@@ -1,3 +1,4 @@
+from src.config import THRESHOLD
 from src.prompts import MANDATORY_CRITERIA
 from src.workflow.nodes import EmbedResumesNode, PrefilterResumesNode, EmbedCriteriaNode
 from tests.conftest import DATA_DIR
@@ -15,11 +16,12 @@ def test_resume_pre_filtering():
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
 
-    resume_item = (filename, content)
-    resume_embedding = resume_encoder.exec(resume_item)
+    resume_batch = [(filename, content)]
+    resume_embedding = resume_encoder.exec(resume_batch)
 
-    resume_embedding = {filename: resume_embedding[1]}
+    resume_embedding = dict(resume_embedding)
     resume_item = {filename: content}
-    relevant_resumes = resume_prefilter.exec((criteria_embedding, resume_embedding, resume_item))
+    relevant_resumes, similarities = resume_prefilter.exec((criteria_embedding, resume_embedding, resume_item))
 
     assert content == relevant_resumes[filename]
+    assert similarities[filename] > THRESHOLD
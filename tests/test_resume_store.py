@@ -0,0 +1,59 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.utils.ingest import select_resumes
+from src.utils.resume_store import ResumeStore, EmbeddingMatrix
+
+RESUMES = {"a.txt": "Ada Lovelace\nengineer", "b.txt": "Zoë Ångström, Zürich", "c.txt": "", "d.txt": "chef"}
+
+
+@pytest.mark.parametrize("mapped", [False, True])
+def test_store_keeps_text_once_and_views_select_ids(tmp_path, mapped):
+    store = ResumeStore.build(RESUMES.items(), str(tmp_path / "resumes.bin") if mapped else None)
+    resumes = store.view()
+
+    assert dict(resumes) == RESUMES
+    assert resumes == RESUMES
+    assert resumes.total_size() == sum(len(text.encode("utf-8")) for text in RESUMES.values())
+
+    relevant = select_resumes(resumes, ["d.txt", "b.txt"])
+    assert relevant.store is store
+    assert list(relevant) == ["d.txt", "b.txt"]
+    assert relevant["b.txt"] == RESUMES["b.txt"]
+    assert "a.txt" not in relevant and "missing.txt" not in relevant
+    with pytest.raises(KeyError):
+        relevant["a.txt"]
+    with pytest.raises(KeyError):
+        select_resumes(relevant, ["a.txt"])
+
+    assert list(store.view(relevant.mask)) == ["b.txt", "d.txt"]
+    assert [(record.id, record.filename) for record in relevant.records()] == [(3, "d.txt"), (1, "b.txt")]
+
+    pickled = pickle.dumps({"all": resumes, "relevant": relevant})
+    # A mapped store pickles its path, not the text it maps
+    assert (b"Ada Lovelace" in pickled) is not mapped
+    restored = pickle.loads(pickled)
+    assert restored["relevant"].store is restored["all"].store
+    assert dict(restored["relevant"]) == {"d.txt": "chef", "b.txt": RESUMES["b.txt"]}
+    if mapped:
+        (tmp_path / "resumes.bin").write_bytes(b"rebuilt")
+        with pytest.raises(ValueError):
+            pickle.loads(pickled)
+
+
+def test_empty_store(tmp_path):
+    assert dict(ResumeStore.build([], str(tmp_path / "empty.bin")).view()) == {}
+    assert len(select_resumes(ResumeStore.build([]).view(), [])) == 0
+
+
+def test_embedding_matrix_rows():
+    embeddings = EmbeddingMatrix.from_items([("a.txt", [1.0, 0.0]), ("b.txt", [0.5, 0.5])])
+
+    assert embeddings.matrix.dtype == np.float32 and embeddings.matrix.shape == (2, 2)
+    assert list(embeddings) == ["a.txt", "b.txt"]
+    assert embeddings["b.txt"].tolist() == [0.5, 0.5]
+    assert "c.txt" not in embeddings
+    assert pickle.loads(pickle.dumps(embeddings))["a.txt"].tolist() == [1.0, 0.0]
+    assert len(EmbeddingMatrix.from_items([])) == 0
@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.utils import models
+from src.utils.score_cache import RerankerScoreCache
+
+
+def test_score_cache_keys_on_model_and_criteria(tmp_path):
+    cache = RerankerScoreCache(path=tmp_path / "scores.sqlite3")
+    cache.put_many("model", "criteria", ["resume a", "resume b"], [0.5, -1.0])
+
+    assert cache.get_many("model", "criteria", ["resume b", "resume c", "resume a"]) == [-1.0, None, 0.5]
+    # Changing the criteria or the model invalidates every score
+    assert cache.get_many("model", "new criteria", ["resume a"]) == [None]
+    assert cache.get_many("other model", "criteria", ["resume a"]) == [None]
+
+
+def test_score_cache_stays_within_max_bytes(tmp_path):
+    cache = RerankerScoreCache(path=tmp_path / "scores.sqlite3", max_bytes=256 * 1024)
+    for batch in range(20):
+        items = [f"resume {batch}-{i}" for i in range(100)]
+        cache.put_many("model", "criteria", items, [0.0] * len(items))
+
+    assert cache.size_bytes() <= 256 * 1024
+    assert 0 < len(cache) < 2000
+    # The newest entries survive eviction
+    assert cache.get_many("model", "criteria", ["resume 19-99"]) == [0.0]
+
+
+def test_call_reranker_only_scores_uncached_items(tmp_path, monkeypatch):
+    class FakeCrossEncoder:
+        def __init__(self):
+            self.scored = []
+
+        def predict(self, pairs, batch_size, show_progress_bar):
+            self.scored += [item for _, item in pairs]
+            return [float(len(item)) for _, item in pairs]
+
+    fake = FakeCrossEncoder()
+    monkeypatch.setitem(models._rerankers, ("fake-reranker", "torch"), fake)
+    monkeypatch.setattr(models, "get_score_cache", lambda: cache)
+    cache = RerankerScoreCache(path=tmp_path / "scores.sqlite3")
+
+    models.call_reranker("query", ["aa", "b"], model_name="fake-reranker", backend="torch", workers=1)
+    scores = models.call_reranker("query", ["ccc", "aa", "b"], model_name="fake-reranker", backend="torch",
+                                  workers=1)
+
+    assert np.allclose(scores, [3.0, 2.0, 1.0])
+    assert fake.scored == ["b", "aa", "ccc"]
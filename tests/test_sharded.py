@@ -0,0 +1,148 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from src.constants import DUPLICATES, EVALUATIONS, RANKED_RESUMES, RELEVANT_RESUMES
+from src.prompts import MANDATORY_CRITERIA
+from src.scripts.generate_synthetic_resumes import synthetic_resume
+from src.utils import models
+from src.utils.metrics import metrics
+from src.utils.ranking import rank_key
+from src.utils.result_store import file_digest
+from src.workflow import nodes, sharded
+from src.workflow.flow import create_resume_processing_flow
+from src.workflow.sharded import create_sharded_resume_processing_flow, merge_partials
+
+
+@pytest.fixture
+def fake_corpus(tmp_path, monkeypatch, offline_models):
+    def fake_generate_embeddings(texts):
+        return [[1.0, 0.0] if text == MANDATORY_CRITERIA or "engineer" in text else [0.0, 1.0] for text in texts]
+
+    def fake_call_llm(prompt, temperature=0.0, use_cache=True):
+        resume = prompt.split("Resume:\n")[1].split("\n")[0]
+        return f"```yaml\ncandidate_name: {resume}\nqualifies: {'senior' in resume}\nreasons: []\n```"
+
+    def fake_call_reranker(query, items):
+        return [float(len(item) % 7) for item in items]  # plenty of ties across shards
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(40):
+        level = "senior" if i % 3 else "junior"
+        role = "engineer" if i % 2 else "chef"
+        (data_dir / f"resume_{i}.txt").write_text(f"{level} {role} {'x' * i}")
+
+    offline_models(fake_generate_embeddings, fake_call_llm, fake_call_reranker, data_dir)
+    monkeypatch.setattr(sharded, "DATA_DIR_NAME", str(data_dir))
+    monkeypatch.setattr(sharded, "SHARD_POLL_SECONDS", 0.05)
+    return tmp_path
+
+
+def run_sharded(tmp_path, shards, workers):
+    shared = {}
+    # fork so the workers inherit the fake models
+    create_sharded_resume_processing_flow(shards, workers, tmp_path / f"spool-{shards}", "fork").run(shared)
+    return shared
+
+
+def ranking(shared):
+    return list(shared[RANKED_RESUMES])
+
+
+def test_sharded_flow_matches_single_process_flow(fake_corpus):
+    single = {}
+    create_resume_processing_flow().run(single)
+    merged = run_sharded(fake_corpus, shards=4, workers=3)
+
+    assert merged[EVALUATIONS] == single[EVALUATIONS]
+    assert set(merged[RELEVANT_RESUMES]) == set(single[RELEVANT_RESUMES])
+    assert ranking(merged) == ranking(single)
+    assert merged["RANKING_SUMMARY"]["total_ranked"] == single["RANKING_SUMMARY"]["total_ranked"]
+
+
+def test_merge_is_independent_of_shard_count(fake_corpus):
+    two, five = run_sharded(fake_corpus, shards=2, workers=2), run_sharded(fake_corpus, shards=5, workers=3)
+
+    assert list(two[EVALUATIONS].items()) == list(five[EVALUATIONS].items())
+    assert ranking(two) == ranking(five)
+    assert two["RANKED_FILENAMES"] == five["RANKED_FILENAMES"]
+
+
+def test_small_top_k_and_top_n_do_not_depend_on_shard_count(fake_corpus, monkeypatch):
+    def distinct_embeddings(texts):
+        # Similarity falls with resume length, so the top k has no ties
+        return [[1.0, 0.0] if text == MANDATORY_CRITERIA else
+                [1.0, text.count("x") / 50] if "engineer" in text else [0.0, 1.0] for text in texts]
+
+    monkeypatch.setattr(models, "generate_embeddings", distinct_embeddings)
+    for module in (nodes, sharded):
+        monkeypatch.setattr(module, "PREFILTER_TOP_K", 12)
+        monkeypatch.setattr(module, "SCREENING_TOP_N", 5)
+    single = {}
+    create_resume_processing_flow().run(single)
+
+    for shards in (2, 5):
+        merged = run_sharded(fake_corpus, shards=shards, workers=2)
+        assert merged[EVALUATIONS] == single[EVALUATIONS]
+        assert ranking(merged) == ranking(single)
+        assert merged["RANKING_SUMMARY"]["total_ranked"] == single["RANKING_SUMMARY"]["total_ranked"]
+
+
+def test_near_duplicates_in_different_shards_are_merged_like_the_single_process_flow(fake_corpus):
+    for number in (3, 5, 7):
+        resume = f"senior engineer {number}\n" + synthetic_resume(number)
+        (fake_corpus / "data" / f"dup_{number}_a.txt").write_text(resume)
+        # Reformatted: other bytes and so another content hash, the same words
+        (fake_corpus / "data" / f"dup_{number}_b.txt").write_text(resume.replace("\n", "\n\n"))
+    single = {}
+    create_resume_processing_flow().run(single)
+    merged = run_sharded(fake_corpus, shards=4, workers=2)
+
+    assert single[DUPLICATES] == {f"dup_{number}_b.txt": f"dup_{number}_a.txt" for number in (3, 5, 7)}
+    # The content hash put at least one pair in different shards
+    shards = {filename: sharded.shard_of(file_digest(fake_corpus / "data" / filename), 4)
+              for pair in single[DUPLICATES].items() for filename in pair}
+    assert any(shards[duplicate] != shards[representative] for duplicate, representative in single[DUPLICATES].items())
+    assert merged[DUPLICATES] == single[DUPLICATES]
+    assert merged[EVALUATIONS] == single[EVALUATIONS]
+    assert ranking(merged) == ranking(single)
+    assert merged["RANKING_SUMMARY"]["total_ranked"] == single["RANKING_SUMMARY"]["total_ranked"]
+
+
+def test_worker_metrics_reach_the_parent_report(fake_corpus, monkeypatch):
+    def counted_call_llm(prompt, temperature=0.0, use_cache=True):
+        metrics.record_usage("llm", "fake", SimpleNamespace(prompt_tokens=10, completion_tokens=2, total_tokens=12))
+        resume = prompt.split("Resume:\n")[1].split("\n")[0]
+        return f"```yaml\ncandidate_name: {resume}\nqualifies: {'senior' in resume}\nreasons: []\n```"
+
+    monkeypatch.setattr(nodes, "call_llm", counted_call_llm)
+    metrics.reset()
+    create_resume_processing_flow().run({})
+    single = metrics.report()["counters"]
+    metrics.reset()
+
+    merged = run_sharded(fake_corpus, shards=3, workers=2)
+    report = metrics.report()
+    metrics.reset()
+
+    assert single["llm_requests"] > 0
+    assert report["counters"] == single
+    assert report["item_latency_seconds"]["ScreenResumesNode"]["count"] == len(merged[EVALUATIONS])
+    assert report["nodes"]["RankResumesNode"]["runs"] == 3
+
+
+def test_merge_partials_ignores_partial_order():
+    partials = [{"embedding_failures": [], "similarities": {f"r{shard}{i}": 0.5 + i / 10 for i in range(3)},
+                 "evaluations": {f"r{shard}{i}": {"qualifies": True} for i in range(3)},
+                 "ranked": sorted(((f"r{shard}{i}", float(i % 2)) for i in range(3)), key=rank_key)}
+                for shard in range(4)]
+    expected = merge_partials(partials, top_k=None)
+    random.Random(0).shuffle(partials)
+
+    assert merge_partials(partials, top_k=None) == expected
+    ranked = expected[RANKED_RESUMES]
+    assert ranked.total == 12
+    assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+    assert len(merge_partials(partials, top_k=4)[EVALUATIONS]) == 4
@@ -0,0 +1,24 @@
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from src.utils.similarity import stack_embeddings, cosine_scores, select_candidates
+
+
+def test_cosine_scores_match_sklearn():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(50, 16)).tolist()
+    query = rng.normal(size=16).tolist()
+
+    scores = cosine_scores(stack_embeddings(embeddings), query)
+
+    expected = cosine_similarity(np.array([query]), np.array(embeddings))[0]
+    assert scores.dtype == np.float32
+    assert np.allclose(scores, expected, atol=1e-5)
+
+
+def test_select_candidates_threshold_and_top_k():
+    scores = np.array([0.1, 0.9, 0.5, 0.7, 0.3], dtype=np.float32)
+
+    assert select_candidates(scores, 0.2).tolist() == [1, 3, 2, 4]
+    assert select_candidates(scores, 0.2, top_k=2).tolist() == [1, 3]
+    assert select_candidates(scores, 0.95).tolist() == []